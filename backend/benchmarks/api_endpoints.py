@@ -0,0 +1,261 @@
+"""Query counts, latency and peak memory of every API endpoint against a stored baseline.
+
+Usage (from ``backend/``, one scratch database per dataset size)::
+
+    DATABASE_URL=sqlite:////tmp/api-1k.sqlite3 python manage.py migrate
+    DATABASE_URL=sqlite:////tmp/api-1k.sqlite3 python benchmarks/api_endpoints.py --entries 1000
+
+The first run seeds ``--entries`` time entries (1k, 100k and 1M are the sizes
+we track) with the clients, projects, rates and account rows around them and
+rebuilds the rollups; later runs reuse them. Every router list, retrieve and
+GET action is requested, plus the JSON report views, as an admin and with the
+report cache cold. Each endpoint reports its query count, p50/p95 latency over
+``--repeat`` requests and the peak traced memory of one request.
+
+The run fails when a list endpoint issues more queries for a larger page, or
+when an endpoint needs more queries or a slower p95 than the baseline stored
+for this size and database vendor in ``baselines/api_endpoints.json``
+(``--update-baseline`` rewrites it).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.pagination import PageNumberPagination  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from core import models  # noqa: E402
+from core.services import project_metrics, rollups  # noqa: E402
+from core.urls import router  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baselines" / "api_endpoints.json"
+MARKER = "Benchmark client"
+START = date(2022, 1, 3)
+# JSON report views and the query string each is requested with.
+REPORTS = {
+    "reports-summary": "",
+    "reports-timeseries": "?interval=week",
+    "reports-pivot": "?group_by=client,month",
+    "reports-utilization": "",
+    "reports-aging": "",
+    "reports-cache-stats": "",
+}
+PAGE_SIZES = (5, 50)
+
+
+def seed(entries: int) -> None:
+    User = get_user_model()
+    seeded = models.Client.objects.filter(name__startswith=MARKER)
+    if seeded.exists():
+        existing = models.TimeEntry.objects.count()
+        if existing != entries:
+            raise SystemExit(f"This database holds {existing:,} entries; use a separate database per size.")
+        return
+
+    admin = User.objects.create_superuser(username="bench-admin", email="admin@api.bench", password="x")
+    clients = models.Client.objects.bulk_create(models.Client(name=f"{MARKER} {index}") for index in range(40))
+    members = User.objects.bulk_create(
+        User(username=f"bench-{index}", email=f"user{index}@api.bench", role=User.Roles.CLIENT, client=client)
+        for index, client in enumerate(clients * 3)
+    )
+    projects = []
+    for index in range(200):
+        pack = index % 4 == 0
+        projects.append(
+            models.Project(
+                name=f"Project {index}",
+                client=clients[index % 40],
+                created_by=admin,
+                billing_type=models.Project.BillingType.PACK if pack else models.Project.BillingType.HOURLY,
+                pack_hours=Decimal("400") if pack else None,
+                pack_total_value=Decimal("20000.00") if pack else None,
+                hourly_rate=None if pack else Decimal("55.00"),
+            )
+        )
+    projects = models.Project.objects.bulk_create(projects)
+    models.ProjectAssignment.objects.bulk_create(
+        models.ProjectAssignment(project=project, user=members[(index * 7 + slot) % 120], is_active=True)
+        for index, project in enumerate(projects)
+        for slot in range(3)
+    )
+    models.HourlyRate.objects.bulk_create(
+        models.HourlyRate(
+            client=client,
+            amount_decimal=Decimal(60 + index % 5 * 10),
+            effective_from=START + timedelta(days=index * 9),
+        )
+        for index, client in enumerate(clients)
+    )
+    types = [models.ClientAccountEntry.EntryType.CHARGE, *[models.ClientAccountEntry.EntryType.PAYMENT] * 2]
+    models.ClientAccountEntry.objects.bulk_create(
+        models.ClientAccountEntry(
+            client=clients[index % 40],
+            entry_type=types[index % 3],
+            amount=Decimal(100 + index % 700),
+            occurred_at=START + timedelta(days=index % 900),
+            description="Benchmark",
+        )
+        for index in range(2000)
+    )
+    days = 3 * 365
+    batch = []
+    for index in range(entries):
+        project = projects[index % len(projects)]
+        batch.append(
+            models.TimeEntry(
+                project=project,
+                user=members[(index % len(projects) * 7 + index // len(projects) % 3) % 120],
+                date=START + timedelta(days=index * 7919 % days),
+                duration_minutes=15 + index * 37 % 465,
+                billable=index % 5 != 0,
+                task="Benchmark",
+            )
+        )
+        if len(batch) == 5000:
+            models.TimeEntry.objects.bulk_create(batch)
+            batch = []
+    models.TimeEntry.objects.bulk_create(batch)
+    models.TimeEntryTimer.objects.bulk_create(
+        models.TimeEntryTimer(project=projects[index], user=members[index]) for index in range(60)
+    )
+    rollups.rebuild()
+    project_metrics.reconcile()
+
+
+def endpoints() -> list[tuple[str, str, bool]]:
+    """``(label, url, paginated)`` for every router GET endpoint and report view."""
+    found = []
+    for _, viewset, basename in router.registry:
+        found.append((f"{basename}-list", reverse(f"{basename}-list"), True))
+        for extra in viewset.get_extra_actions():
+            if not extra.detail and "get" in extra.mapping:
+                name = f"{basename}-{extra.url_name}"
+                found.append((name, reverse(name), False))
+        model = viewset.serializer_class.Meta.model
+        pk = model.objects.order_by("pk").values_list("pk", flat=True).first()
+        if pk is None:
+            continue
+        if hasattr(viewset, "retrieve"):
+            found.append((f"{basename}-detail", reverse(f"{basename}-detail", args=[pk]), False))
+        for extra in viewset.get_extra_actions():
+            if extra.detail and "get" in extra.mapping:
+                name = f"{basename}-{extra.url_name}"
+                found.append((name, reverse(name, args=[pk]), False))
+    found.extend((name, reverse(name) + query, False) for name, query in REPORTS.items())
+    return found
+
+
+def request(client: APIClient, url: str) -> tuple[int, float, int]:
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = client.get(url)
+        elapsed = time.perf_counter() - started
+    return response.status_code, elapsed * 1000, len(queries)
+
+
+def peak_memory(client: APIClient, url: str) -> int:
+    cache.clear()
+    tracemalloc.start()
+    client.get(url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def page_size_queries(client: APIClient, url: str) -> list[int]:
+    default = PageNumberPagination.page_size
+    counts = []
+    try:
+        for size in PAGE_SIZES:
+            PageNumberPagination.page_size = size
+            counts.append(request(client, url)[2])
+    finally:
+        PageNumberPagination.page_size = default
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 slowdown over the baseline.")
+    parser.add_argument("--slack-ms", type=float, default=5.0, help="Absolute p95 slack for very fast endpoints.")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    seed(args.entries)
+    admin = get_user_model().objects.get(email="admin@api.bench")
+    client = APIClient()
+    client.force_authenticate(admin)
+
+    key = f"{connection.vendor}:{args.entries}"
+    baselines = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    baseline = baselines.get(key, {})
+    results: dict[str, dict] = {}
+    failures: list[str] = []
+
+    print(f"{models.TimeEntry.objects.count():,} entries, {models.TimeEntryRollup.objects.count():,} rollups ({key})")
+    print(f"{'endpoint':<34} {'status':>6} {'queries':>7} {'p50 ms':>9} {'p95 ms':>9} {'peak KiB':>9}")
+    for label, url, paginated in endpoints():
+        runs = [request(client, url) for _ in range(args.repeat)]
+        statuses = {status for status, _, _ in runs}
+        latencies = [elapsed for _, elapsed, _ in runs]
+        queries = max(count for _, _, count in runs)
+        p50 = statistics.median(latencies)
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        peak = peak_memory(client, url)
+        results[label] = {"queries": queries, "p95_ms": round(p95, 2)}
+        status = ",".join(map(str, sorted(statuses)))
+        print(f"{label:<34} {status:>6} {queries:>7} {p50:9.1f} {p95:9.1f} {peak / 1024:9.0f}")
+
+        if paginated:
+            small, large = page_size_queries(client, url)
+            if large > small:
+                failures.append(f"{label}: {small} queries for {PAGE_SIZES[0]} rows, {large} for {PAGE_SIZES[1]}")
+        previous = baseline.get(label)
+        if previous and not args.update_baseline:
+            if queries > previous["queries"]:
+                failures.append(f"{label}: {queries} queries, baseline {previous['queries']}")
+            if p95 > previous["p95_ms"] * (1 + args.tolerance) + args.slack_ms:
+                failures.append(f"{label}: p95 {p95:.1f} ms, baseline {previous['p95_ms']:.1f} ms")
+
+    if args.update_baseline:
+        baselines[key] = results
+        BASELINE.parent.mkdir(exist_ok=True)
+        BASELINE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline for {key} written to {BASELINE}")
+    elif not baseline:
+        print(f"No baseline for {key}; run with --update-baseline to store one.")
+
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
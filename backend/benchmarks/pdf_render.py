@@ -0,0 +1,92 @@
+"""Compare cold WeasyPrint renders with the warm renderer pool.
+
+Usage (from ``backend/``)::
+
+    python benchmarks/pdf_render.py --rows 2000 --repeat 5
+
+"cold" is the previous export path: one WeasyPrint document for the whole
+report, with the stylesheet parsed and fonts discovered on every render.
+"pooled" is ``reporting.render_pdf``, which uses the warm process pool and
+renders ``PDF_CHUNK_ROWS`` rows per document.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.template.loader import render_to_string  # noqa: E402
+
+from core.services import pdf, reporting  # noqa: E402
+
+PAGE_PATTERN = re.compile(rb"/Type\s*/Page\b(?!s)")
+
+
+def synthetic_rows(count: int) -> list[dict]:
+    return [
+        {
+            "client": f"Client {index % 40}",
+            "project": f"Project {index % 300}",
+            "user": f"user{index % 25}@example.com",
+            "total_minutes": 60 + index % 480,
+            "billable_minutes": 45 + index % 300,
+            "non_billable_minutes": 15 + index % 180,
+            "total_amount": Decimal(index % 9000) / 7,
+        }
+        for index in range(count)
+    ]
+
+
+def render_cold(rows: list[dict]) -> bytes:
+    from weasyprint import CSS, HTML
+    from weasyprint.text.fonts import FontConfiguration
+
+    font_config = FontConfiguration()
+    stylesheet = CSS(string=render_to_string("reports/summary.css"), font_config=font_config)
+    html = render_to_string(
+        "reports/summary.html",
+        {"rows": rows, "show_title": True, "branding": {"title": "Worktrace Report"}},
+    )
+    return HTML(string=html).write_pdf(stylesheets=[stylesheet], font_config=font_config)
+
+
+def measure(label: str, render, rows: list[dict], repeat: int) -> None:
+    pages = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        pages += len(PAGE_PATTERN.findall(render(rows)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:>7}: {pages / repeat:.0f} pages/render, {elapsed / repeat:.3f}s/render, "
+        f"{pages / elapsed:.1f} pages/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    measure("cold", render_cold, rows, args.repeat)
+    # The first pooled render starts and warms the worker processes.
+    reporting.render_pdf(rows[:1])
+    measure("pooled", reporting.render_pdf, rows, args.repeat)
+    pdf.shutdown()
+
+
+if __name__ == "__main__":
+    main()
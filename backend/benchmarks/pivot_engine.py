@@ -0,0 +1,95 @@
+"""Time the NumPy pivot engine on synthetic columnar data.
+
+Usage (from ``backend/``)::
+
+    python benchmarks/pivot_engine.py --rows 2000000 --repeat 5
+
+Only the grouping is timed: the frame is generated in memory, so no database
+is needed. A plain-Python dict aggregation of the same rows is timed once per
+combination for comparison (skip it with ``--no-baseline``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from core.services import pivot  # noqa: E402
+
+COMBINATIONS = (
+    ("project", "user"),
+    ("client", "month", "billable"),
+    ("client", "project", "week"),
+    ("user", "day"),
+)
+
+
+def synthetic_frame(rows: int, seed: int = 7) -> pivot.Frame:
+    generator = np.random.default_rng(seed)
+    project_id = generator.integers(1, 400, rows)
+    start = date(2020, 1, 1).toordinal()
+    minutes = generator.integers(5, 480, rows)
+    return pivot.Frame(
+        project_id=project_id,
+        client_id=project_id % 60 + 1,
+        user_id=generator.integers(1, 120, rows),
+        date_ordinal=generator.integers(start, start + 5 * 365, rows),
+        billable=generator.random(rows) < 0.8,
+        entries=np.ones(rows, dtype=np.int64),
+        minutes=minutes,
+        amount_cents=minutes * generator.integers(40, 150, rows) * 100 // 60,
+        currency=np.zeros(rows, dtype=np.int64),
+        currencies=["EUR"],
+    )
+
+
+def python_baseline(frame: pivot.Frame, group_by) -> int:
+    columns = [pivot.dimension_values(frame, name).tolist() for name in group_by]
+    minutes = frame.minutes.tolist()
+    amounts = frame.amount_cents.tolist()
+    totals: dict = defaultdict(lambda: [0, 0])
+    for index, key in enumerate(zip(*columns)):
+        bucket = totals[key]
+        bucket[0] += minutes[index]
+        bucket[1] += amounts[index]
+    return len(totals)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-baseline", action="store_true")
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.rows)
+    print(f"{len(frame):,} rows")
+    for group_by in COMBINATIONS:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            dimensions, _ = pivot.group(frame, group_by)
+        numpy_seconds = (time.perf_counter() - started) / args.repeat
+        line = f"{' x '.join(group_by):>24}: {len(dimensions[0]):>7,} groups, numpy {numpy_seconds * 1000:8.1f} ms"
+        if not args.no_baseline:
+            started = time.perf_counter()
+            python_baseline(frame, group_by)
+            line += f", python {(time.perf_counter() - started) * 1000:8.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
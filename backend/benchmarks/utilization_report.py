@@ -0,0 +1,97 @@
+"""Time the utilization report with window functions against the Python fallback.
+
+Usage (from ``backend/``, against a scratch database)::
+
+    DATABASE_URL=sqlite:////tmp/utilization.sqlite3 python manage.py migrate
+    DATABASE_URL=sqlite:////tmp/utilization.sqlite3 python benchmarks/utilization_report.py
+
+The first run seeds ``--users`` users with ``--per-week`` entries each for every
+week of ``--years`` years (200 users x 3 years by default) and rebuilds the
+rollups; later runs reuse the seeded rows. Both variants are timed on raw
+entries and on rollups.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+
+from core import models  # noqa: E402
+from core.services import reporting, rollups, utilization  # noqa: E402
+
+START = date(2022, 1, 3)
+EMAIL_DOMAIN = "utilization.bench"
+
+
+def seed(users: int, years: int, per_week: int) -> None:
+    User = get_user_model()
+    if User.objects.filter(email__endswith=EMAIL_DOMAIN).exists():
+        return
+    admin = User.objects.create_superuser(username="bench-admin", email=f"admin@{EMAIL_DOMAIN}", password="x")
+    client = models.Client.objects.create(name="Benchmark client")
+    projects = [
+        models.Project.objects.create(name=f"Project {index}", client=client, created_by=admin) for index in range(20)
+    ]
+    User.objects.bulk_create(
+        User(username=f"bench-{index}", email=f"user{index}@{EMAIL_DOMAIN}") for index in range(users)
+    )
+    weeks = years * 52
+    for index, member in enumerate(User.objects.filter(username__startswith="bench-").exclude(pk=admin.pk)):
+        models.TimeEntry.objects.bulk_create(
+            (
+                models.TimeEntry(
+                    project=projects[(index + slot) % len(projects)],
+                    user=member,
+                    date=START + timedelta(days=week * 7 + slot % 5),
+                    duration_minutes=30 + (index * 7 + week * 13 + slot * 29) % 450,
+                    billable=(index + week + slot) % 5 != 0,
+                    task="Benchmark",
+                )
+                for week in range(weeks)
+                for slot in range(per_week)
+            ),
+            batch_size=5000,
+        )
+    rollups.rebuild()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--per-week", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    seed(args.users, args.years, args.per_week)
+    admin = get_user_model().objects.get(email=f"admin@{EMAIL_DOMAIN}")
+    filters = reporting.ReportFilters()
+    print(f"{models.TimeEntry.objects.count():,} entries, {models.TimeEntryRollup.objects.count():,} rollups")
+    for use_rollups in (False, True):
+        settings.REPORTS_USE_ROLLUPS = use_rollups
+        for use_window in (True, False):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                data = utilization.build(admin, filters, use_window=use_window)
+            seconds = (time.perf_counter() - started) / args.repeat
+            source = "rollups" if use_rollups else "entries"
+            variant = "window" if use_window else "python"
+            print(f"{source:>8} {variant:>7}: {len(data['rows']):,} user weeks in {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
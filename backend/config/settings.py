@@ -20,6 +20,18 @@ env = environ.Env(
     JWT_COOKIE_SECURE=(bool, False),
     TIMEENTRY_ALLOW_OVERLAP=(bool, False),
     SERVE_MEDIA_FILES=(bool, False),
+    REPORTS_USE_ROLLUPS=(bool, True),
+    REPORTS_BASE_CURRENCY=(str, "EUR"),
+    REPORT_EXPORT_TTL_HOURS=(int, 24),
+    REPORT_EXPORT_LEASE_MINUTES=(int, 15),
+    PDF_RENDER_WORKERS=(int, 2),
+    PDF_CHUNK_ROWS=(int, 500),
+    REPORT_CACHE_TIMEOUT=(int, 86400),
+    REPORTS_PARALLEL_MIN_ROWS=(int, 1_000_000),
+    REPORTS_PARALLEL_WORKERS=(int, 0),
+    REPORTS_PARALLEL_MIN_DAYS=(int, 366),
+    UTILIZATION_WEEKLY_CAPACITY_MINUTES=(int, 2400),
+    PACK_FORECAST_WINDOW_DAYS=(int, 28),
 )
 
 ENV_PATH = BASE_DIR.parent / ".env"
@@ -88,6 +100,12 @@ DATABASES = {
     "default": env.db("DATABASE_URL"),
 }
 
+# Per-process memory by default. Report cache invalidation goes through the database, so a
+# shared backend (redis://, which needs the redis package) only saves recomputing per process.
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -191,6 +209,39 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
 TIMEENTRY_ALLOW_OVERLAP = env("TIMEENTRY_ALLOW_OVERLAP")
 
+# Serve reports from the daily TimeEntryRollup table instead of raw entries.
+REPORTS_USE_ROLLUPS = env("REPORTS_USE_ROLLUPS")
+
+# Currency report totals are converted into with the daily FxRate table.
+REPORTS_BASE_CURRENCY = env("REPORTS_BASE_CURRENCY")
+
+# Summaries estimated to read at least this many rows are aggregated in date shards
+# across REPORTS_PARALLEL_WORKERS processes (0 means one per CPU); 0 rows disables it.
+REPORTS_PARALLEL_MIN_ROWS = env("REPORTS_PARALLEL_MIN_ROWS")
+REPORTS_PARALLEL_WORKERS = env("REPORTS_PARALLEL_WORKERS")
+# Rollup-backed summaries over fewer days are never sharded, so they skip the row estimate.
+REPORTS_PARALLEL_MIN_DAYS = env("REPORTS_PARALLEL_MIN_DAYS")
+
+# Billable minutes per user and week that count as full utilization (40 hours).
+UTILIZATION_WEEKLY_CAPACITY_MINUTES = env("UTILIZATION_WEEKLY_CAPACITY_MINUTES")
+
+# Days of recent burn the pack exhaustion forecast is fitted on.
+PACK_FORECAST_WINDOW_DAYS = env("PACK_FORECAST_WINDOW_DAYS")
+
+# Rendered export artifacts are kept this long before purge_report_exports removes them.
+REPORT_EXPORT_TTL = timedelta(hours=env("REPORT_EXPORT_TTL_HOURS"))
+
+# A running export whose worker has not checked in for this long is failed so it can be requested again.
+REPORT_EXPORT_LEASE = timedelta(minutes=env("REPORT_EXPORT_LEASE_MINUTES"))
+
+# Cached reports are invalidated by data generation; the timeout only evicts superseded keys.
+REPORT_CACHE_TIMEOUT = env("REPORT_CACHE_TIMEOUT")
+
+# Size of the warm WeasyPrint process pool; 0 renders PDFs in the calling process.
+PDF_RENDER_WORKERS = env("PDF_RENDER_WORKERS")
+# Summary rows laid out per WeasyPrint document before the pages are merged.
+PDF_CHUNK_ROWS = env("PDF_CHUNK_ROWS")
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
 import pytest
+from django.core.cache import cache
 from model_bakery import baker
 
 from core import models
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def client_obj(db) -> models.Client:
     return baker.make(models.Client, name="Acme Corp", email="client@example.com")
@@ -77,6 +77,12 @@ class HourlyRateAdmin(admin.ModelAdmin):
     raw_id_fields = ("client", "project")
 
 
+@admin.register(models.FxRate)
+class FxRateAdmin(admin.ModelAdmin):
+    list_display = ("date", "currency", "rate")
+    list_filter = ("currency",)
+
+
 @admin.register(models.TimeEntry)
 class TimeEntryAdmin(admin.ModelAdmin):
     list_display = (
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services import account_imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Import client account charges and payments from a CSV or JSON batch. "
+        "The batch is rejected if any row is invalid; rows whose reference the client already has are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON file to read, or - for standard input.")
+        parser.add_argument("--format", choices=("csv", "json"), help="Defaults to the file extension, else csv.")
+        parser.add_argument("--recorded-by", help="Email of the user to record the entries under.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        format = options["format"] or ("json" if path.lower().endswith(".json") else "csv")
+        recorded_by = None
+        if options["recorded_by"]:
+            recorded_by = get_user_model().objects.filter(email=options["recorded_by"]).first()
+            if recorded_by is None:
+                raise CommandError(f"No user with email {options['recorded_by']}.")
+
+        try:
+            if path == "-":
+                rows, first_line = account_imports.read_rows(sys.stdin, format)
+            else:
+                with Path(path).open(newline="", encoding="utf-8-sig") as handle:
+                    rows, first_line = account_imports.read_rows(handle, format)
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}") from exc
+        except ValueError as exc:
+            raise CommandError(f"Cannot parse {path}: {exc}") from exc
+
+        result = account_imports.import_entries(rows, recorded_by=recorded_by, first_line=first_line)
+        if result.errors:
+            for error in result.errors[:20]:
+                line = error.pop("line")
+                self.stderr.write(f"Line {line}: " + "; ".join(f"{name}: {message}" for name, message in error.items()))
+            raise CommandError(f"{len(result.errors)} invalid rows; nothing was imported.")
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported {result.created} account entries, skipped {result.skipped} duplicates.")
+        )
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import csv
+import sys
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services import fx
+
+
+class Command(BaseCommand):
+    help = "Load daily FX rates into the base currency from a CSV file with date,currency,rate columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to read, or - for standard input.")
+
+    def handle(self, *args, **options):
+        if options["path"] == "-":
+            rates = self._parse(sys.stdin)
+        else:
+            try:
+                with open(options["path"], newline="") as handle:
+                    rates = self._parse(handle)
+            except OSError as exc:
+                raise CommandError(f"Cannot read {options['path']}: {exc}") from exc
+
+        written = fx.load(rates)
+        self.stdout.write(self.style.SUCCESS(f"Loaded {written} FX rates."))
+
+    def _parse(self, handle) -> list[tuple[date, str, Decimal]]:
+        rates = []
+        for line, row in enumerate(csv.DictReader(handle), start=2):
+            try:
+                rate = Decimal(row["rate"])
+                if rate <= 0:
+                    raise ValueError("rate must be positive")
+                rates.append((date.fromisoformat(row["date"]), row["currency"].strip().upper(), rate))
+            except (KeyError, TypeError, ValueError, InvalidOperation) as exc:
+                raise CommandError(f"Line {line}: {exc}") from exc
+        return rates
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from core.services import exports
+
+
+class Command(BaseCommand):
+    help = "Delete expired report export artifacts and stale failed jobs."
+
+    def handle(self, *args, **options):
+        purged = exports.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} exports."))
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily report rollups from the raw time entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project",
+            type=int,
+            action="append",
+            dest="projects",
+            help="Only rebuild this project (may be repeated).",
+        )
+        parser.add_argument("--from", dest="date_from", help="First date to rebuild (YYYY-MM-DD).")
+        parser.add_argument("--to", dest="date_to", help="Last date to rebuild (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        try:
+            date_from = date.fromisoformat(options["date_from"]) if options["date_from"] else None
+            date_to = date.fromisoformat(options["date_to"]) if options["date_to"] else None
+        except ValueError as exc:
+            raise CommandError(f"Invalid date: {exc}") from exc
+
+        written = rollups.rebuild(options["projects"], date_from=date_from, date_to=date_to)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollup rows."))
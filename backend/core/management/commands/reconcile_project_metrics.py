@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services import project_metrics
+
+
+class Command(BaseCommand):
+    help = "Compare projects' logged minutes and last logged time with their time entries and repair any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drift, and exit with an error if there is any.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = project_metrics.reconcile(repair=not options["check"])
+        for drift in drifted:
+            self.stdout.write(
+                f"Project {drift.project_id}: {drift.stored_minutes} min, last {drift.stored_last_logged_at} "
+                f"-> {drift.actual_minutes} min, last {drift.actual_last_logged_at}"
+            )
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("Project metrics match their time entries."))
+            return
+        projects = "1 project" if len(drifted) == 1 else f"{len(drifted)} projects"
+        if options["check"]:
+            raise CommandError(f"{projects} {'has' if len(drifted) == 1 else 'have'} drifted.")
+        self.stdout.write(self.style.SUCCESS(f"Repaired {projects}."))
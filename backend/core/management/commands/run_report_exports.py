@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.services import exports
+
+
+class Command(BaseCommand):
+    help = "Render queued report exports and purge expired artifacts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the pending jobs and exit instead of polling.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep when the queue is empty (default: 5).",
+        )
+        parser.add_argument(
+            "--purge-every",
+            type=float,
+            default=3600.0,
+            help="Seconds between purges of expired exports (default: 3600).",
+        )
+
+    def handle(self, *args, **options):
+        next_purge = 0.0
+        while True:
+            close_old_connections()
+            if time.monotonic() >= next_purge:
+                purged = exports.purge_expired()
+                if purged:
+                    self.stdout.write(f"Purged {purged} expired exports.")
+                next_purge = time.monotonic() + options["purge_every"]
+
+            processed = exports.run_pending()
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f"Processed {processed} exports."))
+            if options["once"]:
+                return
+            if not processed:
+                time.sleep(options["interval"])
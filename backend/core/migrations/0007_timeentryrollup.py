@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    """Build the initial rollups with the rate rules of this migration's models."""
+    TimeEntry = apps.get_model("core", "TimeEntry")
+    TimeEntryRollup = apps.get_model("core", "TimeEntryRollup")
+    HourlyRate = apps.get_model("core", "HourlyRate")
+    Project = apps.get_model("core", "Project")
+
+    zero = Decimal("0.00")
+    projects = {
+        pk: (client_id, hourly_rate)
+        for pk, client_id, hourly_rate in Project.objects.values_list("pk", "client_id", "hourly_rate")
+    }
+    rates: dict[tuple, list] = {}
+    for rate in HourlyRate.objects.order_by("-effective_from", "-id"):
+        target = ("project", rate.project_id) if rate.project_id else ("client", rate.client_id)
+        rates.setdefault(target, []).append(rate)
+
+    def rate_for(project_id, client_id, on):
+        for target in (("project", project_id), ("client", client_id)):
+            for rate in rates.get(target, ()):
+                if rate.effective_from <= on and (rate.effective_to is None or rate.effective_to >= on):
+                    return rate.amount_decimal
+        return None
+
+    def amount(minutes, rate):
+        return ((Decimal(minutes) / Decimal(60)) * rate).quantize(Decimal("0.01"))
+
+    buckets: dict[tuple, object] = {}
+    groups = (
+        TimeEntry.objects.order_by()
+        .values("project_id", "user_id", "date", "billable", "duration_minutes")
+        .annotate(entries=models.Count("id"))
+    )
+    for group in groups.iterator(chunk_size=2000):
+        key = (group["project_id"], group["user_id"], group["date"], group["billable"])
+        client_id, default_rate = projects[group["project_id"]]
+        rate = rate_for(group["project_id"], client_id, group["date"])
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TimeEntryRollup(
+                project_id=key[0],
+                user_id=key[1],
+                date=key[2],
+                billable=key[3],
+                rated=rate is not None,
+                total_amount=zero,
+                default_rate_amount=zero,
+            )
+        count = group["entries"]
+        bucket.entry_count += count
+        bucket.total_minutes += group["duration_minutes"] * count
+        if rate is not None:
+            bucket.total_amount += amount(group["duration_minutes"], rate) * count
+        elif default_rate is not None:
+            bucket.default_rate_amount += amount(group["duration_minutes"], default_rate) * count
+    TimeEntryRollup.objects.bulk_create(buckets.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("core", "0006_clientaccounentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TimeEntryRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("billable", models.BooleanField()),
+                ("entry_count", models.PositiveIntegerField(default=0)),
+                ("total_minutes", models.PositiveIntegerField(default=0)),
+                ("rated", models.BooleanField(default=False, help_text="Whether an hourly rate was in force for the project on this date.")),
+                ("total_amount", models.DecimalField(decimal_places=2, default=0, help_text="Sum of per-entry amounts at the effective hourly rate.", max_digits=14)),
+                ("default_rate_amount", models.DecimalField(decimal_places=2, default=0, help_text="Sum of per-entry amounts at the project rate when no hourly rate applies.", max_digits=14)),
+                ("project", models.ForeignKey(on_delete=models.deletion.CASCADE, related_name="daily_rollups", to="core.project")),
+                ("user", models.ForeignKey(on_delete=models.deletion.CASCADE, related_name="daily_rollups", to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="timeentryrollup",
+            index=models.Index(fields=["user", "date"], name="core_timeen_user_id_00932f_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="timeentryrollup",
+            index=models.Index(fields=["date"], name="core_timeen_date_4069f4_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="timeentryrollup",
+            constraint=models.UniqueConstraint(fields=("project", "user", "date", "billable"), name="time_entry_rollup_unique_bucket"),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
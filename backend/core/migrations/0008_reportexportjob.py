@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("core", "0007_timeentryrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReportExportJob",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("format", models.CharField(choices=[("csv", "Summary CSV"), ("pdf", "Summary PDF"), ("entries.csv", "Entries CSV"), ("entries.ndjson", "Entries NDJSON")], max_length=20)),
+                ("filters", models.JSONField(blank=True, default=dict)),
+                ("fingerprint", models.CharField(help_text="Hash of the requester scope, format and filters used to share artifacts.", max_length=64)),
+                ("status", models.CharField(choices=[("pending", "Pending"), ("running", "Running"), ("done", "Done"), ("failed", "Failed")], default="pending", max_length=20)),
+                ("artifact", models.FileField(blank=True, upload_to="exports/")),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("expires_at", models.DateTimeField(blank=True, null=True)),
+                ("requested_by", models.ForeignKey(on_delete=models.deletion.CASCADE, related_name="report_exports", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "ordering": ("-created_at",),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="reportexportjob",
+            index=models.Index(fields=["fingerprint", "status"], name="core_report_fingerp_46c2df_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="reportexportjob",
+            index=models.Index(fields=["status", "created_at"], name="core_report_status_471d79_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="reportexportjob",
+            index=models.Index(fields=["expires_at"], name="core_report_expires_84b165_idx"),
+        ),
+    ]
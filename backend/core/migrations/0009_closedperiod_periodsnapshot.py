@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("core", "0008_reportexportjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClosedPeriod",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("month", models.DateField(help_text="First day of the closed month.", unique=True)),
+                ("closed_at", models.DateTimeField(auto_now_add=True)),
+                ("closed_by", models.ForeignKey(blank=True, null=True, on_delete=models.deletion.SET_NULL, related_name="closed_periods", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "ordering": ("-month",),
+            },
+        ),
+        migrations.CreateModel(
+            name="PeriodSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("billable", models.BooleanField()),
+                ("entry_count", models.PositiveIntegerField(default=0)),
+                ("total_minutes", models.PositiveIntegerField(default=0)),
+                ("total_amount", models.DecimalField(decimal_places=2, default=0, help_text="Sum of per-entry amounts at the hourly rate in force when the period was closed.", max_digits=14)),
+                ("last_date", models.DateField()),
+                ("period", models.ForeignKey(on_delete=models.deletion.CASCADE, related_name="snapshots", to="core.closedperiod")),
+                ("project", models.ForeignKey(on_delete=models.deletion.CASCADE, related_name="period_snapshots", to="core.project")),
+                ("user", models.ForeignKey(on_delete=models.deletion.CASCADE, related_name="period_snapshots", to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="periodsnapshot",
+            constraint=models.UniqueConstraint(fields=("period", "project", "user", "billable"), name="period_snapshot_unique_bucket"),
+        ),
+    ]
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_currencies(apps, schema_editor):
+    """Tag existing rollups and snapshots with the currency their amounts were priced in."""
+    TimeEntryRollup = apps.get_model("core", "TimeEntryRollup")
+    PeriodSnapshot = apps.get_model("core", "PeriodSnapshot")
+    HourlyRate = apps.get_model("core", "HourlyRate")
+    Project = apps.get_model("core", "Project")
+
+    projects = {
+        pk: (client_id, currency)
+        for pk, client_id, currency in Project.objects.values_list("pk", "client_id", "currency")
+    }
+    rates: dict[tuple, list] = {}
+    for rate in HourlyRate.objects.order_by("-effective_from", "-id"):
+        target = ("project", rate.project_id) if rate.project_id else ("client", rate.client_id)
+        rates.setdefault(target, []).append(rate)
+
+    def currency_for(project_id, client_id, on):
+        for target in (("project", project_id), ("client", client_id)):
+            for rate in rates.get(target, ()):
+                if rate.effective_from <= on and (rate.effective_to is None or rate.effective_to >= on):
+                    return rate.currency
+        return None
+
+    changed = []
+    for rollup in TimeEntryRollup.objects.only("project_id", "date", "rated").iterator(chunk_size=2000):
+        client_id, currency = projects[rollup.project_id]
+        if rollup.rated:
+            currency = currency_for(rollup.project_id, client_id, rollup.date) or currency
+        if currency != rollup.currency:
+            rollup.currency = currency
+            changed.append(rollup)
+    TimeEntryRollup.objects.bulk_update(changed, ["currency"], batch_size=1000)
+
+    base = settings.REPORTS_BASE_CURRENCY
+    for snapshot in PeriodSnapshot.objects.only("project_id", "total_amount").iterator(chunk_size=2000):
+        snapshot.currency = projects[snapshot.project_id][1]
+        snapshot.base_amount = snapshot.total_amount if snapshot.currency == base else None
+        snapshot.save(update_fields=["currency", "base_amount"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_closedperiod_periodsnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FxRate",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("currency", models.CharField(max_length=8)),
+                ("rate", models.DecimalField(decimal_places=8, max_digits=18)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ("-date", "currency"),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="fxrate",
+            constraint=models.UniqueConstraint(fields=("currency", "date"), name="fx_rate_unique_day"),
+        ),
+        migrations.AddField(
+            model_name="timeentryrollup",
+            name="currency",
+            field=models.CharField(default="EUR", help_text="Currency of the amounts: the hourly rate's, or the project's when none applies.", max_length=8),
+        ),
+        migrations.AddField(
+            model_name="periodsnapshot",
+            name="currency",
+            field=models.CharField(default="EUR", max_length=8),
+        ),
+        migrations.AddField(
+            model_name="periodsnapshot",
+            name="base_amount",
+            field=models.DecimalField(blank=True, decimal_places=2, help_text="total_amount in the base currency at the FX rates known at closing; empty if one was missing.", max_digits=14, null=True),
+        ),
+        migrations.RemoveConstraint(
+            model_name="periodsnapshot",
+            name="period_snapshot_unique_bucket",
+        ),
+        migrations.AddConstraint(
+            model_name="periodsnapshot",
+            constraint=models.UniqueConstraint(fields=("period", "project", "user", "billable", "currency"), name="period_snapshot_unique_bucket"),
+        ),
+        migrations.RunPython(backfill_currencies, migrations.RunPython.noop),
+    ]
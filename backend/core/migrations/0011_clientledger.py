@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_fxrate_currencies"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClientLedger",
+            fields=[
+                ("client", models.OneToOneField(on_delete=models.deletion.CASCADE, primary_key=True, related_name="ledger", serialize=False, to="core.client")),
+                ("currency", models.CharField(default="EUR", max_length=8)),
+                ("account_charged", models.DecimalField(decimal_places=2, default=0, help_text="Sum of the charges recorded on the client account.", max_digits=14)),
+                ("total_paid", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("pack_total_due", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("hourly_total_due", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("by_currency", models.JSONField(blank=True, default=dict)),
+                ("pack_projects", models.JSONField(blank=True, default=list)),
+                ("hourly_projects", models.JSONField(blank=True, default=list)),
+                ("stale", models.BooleanField(default=False, help_text="Set by writes that change the totals until the ledger is recomputed.")),
+                ("refreshed_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
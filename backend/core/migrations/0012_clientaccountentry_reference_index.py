@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_clientledger"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="clientaccountentry",
+            index=models.Index(fields=["reference"], name="core_client_referen_537672_idx"),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_clientaccountentry_reference_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReportGeneration",
+            fields=[
+                ("key", models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ("generation", models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_reportgeneration"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reportexportjob",
+            name="heartbeat_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Last time the worker rendering the export checked in.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timezone
+
+from django.db import migrations, models
+
+HELP_TEXT = "Date and start of the newest entry, the key summaries order last activity by."
+
+
+def backfill_last_activity(apps, schema_editor):
+    """Fill the sort key from the entries of each rollup's day and each snapshot's last date."""
+    TimeEntry = apps.get_model("core", "TimeEntry")
+    TimeEntryRollup = apps.get_model("core", "TimeEntryRollup")
+    PeriodSnapshot = apps.get_model("core", "PeriodSnapshot")
+
+    missing = time.max if schema_editor.connection.features.nulls_order_largest else time.min
+    activity: dict[tuple, datetime] = {}
+    groups = (
+        TimeEntry.objects.order_by()
+        .values("project_id", "user_id", "date", "billable")
+        .annotate(
+            newest_start=models.Max("start"),
+            untimed=models.Count("id", filter=models.Q(start__isnull=True)),
+        )
+    )
+    for group in groups.iterator(chunk_size=2000):
+        start = group["newest_start"]
+        if start is None:
+            start = missing
+        elif group["untimed"]:
+            start = max(start, missing)
+        key = (group["project_id"], group["user_id"], group["date"], group["billable"])
+        activity[key] = datetime.combine(group["date"], start, tzinfo=timezone.utc)
+
+    def fill(model, date_field):
+        rows = []
+        for row in model.objects.all().iterator(chunk_size=2000):
+            day = getattr(row, date_field)
+            key = (row.project_id, row.user_id, day, row.billable)
+            row.last_activity = activity.get(key) or datetime.combine(day, missing, tzinfo=timezone.utc)
+            rows.append(row)
+        model.objects.bulk_update(rows, ["last_activity"], batch_size=1000)
+
+    fill(TimeEntryRollup, "date")
+    fill(PeriodSnapshot, "last_date")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_reportexportjob_heartbeat_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="timeentryrollup",
+            name="last_activity",
+            field=models.DateTimeField(help_text=HELP_TEXT, null=True),
+        ),
+        migrations.AddField(
+            model_name="periodsnapshot",
+            name="last_activity",
+            field=models.DateTimeField(help_text=HELP_TEXT, null=True),
+        ),
+        migrations.RunPython(backfill_last_activity, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="timeentryrollup",
+            name="last_activity",
+            field=models.DateTimeField(help_text=HELP_TEXT),
+        ),
+        migrations.AlterField(
+            model_name="periodsnapshot",
+            name="last_activity",
+            field=models.DateTimeField(help_text=HELP_TEXT),
+        ),
+    ]
@@ -6,7 +6,7 @@ from datetime import date, datetime, time, timedelta
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -114,6 +114,7 @@ class ClientAccountEntry(models.Model):
         indexes = [
             models.Index(fields=("client", "entry_type")),
             models.Index(fields=("client", "occurred_at")),
+            models.Index(fields=("reference",)),
         ]
 
     def __str__(self) -> str:
@@ -126,6 +127,51 @@ class ClientAccountEntry(models.Model):
         return -self.amount
 
 
+class ClientLedger(models.Model):
+    """Precomputed account totals of a client.
+
+    Time entry and account entry writes adjust it by their amounts; rate and
+    project changes mark it stale and it is recomputed once they commit. See
+    :mod:`core.services.ledgers`.
+    """
+
+    client = models.OneToOneField(
+        Client,
+        related_name="ledger",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    currency = models.CharField(max_length=8, default="EUR")
+    account_charged = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text=_("Sum of the charges recorded on the client account."),
+    )
+    total_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    pack_total_due = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    hourly_total_due = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    by_currency = models.JSONField(default=dict, blank=True)
+    pack_projects = models.JSONField(default=list, blank=True)
+    hourly_projects = models.JSONField(default=list, blank=True)
+    stale = models.BooleanField(
+        default=False,
+        help_text=_("Set by writes that change the totals until the ledger is recomputed."),
+    )
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.client} ledger"
+
+    @property
+    def total_charged(self):
+        return self.account_charged + self.pack_total_due + self.hourly_total_due
+
+    @property
+    def balance(self):
+        return self.total_charged - self.total_paid
+
+
 class SystemSettings(models.Model):
     id = models.PositiveSmallIntegerField(primary_key=True, default=1, editable=False)
     company_name = models.CharField(max_length=255, blank=True)
@@ -334,6 +380,28 @@ class HourlyRate(models.Model):
         return f"{target} - {self.amount_decimal} {self.currency}"
 
 
+class FxRate(models.Model):
+    """Daily exchange rate of ``currency`` into ``REPORTS_BASE_CURRENCY``.
+
+    ``rate`` is what one unit of ``currency`` is worth in the base currency.
+    Loaded with the ``load_fx_rates`` management command.
+    """
+
+    date = models.DateField()
+    currency = models.CharField(max_length=8)
+    rate = models.DecimalField(max_digits=18, decimal_places=8)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("-date", "currency")
+        constraints = [
+            models.UniqueConstraint(fields=("currency", "date"), name="fx_rate_unique_day"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.date} {self.currency} {self.rate}"
+
+
 class TimeEntryQuerySet(models.QuerySet):
     def billable(self) -> "TimeEntryQuerySet":
         return self.filter(billable=True)
@@ -410,9 +478,25 @@ class TimeEntry(models.Model):
         ):
             self._ensure_no_overlap()
 
+        self.ensure_open_period()
+
+    def ensure_open_period(self) -> None:
+        previous = None
+        if self.pk:
+            previous = TimeEntry.objects.filter(pk=self.pk).values_list("date", flat=True).first()
+        if ClosedPeriod.covers(self.date, previous):
+            raise ValidationError(_("Time entries in a closed period cannot be changed."))
+
     def save(self, *args, **kwargs) -> None:
         self.full_clean()
-        super().save(*args, **kwargs)
+        # Report rollups are updated from the save signals; keep them in the
+        # same transaction as the entry itself.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        self.ensure_open_period()
+        return super().delete(*args, **kwargs)
 
     @staticmethod
     def _calculate_duration(
@@ -468,6 +552,220 @@ class TimeEntry(models.Model):
                 raise ValidationError(_("Time entry overlaps with an existing one."))
 
 
+class TimeEntryRollup(models.Model):
+    """Daily totals of time entries per project, user and billable flag.
+
+    Maintained from the TimeEntry signals and rebuilt with the
+    ``rebuild_report_rollups`` management command.
+    """
+
+    project = models.ForeignKey(
+        Project,
+        related_name="daily_rollups",
+        on_delete=models.CASCADE,
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="daily_rollups",
+        on_delete=models.CASCADE,
+    )
+    date = models.DateField()
+    billable = models.BooleanField()
+    entry_count = models.PositiveIntegerField(default=0)
+    total_minutes = models.PositiveIntegerField(default=0)
+    rated = models.BooleanField(
+        default=False,
+        help_text=_("Whether an hourly rate was in force for the project on this date."),
+    )
+    currency = models.CharField(
+        max_length=8,
+        default="EUR",
+        help_text=_("Currency of the amounts: the hourly rate's, or the project's when none applies."),
+    )
+    total_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text=_("Sum of per-entry amounts at the effective hourly rate."),
+    )
+    default_rate_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text=_("Sum of per-entry amounts at the project rate when no hourly rate applies."),
+    )
+    last_activity = models.DateTimeField(
+        help_text=_("Date and start of the newest entry, the key summaries order last activity by."),
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("project", "user", "date", "billable"),
+                name="time_entry_rollup_unique_bucket",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=("user", "date")),
+            models.Index(fields=("date",)),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.project_id}/{self.user_id} {self.date} ({self.total_minutes} min)"
+
+
+class ReportGeneration(models.Model):
+    """Data generation that cached reports are keyed on; see :mod:`core.services.report_cache`.
+
+    ``key`` is ``global`` or ``client:<id>``. Kept in the database rather than
+    the cache so bumps from any process, worker or management command are seen
+    by every web worker whatever the cache backend.
+    """
+
+    key = models.CharField(max_length=32, primary_key=True)
+    generation = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.key} @ {self.generation}"
+
+
+class ReportExportJob(models.Model):
+    """A report export rendered in the background by ``run_report_exports``."""
+
+    class Format(models.TextChoices):
+        SUMMARY_CSV = "csv", _("Summary CSV")
+        SUMMARY_PDF = "pdf", _("Summary PDF")
+        ENTRIES_CSV = "entries.csv", _("Entries CSV")
+        ENTRIES_NDJSON = "entries.ndjson", _("Entries NDJSON")
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        RUNNING = "running", _("Running")
+        DONE = "done", _("Done")
+        FAILED = "failed", _("Failed")
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="report_exports",
+        on_delete=models.CASCADE,
+    )
+    format = models.CharField(max_length=20, choices=Format.choices)
+    filters = models.JSONField(default=dict, blank=True)
+    fingerprint = models.CharField(
+        max_length=64,
+        help_text=_("Hash of the requester scope, format and filters used to share artifacts."),
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    artifact = models.FileField(upload_to="exports/", blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("Last time the worker rendering the export checked in."),
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=("fingerprint", "status")),
+            models.Index(fields=("status", "created_at")),
+            models.Index(fields=("expires_at",)),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.format} export #{self.pk} ({self.status})"
+
+
+class ClosedPeriod(models.Model):
+    """A calendar month whose reports are frozen into PeriodSnapshot rows.
+
+    Time entries dated in a closed month can no longer be created, changed
+    or deleted until the period is reopened.
+    """
+
+    month = models.DateField(unique=True, help_text=_("First day of the closed month."))
+    closed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="closed_periods",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+    closed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("-month",)
+
+    def __str__(self) -> str:
+        return self.month.strftime("%Y-%m")
+
+    @classmethod
+    def covers(cls, *days: date | None) -> bool:
+        """Whether any of ``days`` falls in a closed month."""
+        months = {day.replace(day=1) for day in days if day}
+        return bool(months) and cls.objects.filter(month__in=months).exists()
+
+
+class PeriodSnapshot(models.Model):
+    """Report totals of a closed month per project, user, billable flag and currency."""
+
+    period = models.ForeignKey(
+        ClosedPeriod,
+        related_name="snapshots",
+        on_delete=models.CASCADE,
+    )
+    project = models.ForeignKey(
+        Project,
+        related_name="period_snapshots",
+        on_delete=models.CASCADE,
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="period_snapshots",
+        on_delete=models.CASCADE,
+    )
+    billable = models.BooleanField()
+    entry_count = models.PositiveIntegerField(default=0)
+    total_minutes = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text=_("Sum of per-entry amounts at the hourly rate in force when the period was closed."),
+    )
+    currency = models.CharField(max_length=8, default="EUR")
+    base_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text=_("total_amount in the base currency at the FX rates known at closing; empty if one was missing."),
+    )
+    last_date = models.DateField()
+    last_activity = models.DateTimeField(
+        help_text=_("Date and start of the newest entry, the key summaries order last activity by."),
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("period", "project", "user", "billable", "currency"),
+                name="period_snapshot_unique_bucket",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.period} {self.project_id}/{self.user_id} ({self.total_minutes} min)"
+
+
 class TimeEntryTimerQuerySet(models.QuerySet):
     def active(self) -> "TimeEntryTimerQuerySet":
         return self.filter(
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class AccountEntryPagination(BasePagination):
+    """Keyset pagination of account entries, newest first.
+
+    The cursor is the ``(occurred_at, created_at, id)`` of the last entry
+    served, so deep pages cost the same as the first one and entries recorded
+    meanwhile never shift or repeat rows.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    ordering = ("-occurred_at", "-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            occurred_at, created_at, pk = position
+            queryset = queryset.filter(
+                Q(occurred_at__lt=occurred_at)
+                | Q(occurred_at=occurred_at, created_at__lt=created_at)
+                | Q(occurred_at=occurred_at, created_at=created_at, pk__lt=pk)
+            )
+        rows = list(queryset[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def decode_cursor(self, request) -> tuple[date, datetime, int] | None:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            occurred_at, created_at, pk = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            return date.fromisoformat(occurred_at), datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, entry) -> str:
+        position = [entry.occurred_at.isoformat(), entry.created_at.isoformat(), entry.pk]
+        encoded = urlsafe_b64encode(json.dumps(position).encode("ascii")).decode("ascii")
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from typing import Any
-
+from django.db.models import Exists, OuterRef, Q
 from rest_framework.permissions import SAFE_METHODS, BasePermission
 
+from . import models
+
 
 class IsAdmin(BasePermission):
     """Allows access only to admin role users."""
@@ -38,3 +39,26 @@ def user_is_assigned_to_project(user, project) -> bool:
     return project.assignments.filter(user=user, is_active=True).exists()
 
 
+def visible_projects_filter(user, project_lookup: str | None = "project") -> Q:
+    """
+    Filter for rows whose project a client user may see: their client's
+    projects and the ones they are actively assigned to.
+
+    Assignments are matched with an EXISTS subquery, so the filter never fans
+    rows out and the queryset needs no ``distinct()``. ``project_lookup`` is
+    the path to the project from the filtered model, or ``None`` when
+    filtering projects themselves.
+    """
+    if user.is_admin:
+        return Q()
+    prefix = f"{project_lookup}__" if project_lookup else ""
+    assigned = Exists(
+        models.ProjectAssignment.objects.filter(
+            project_id=OuterRef(f"{project_lookup}_id" if project_lookup else "pk"),
+            user=user,
+            is_active=True,
+        )
+    )
+    if not user.client_id:
+        return Q(assigned)
+    return Q(assigned) | Q(**{f"{prefix}client_id": user.client_id})
@@ -2,22 +2,19 @@ from .auth import LoginSerializer, UserSerializer
 from .client import (
     ClientAccountEntrySerializer,
     ClientAccountSummarySerializer,
+    ClientBalanceSerializer,
     ClientPaymentCreateSerializer,
     ClientSerializer,
 )
-from .project import (
-    HourlyRateSerializer,
-    ProjectAssignmentSerializer,
-    ProjectSerializer,
-    ProjectStatusUpdateSerializer,
+from .project import HourlyRateSerializer, ProjectAssignmentSerializer, ProjectSerializer, ProjectStatusUpdateSerializer
+from .reports import (
+    ClosedPeriodSerializer,
+    ReportExportJobSerializer,
+    ReportExportRequestSerializer,
+    ReportSummarySerializer,
 )
 from .settings import SystemSettingsSerializer
-from .timeentry import (
-    TimeEntrySerializer,
-    TimeEntryTimerSerializer,
-    TimeEntryTimerStopSerializer,
-)
-from .reports import ReportSummarySerializer
+from .timeentry import TimeEntrySerializer, TimeEntryTimerSerializer, TimeEntryTimerStopSerializer
 
 __all__ = [
     "LoginSerializer",
@@ -25,6 +22,7 @@ __all__ = [
     "ClientSerializer",
     "ClientAccountEntrySerializer",
     "ClientAccountSummarySerializer",
+    "ClientBalanceSerializer",
     "ClientPaymentCreateSerializer",
     "ProjectSerializer",
     "ProjectAssignmentSerializer",
@@ -34,6 +32,9 @@ __all__ = [
     "TimeEntryTimerSerializer",
     "TimeEntryTimerStopSerializer",
     "ReportSummarySerializer",
+    "ReportExportJobSerializer",
+    "ReportExportRequestSerializer",
+    "ClosedPeriodSerializer",
     "SystemSettingsSerializer",
 ]
 
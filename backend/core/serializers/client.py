@@ -143,7 +143,7 @@ class ClientAccountSummarySerializer(serializers.Serializer):
     total_charged = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
     total_paid = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
     currency = serializers.CharField(read_only=True)
-    entries = ClientAccountEntrySerializer(many=True, read_only=True)
+    by_currency = serializers.DictField(read_only=True)
     pack_total_due = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
     pack_projects = serializers.SerializerMethodField()
     hourly_total_due = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
@@ -156,6 +156,19 @@ class ClientAccountSummarySerializer(serializers.Serializer):
         return obj.get("hourly_projects", [])
 
 
+class ClientBalanceSerializer(serializers.Serializer):
+    client = serializers.IntegerField(source="client_id", read_only=True)
+    name = serializers.CharField(source="client__name", read_only=True)
+    is_active = serializers.BooleanField(source="client__is_active", read_only=True)
+    currency = serializers.CharField(read_only=True)
+    balance = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    total_charged = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    total_paid = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    pack_total_due = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    hourly_total_due = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    by_currency = serializers.DictField(read_only=True)
+
+
 class ClientPaymentCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.ClientAccountEntry
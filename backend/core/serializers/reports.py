@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+from django.urls import reverse
 from rest_framework import serializers
 
+from .. import models
+from ..services import reporting
+
 
 class ReportSummarySerializer(serializers.Serializer):
     client = serializers.CharField(allow_null=True)
@@ -11,5 +15,71 @@ class ReportSummarySerializer(serializers.Serializer):
     billable_minutes = serializers.IntegerField()
     non_billable_minutes = serializers.IntegerField()
     total_amount = serializers.DecimalField(max_digits=12, decimal_places=2, allow_null=True)
+    amounts = serializers.DictField(child=serializers.DecimalField(max_digits=12, decimal_places=2))
+    base_amount = serializers.DecimalField(max_digits=12, decimal_places=2, allow_null=True)
+    base_currency = serializers.CharField()
+
+
+class ReportExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = models.ReportExportJob
+        fields = (
+            "id",
+            "format",
+            "status",
+            "filters",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+            "expires_at",
+            "download_url",
+        )
+        read_only_fields = fields
+
+    def get_download_url(self, obj: models.ReportExportJob):
+        if obj.status != models.ReportExportJob.Status.DONE:
+            return None
+        url = reverse("reportexport-download", args=[obj.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+
+class ReportExportRequestSerializer(serializers.Serializer):
+    """An export format and the report filters, under the report query parameter names."""
+
+    format = serializers.ChoiceField(choices=models.ReportExportJob.Format.choices)
+    client = serializers.IntegerField(required=False, allow_null=True)
+    project = serializers.IntegerField(required=False, allow_null=True)
+    user = serializers.IntegerField(required=False, allow_null=True)
+    billable = serializers.BooleanField(required=False, allow_null=True)
+    ordering = serializers.ChoiceField(
+        choices=[f"{prefix}{name}" for name in reporting.SUMMARY_ORDERINGS for prefix in ("", "-")],
+        required=False,
+        allow_null=True,
+        allow_blank=True,
+    )
+
+    def get_fields(self):
+        # "from" is a keyword, so the date range fields cannot be declared as attributes.
+        fields = super().get_fields()
+        fields["from"] = serializers.DateField(required=False, allow_null=True)
+        fields["to"] = serializers.DateField(required=False, allow_null=True)
+        return fields
+
+
+class ClosedPeriodSerializer(serializers.ModelSerializer):
+    month = serializers.DateField(input_formats=["%Y-%m", "iso-8601"], format="%Y-%m")
+    closed_by_email = serializers.EmailField(source="closed_by.email", read_only=True, allow_null=True)
+    snapshot_rows = serializers.SerializerMethodField()
 
+    class Meta:
+        model = models.ClosedPeriod
+        fields = ("id", "month", "closed_by", "closed_by_email", "closed_at", "snapshot_rows")
+        read_only_fields = ("id", "closed_by", "closed_by_email", "closed_at", "snapshot_rows")
 
+    def get_snapshot_rows(self, obj: models.ClosedPeriod) -> int:
+        count = getattr(obj, "snapshot_count", None)
+        return obj.snapshots.count() if count is None else count
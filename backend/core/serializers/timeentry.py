@@ -7,6 +7,7 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
 from .. import models, permissions
+from ..services import money, rates
 
 
 class TimeEntrySerializer(serializers.ModelSerializer):
@@ -57,6 +58,10 @@ class TimeEntrySerializer(serializers.ModelSerializer):
         request = self.context["request"]
         project = attrs.get("project") or getattr(self.instance, "project", None)
         user = attrs.get("user") or getattr(self.instance, "user", None)
+        if models.ClosedPeriod.covers(attrs.get("date"), getattr(self.instance, "date", None)):
+            raise serializers.ValidationError(
+                {"date": _("Time entries in a closed period cannot be changed.")}
+            )
 
         if request.user.is_admin:
             if user and project and not models.ProjectAssignment.objects.filter(
@@ -78,28 +83,28 @@ class TimeEntrySerializer(serializers.ModelSerializer):
             )
         return attrs
 
-    def _resolve_rate(self, entry: models.TimeEntry) -> Optional[tuple[Decimal, str]]:
-        if entry.project.billing_type != models.Project.BillingType.HOURLY:
-            return None
-
-        date = entry.date
-
-        project_rates = entry.project.hourly_rates.all()
-        client_rates = entry.project.client.hourly_rates.all() if entry.project.client else []
+    def _rate_timeline(self) -> rates.RateTimeline:
+        timeline = getattr(self, "_timeline", None)
+        if timeline is None:
+            timeline = self._timeline = rates.get_timeline()
+        return timeline
 
-        for rate in project_rates:
-            if rate.effective_from <= date and (not rate.effective_to or rate.effective_to >= date):
-                return rate.amount_decimal, rate.currency
-
-        for rate in client_rates:
-            if rate.effective_from <= date and (not rate.effective_to or rate.effective_to >= date):
-                return rate.amount_decimal, rate.currency
-
-        if entry.project.hourly_rate is not None:
-            amount = Decimal(entry.project.hourly_rate)
-            return amount, entry.project.currency
-
-        return None
+    def _resolve_rate(self, entry: models.TimeEntry) -> Optional[tuple[Decimal, str]]:
+        # The rate, amount and currency fields of one entry are serialized back to back.
+        resolved = getattr(self, "_resolved", None)
+        if resolved is not None and resolved[0] is entry:
+            return resolved[1]
+        rate = rates.billing_rate(
+            self._rate_timeline(),
+            project_id=entry.project_id,
+            client_id=entry.project.client_id,
+            billing_type=entry.project.billing_type,
+            default_rate=entry.project.hourly_rate,
+            default_currency=entry.project.currency,
+            on=entry.date,
+        )
+        self._resolved = (entry, rate)
+        return rate
 
     def get_hourly_rate(self, entry: models.TimeEntry) -> Optional[str]:
         result = self._resolve_rate(entry)
@@ -122,8 +127,7 @@ class TimeEntrySerializer(serializers.ModelSerializer):
         if result is None or not entry.billable:
             return None
         amount, _ = result
-        value = (Decimal(entry.duration_minutes) / Decimal(60)) * amount
-        return f"{value.quantize(Decimal('0.01'))}"
+        return f"{money.entry_amount(entry.duration_minutes, amount)}"
 
 
 class TimeEntryTimerSerializer(serializers.ModelSerializer):
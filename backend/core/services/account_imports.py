@@ -0,0 +1,174 @@
+"""Bulk import of client account charges and payments, e.g. from bank statements.
+
+A batch is validated as a whole before anything is written: every row is
+parsed in one pass, clients are checked with a single query and references
+already on record are looked up in chunks. An invalid row rejects the batch;
+rows whose ``(client, reference)`` is already recorded, or repeated earlier in
+the batch, are skipped, so re-importing a statement is harmless. Valid rows are
+inserted with ``bulk_create`` in chunks inside one transaction, which skips the
+model signals, so the ledgers and cached reports of the affected clients are
+invalidated here.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import IO, Iterable
+
+from django.db import transaction
+
+from .. import models
+from . import ledgers, money, report_cache
+
+CHUNK_SIZE = 2000
+# References looked up per query, under SQLite's bound-parameter limit.
+LOOKUP_CHUNK_SIZE = 900
+FIELDS = (
+    "client",
+    "entry_type",
+    "amount",
+    "currency",
+    "occurred_at",
+    "reference",
+    "description",
+    "payment_method",
+    "notes",
+)
+MAX_AMOUNT = Decimal("9999999999.99")
+_LENGTHS = {
+    name: models.ClientAccountEntry._meta.get_field(name).max_length
+    for name in ("currency", "reference", "description", "payment_method")
+}
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    skipped: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+
+def read_rows(handle: IO[str], format: str) -> tuple[list[dict], int]:
+    """Rows of a ``csv`` or ``json`` batch and the line number of the first one.
+
+    CSV columns are named in a header line; JSON is a list of objects, or an
+    object holding one under ``entries``.
+    """
+    if format == "csv":
+        return list(csv.DictReader(handle)), 2
+    if format != "json":
+        raise ValueError("Format must be csv or json.")
+    return rows_from_json(json.load(handle)), 1
+
+
+def rows_from_json(data) -> list[dict]:
+    if isinstance(data, dict):
+        data = data.get("entries")
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise ValueError("Expected a list of entry objects.")
+    return data
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _parse_row(row: dict, today: date) -> tuple[dict, dict[str, str]]:
+    errors: dict[str, str] = {}
+    values = {name: _text(row.get(name)) for name in FIELDS}
+
+    try:
+        values["client"] = int(values["client"])
+    except ValueError:
+        errors["client"] = "A client id is required."
+    entry_type = values["entry_type"].lower()
+    if entry_type not in models.ClientAccountEntry.EntryType.values:
+        errors["entry_type"] = "Must be charge or payment."
+    values["entry_type"] = entry_type
+    try:
+        amount = Decimal(values["amount"])
+        if not amount.is_finite() or amount <= 0 or amount > MAX_AMOUNT or amount != amount.quantize(money.CENT):
+            raise InvalidOperation
+        values["amount"] = amount
+    except InvalidOperation:
+        errors["amount"] = "Must be a positive amount with at most two decimals."
+    try:
+        values["occurred_at"] = date.fromisoformat(values["occurred_at"]) if values["occurred_at"] else today
+    except ValueError:
+        errors["occurred_at"] = "Must be a date (YYYY-MM-DD)."
+    values["currency"] = values["currency"].upper() or "EUR"
+    for name, limit in _LENGTHS.items():
+        if len(values[name]) > limit:
+            errors[name] = f"At most {limit} characters."
+    return values, errors
+
+
+def _recorded_references(rows: list[dict]) -> set[tuple[int, str]]:
+    wanted = {(row["client"], row["reference"]) for row in rows if row["reference"]}
+    references = sorted({reference for _, reference in wanted})
+    found: set[tuple[int, str]] = set()
+    for start in range(0, len(references), LOOKUP_CHUNK_SIZE):
+        found.update(
+            models.ClientAccountEntry.objects.filter(
+                reference__in=references[start : start + LOOKUP_CHUNK_SIZE],
+            ).values_list("client_id", "reference")
+        )
+    return found & wanted
+
+
+def import_entries(rows: Iterable[dict], recorded_by=None, first_line: int = 1) -> ImportResult:
+    """Validate ``rows`` and record them unless any is invalid.
+
+    Rows are dicts keyed by :data:`FIELDS`; ``client`` is a client id and
+    ``occurred_at`` defaults to today. Errors carry the row's ``line``,
+    counted from ``first_line``.
+    """
+    result = ImportResult()
+    today = date.today()
+    parsed = []
+    for line, row in enumerate(rows, start=first_line):
+        values, errors = _parse_row(row, today)
+        if errors:
+            result.errors.append({"line": line, **errors})
+        parsed.append((line, values))
+
+    client_ids = {values["client"] for _, values in parsed if isinstance(values["client"], int)}
+    known = set(models.Client.objects.filter(pk__in=client_ids).values_list("pk", flat=True))
+    result.errors.extend(
+        {"line": line, "client": f"Client {values['client']} does not exist."}
+        for line, values in parsed
+        if isinstance(values["client"], int) and values["client"] not in known
+    )
+    if result.errors:
+        result.errors.sort(key=lambda error: error["line"])
+        return result
+
+    rows = [values for _, values in parsed]
+    seen = _recorded_references(rows)
+    entries = []
+    for values in rows:
+        key = (values["client"], values["reference"])
+        if values["reference"] and key in seen:
+            result.skipped += 1
+            continue
+        seen.add(key)
+        entries.append(
+            models.ClientAccountEntry(
+                client_id=values.pop("client"),
+                recorded_by=recorded_by,
+                **values,
+            )
+        )
+
+    with transaction.atomic():
+        for start in range(0, len(entries), CHUNK_SIZE):
+            models.ClientAccountEntry.objects.bulk_create(entries[start : start + CHUNK_SIZE])
+        touched = {entry.client_id for entry in entries}
+        report_cache.invalidate(*touched)
+        ledgers.record_account_entries(entries)
+    result.created = len(entries)
+    return result
@@ -0,0 +1,208 @@
+"""Receivables aging: every client's outstanding balance by age of the amounts due.
+
+Amounts due are account charges (dated ``occurred_at``), agreed pack values
+(dated by project creation) and billable hourly work (dated by entry). Each
+source is one query grouped by client, with one filtered sum per age bucket,
+so the report costs the same handful of queries however many clients there
+are. Amounts are kept per currency and payments settle the oldest amounts
+due in their own currency first.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+
+from .. import models
+from . import money, reporting, rollups
+
+# (label, youngest, oldest) age in days, inclusive; amounts dated after ``as_of`` are left out.
+BUCKETS = (
+    ("0-30", None, 30),
+    ("31-60", 31, 60),
+    ("61-90", 61, 90),
+    ("90+", 91, None),
+)
+
+
+def _bucket_filters(field: str, as_of: date) -> list[Q]:
+    filters = []
+    for _, youngest, oldest in BUCKETS:
+        condition = Q(**{f"{field}__lte": as_of})
+        if youngest is not None:
+            condition &= Q(**{f"{field}__lte": as_of - timedelta(days=youngest)})
+        if oldest is not None:
+            condition &= Q(**{f"{field}__gte": as_of - timedelta(days=oldest)})
+        filters.append(condition)
+    return filters
+
+
+def _add(dues: dict, client_id: int, currency: str, index: int, cents: int) -> None:
+    dues.setdefault((client_id, currency), [0] * len(BUCKETS))[index] += cents
+
+
+def _account_totals(clients, as_of: date) -> tuple[dict, dict]:
+    charge = Q(entry_type=models.ClientAccountEntry.EntryType.CHARGE)
+    payment = Q(entry_type=models.ClientAccountEntry.EntryType.PAYMENT, occurred_at__lte=as_of)
+    buckets = _bucket_filters("occurred_at", as_of)
+    groups = (
+        models.ClientAccountEntry.objects.filter(client__in=clients)
+        .order_by()
+        .values("client_id", "currency")
+        .annotate(
+            paid=Sum("amount", filter=payment),
+            **{f"due_{index}": Sum("amount", filter=charge & bucket) for index, bucket in enumerate(buckets)},
+        )
+    )
+    dues: dict = {}
+    paid = {}
+    for group in groups:
+        key = (group["client_id"], group["currency"])
+        paid[key] = money.to_cents(group["paid"])
+        for index in range(len(BUCKETS)):
+            _add(dues, *key, index, money.to_cents(group[f"due_{index}"]))
+    return dues, paid
+
+
+def _pack_dues(clients, as_of: date, dues: dict) -> None:
+    buckets = _bucket_filters("created_at__date", as_of)
+    groups = (
+        models.Project.objects.filter(
+            client__in=clients,
+            billing_type=models.Project.BillingType.PACK,
+            pack_total_value__gt=0,
+        )
+        .order_by()
+        .values("client_id", "currency")
+        .annotate(**{f"due_{index}": Sum("pack_total_value", filter=bucket) for index, bucket in enumerate(buckets)})
+    )
+    for group in groups:
+        for index in range(len(BUCKETS)):
+            _add(dues, group["client_id"], group["currency"], index, money.to_cents(group[f"due_{index}"]))
+
+
+def _hourly_rollup_dues(clients, as_of: date, dues: dict) -> None:
+    buckets = _bucket_filters("date", as_of)
+    amount = F("total_amount") + F("default_rate_amount")
+    groups = (
+        models.TimeEntryRollup.objects.filter(
+            project__client__in=clients,
+            project__billing_type=models.Project.BillingType.HOURLY,
+            billable=True,
+        )
+        .filter(Q(rated=True) | Q(project__hourly_rate__isnull=False))
+        .order_by()
+        .values("project__client_id", "currency")
+        .annotate(**{f"due_{index}": Sum(amount, filter=bucket) for index, bucket in enumerate(buckets)})
+    )
+    for group in groups:
+        for index in range(len(BUCKETS)):
+            _add(dues, group["project__client_id"], group["currency"], index, money.to_cents(group[f"due_{index}"]))
+
+
+def _hourly_entry_dues(clients, as_of: date, dues: dict) -> None:
+    # Grouped by what the per-entry amount depends on, as in reporting.entry_partials.
+    bucket = Case(
+        *(When(condition, then=Value(index)) for index, condition in enumerate(_bucket_filters("date", as_of))),
+        output_field=IntegerField(),
+    )
+    entries = models.TimeEntry.objects.filter(
+        project__client__in=clients,
+        project__billing_type=models.Project.BillingType.HOURLY,
+        billable=True,
+        date__lte=as_of,
+    )
+    groups = (
+        reporting.annotate_effective_currency(reporting.annotate_effective_rate(entries))
+        .annotate(bucket=bucket)
+        .order_by()
+        .values(
+            "project__client_id",
+            "bucket",
+            "duration_minutes",
+            "effective_rate",
+            "effective_currency",
+            "project__hourly_rate",
+        )
+        .annotate(entries=Count("id"))
+    )
+    for group in groups:
+        rate = group["effective_rate"] if group["effective_rate"] is not None else group["project__hourly_rate"]
+        if rate is None:
+            continue
+        cents = money.entry_cents(group["duration_minutes"], money.to_cents(rate)) * group["entries"]
+        _add(dues, group["project__client_id"], group["effective_currency"], group["bucket"], cents)
+
+
+def settle(dues: list[int], paid: int) -> tuple[list[int], int]:
+    """Apply ``paid`` to ``dues`` oldest bucket first; return what is left and any unused credit."""
+    outstanding = list(dues)
+    for index in reversed(range(len(outstanding))):
+        applied = min(outstanding[index], paid)
+        outstanding[index] -= applied
+        paid -= applied
+    return outstanding, paid
+
+
+def visible_clients(user):
+    clients = models.Client.objects.all()
+    if getattr(user, "is_admin", False):
+        return clients
+    if getattr(user, "client_id", None):
+        return clients.filter(pk=user.client_id)
+    return clients.none()
+
+
+def build(user, as_of: date | None = None) -> dict:
+    """Return each visible client's balance per currency split into age buckets, plus the totals per currency.
+
+    Clients without any amounts get one zero row in ``REPORTS_BASE_CURRENCY``.
+    """
+    as_of = as_of or date.today()
+    scope = visible_clients(user)
+
+    dues, paid = _account_totals(scope, as_of)
+    _pack_dues(scope, as_of, dues)
+    if rollups.can_serve():
+        _hourly_rollup_dues(scope, as_of, dues)
+    else:
+        _hourly_entry_dues(scope, as_of, dues)
+
+    currencies: dict[int, set[str]] = {}
+    for client_id, currency in [*dues, *paid]:
+        currencies.setdefault(client_id, set()).add(currency)
+
+    labels = [label for label, _, _ in BUCKETS]
+    totals: dict[str, list[int]] = {}
+    rows = []
+    for client_id, name in scope.values_list("pk", "name"):
+        for currency in sorted(currencies.get(client_id, {settings.REPORTS_BASE_CURRENCY})):
+            key = (client_id, currency)
+            charged = dues.get(key, [0] * len(BUCKETS))
+            outstanding, credit = settle(charged, paid.get(key, 0))
+            totals[currency] = [
+                total + cents for total, cents in zip(totals.get(currency, [0] * len(BUCKETS)), outstanding)
+            ]
+            rows.append(
+                {
+                    "client_id": client_id,
+                    "client": name,
+                    "currency": currency,
+                    "total_charged": str(money.from_cents(sum(charged))),
+                    "total_paid": str(money.from_cents(paid.get(key, 0))),
+                    "balance": str(money.from_cents(sum(charged) - paid.get(key, 0))),
+                    "credit": str(money.from_cents(credit)),
+                    "buckets": {label: str(money.from_cents(cents)) for label, cents in zip(labels, outstanding)},
+                }
+            )
+    return {
+        "as_of": as_of.isoformat(),
+        "buckets": labels,
+        "rows": rows,
+        "totals": {
+            currency: {label: str(money.from_cents(cents)) for label, cents in zip(labels, amounts)}
+            for currency, amounts in sorted(totals.items())
+        },
+    }
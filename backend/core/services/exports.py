@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import tempfile
+from dataclasses import asdict
+from datetime import datetime
+from typing import Callable, Iterable, NamedTuple
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .. import models
+from . import report_cache, reporting
+
+logger = logging.getLogger(__name__)
+
+Job = models.ReportExportJob
+STALE_ERROR = "The export worker stopped before finishing."
+
+
+class ExportFormat(NamedTuple):
+    filename: str
+    content_type: str
+    # Called with the user, the filters and a callback to keep the job alive during a long step.
+    render: Callable[[object, reporting.ReportFilters, Callable[[], None]], Iterable[str | bytes]]
+
+
+FORMATS = {
+    Job.Format.SUMMARY_CSV: ExportFormat(
+        "worktrace-report.csv",
+        "text/csv",
+        lambda user, filters, tick: reporting.iter_csv(
+            reporting.iter_summary(user, filters), reporting.SUMMARY_FIELDS
+        ),
+    ),
+    Job.Format.SUMMARY_PDF: ExportFormat(
+        "worktrace-report.pdf",
+        "application/pdf",
+        lambda user, filters, tick: [reporting.render_pdf(reporting.summarize(user, filters), tick)],
+    ),
+    Job.Format.ENTRIES_CSV: ExportFormat(
+        "worktrace-entries.csv",
+        "text/csv",
+        lambda user, filters, tick: reporting.iter_csv(
+            reporting.iter_entries(user, filters), reporting.ENTRY_FIELDS
+        ),
+    ),
+    Job.Format.ENTRIES_NDJSON: ExportFormat(
+        "worktrace-entries.ndjson",
+        "application/x-ndjson",
+        lambda user, filters, tick: reporting.iter_ndjson(reporting.iter_entries(user, filters)),
+    ),
+}
+
+
+def visible_jobs(user):
+    jobs = Job.objects.all()
+    if getattr(user, "is_admin", False):
+        return jobs
+    return jobs.filter(requested_by=user)
+
+
+def fingerprint(user, export_format: str, filters: reporting.ReportFilters) -> str:
+    """Hash what determines an export's content.
+
+    Admins all see the same data, so their exports are shared; everyone else
+    gets a per-user scope because client visibility depends on assignments.
+    The report cache generation makes any data change start a new export.
+    """
+    scope = "admin" if getattr(user, "is_admin", False) else f"user:{user.pk}"
+    payload = json.dumps(
+        {
+            "scope": scope,
+            "format": export_format,
+            "filters": asdict(filters),
+            "generation": report_cache.generation_token(user, filters),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _stale(now: datetime) -> Q:
+    """Running jobs whose worker has not checked in within the lease."""
+    cutoff = now - settings.REPORT_EXPORT_LEASE
+    return Q(status=Job.Status.RUNNING) & (
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+
+
+def request_export(user, export_format: str, filters: reporting.ReportFilters) -> tuple[Job, bool]:
+    """Return a job for the export, reusing a pending, live or unexpired one when possible."""
+    key = fingerprint(user, export_format, filters)
+    now = timezone.now()
+    existing = (
+        Job.objects.filter(fingerprint=key)
+        .filter(
+            Q(status=Job.Status.PENDING)
+            | (Q(status=Job.Status.RUNNING) & ~_stale(now))
+            | Q(status=Job.Status.DONE, expires_at__gt=now)
+        )
+        .order_by("-created_at")
+        .first()
+    )
+    if existing is not None:
+        return existing, False
+    job = Job.objects.create(
+        requested_by=user,
+        format=export_format,
+        filters=asdict(filters),
+        fingerprint=key,
+    )
+    return job, True
+
+
+def fail_stale(now: datetime | None = None) -> int:
+    """Fail running jobs whose worker died, so purge_expired eventually removes them."""
+    now = now or timezone.now()
+    return Job.objects.filter(_stale(now)).update(status=Job.Status.FAILED, error=STALE_ERROR, finished_at=now)
+
+
+def claim_next() -> Job | None:
+    """Fail stale running jobs, then mark the oldest pending job as running and return it."""
+    fail_stale()
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.PENDING)
+            .order_by("created_at", "pk")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = Job.Status.RUNNING
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.save(update_fields=["status", "started_at", "heartbeat_at"])
+    return job
+
+
+def heartbeat(job: Job) -> None:
+    """Extend ``job``'s lease if a quarter of it has passed since the last check-in."""
+    now = timezone.now()
+    if job.heartbeat_at is None or now - job.heartbeat_at >= settings.REPORT_EXPORT_LEASE / 4:
+        job.heartbeat_at = now
+        Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING).update(heartbeat_at=now)
+
+
+def _finish(job: Job, **fields) -> bool:
+    """Record ``job``'s outcome unless it stopped running meanwhile, e.g. failed as stale."""
+    finished = Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING).update(**fields)
+    if finished:
+        for name, value in fields.items():
+            setattr(job, name, value)
+    else:
+        job.refresh_from_db()
+    return bool(finished)
+
+
+def run(job: Job) -> Job:
+    """Render ``job`` into its artifact and record the outcome.
+
+    A job that was failed as stale while it rendered stays failed and its
+    artifact is discarded.
+    """
+    export = FORMATS[job.format]
+    try:
+        filters = reporting.ReportFilters(**job.filters)
+        with tempfile.TemporaryFile() as buffer:
+            for chunk in export.render(job.requested_by, filters, lambda: heartbeat(job)):
+                buffer.write(chunk.encode() if isinstance(chunk, str) else chunk)
+                heartbeat(job)
+            buffer.seek(0)
+            job.artifact.save(f"{job.pk}-{export.filename}", File(buffer), save=False)
+    except Exception as exc:
+        logger.exception("Report export %s failed", job.pk)
+        _finish(job, status=Job.Status.FAILED, error=str(exc), finished_at=timezone.now())
+        return job
+
+    artifact, now = job.artifact.name, timezone.now()
+    if not _finish(
+        job, artifact=artifact, status=Job.Status.DONE, finished_at=now, expires_at=now + settings.REPORT_EXPORT_TTL
+    ):
+        logger.warning("Report export %s was no longer running when it finished; discarding its artifact", job.pk)
+        job.artifact.storage.delete(artifact)
+    return job
+
+
+def run_pending(limit: int | None = None) -> int:
+    """Process pending jobs until the queue is empty or ``limit`` is reached."""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next()
+        if job is None:
+            break
+        run(job)
+        processed += 1
+    return processed
+
+
+def purge_expired(now: datetime | None = None) -> int:
+    """Fail stale running jobs, then delete expired artifacts and failed jobs older than the export TTL."""
+    now = now or timezone.now()
+    fail_stale(now)
+    expired = Job.objects.filter(
+        Q(status=Job.Status.DONE, expires_at__lte=now)
+        | Q(status=Job.Status.FAILED, finished_at__lte=now - settings.REPORT_EXPORT_TTL)
+    )
+    purged = 0
+    for job in expired.iterator():
+        if job.artifact:
+            job.artifact.delete(save=False)
+        job.delete()
+        purged += 1
+    return purged
@@ -0,0 +1,108 @@
+"""Daily FX rates into the base currency, held in memory and indexed by date.
+
+Report amounts keep the currency they were priced in. Base-currency totals
+convert each day's amount per project, user, billable flag and currency at
+the latest rate on or before that day, so rates only need loading for the
+days they change and aggregation never goes back to the database per row.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .. import models
+from . import money, report_cache
+
+
+class FxTable:
+    """Rates per currency as parallel sorted date and rate lists."""
+
+    def __init__(self, rates: Iterable[tuple], base: str, fingerprint: tuple | None = None) -> None:
+        self.base = base
+        self.fingerprint = fingerprint
+        series: dict[str, list[tuple[date, Decimal]]] = defaultdict(list)
+        for currency, day, rate in rates:
+            series[currency].append((day, rate))
+        self._days: dict[str, list[date]] = {}
+        self._rates: dict[str, list[Decimal]] = {}
+        for currency, points in series.items():
+            points.sort()
+            self._days[currency] = [day for day, _ in points]
+            self._rates[currency] = [rate for _, rate in points]
+
+    def rate_on(self, currency: str, on: date) -> Decimal | None:
+        """Base-currency value of one unit of ``currency`` on ``on``, if a rate is known by then."""
+        if currency == self.base:
+            return Decimal(1)
+        days = self._days.get(currency)
+        if not days:
+            return None
+        index = bisect_right(days, on) - 1
+        if index < 0:
+            return None
+        return self._rates[currency][index]
+
+    def convert(self, cents: int, currency: str, on: date) -> int | None:
+        """``cents`` of ``currency`` in base-currency cents, rounded to the cent."""
+        if currency == self.base or not cents:
+            return cents
+        rate = self.rate_on(currency, on)
+        if rate is None:
+            return None
+        return money.to_cents((money.from_cents(cents) * rate).quantize(money.CENT))
+
+
+_table: FxTable | None = None
+
+
+def _fingerprint() -> tuple:
+    aggregates = models.FxRate.objects.aggregate(count=Count("id"), changed=Max("updated_at"))
+    return settings.REPORTS_BASE_CURRENCY, aggregates["count"], aggregates["changed"]
+
+
+def get_table() -> FxTable:
+    """Return the process-wide table, reloading it if the rates or the base currency changed."""
+    global _table
+    fingerprint = _fingerprint()
+    if _table is not None and _table.fingerprint == fingerprint:
+        return _table
+    rates = models.FxRate.objects.values_list("currency", "date", "rate")
+    _table = FxTable(rates, settings.REPORTS_BASE_CURRENCY, fingerprint=fingerprint)
+    return _table
+
+
+def invalidate() -> None:
+    global _table
+    _table = None
+
+
+def load(rates: Iterable[tuple[date, str, Decimal]]) -> int:
+    """Insert or replace ``(date, currency, rate)`` rows; returns how many were written.
+
+    Bulk upserts skip the model signals, so the table and cached reports are
+    invalidated here.
+    """
+    now = timezone.now()
+    rows = [
+        models.FxRate(date=day, currency=currency, rate=rate, updated_at=now)
+        for day, currency, rate in rates
+        if currency != settings.REPORTS_BASE_CURRENCY
+    ]
+    models.FxRate.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=("currency", "date"),
+        update_fields=("rate", "updated_at"),
+    )
+    invalidate()
+    report_cache.invalidate(*models.Client.objects.values_list("pk", flat=True))
+    return len(rows)
@@ -0,0 +1,380 @@
+"""Persisted client account totals.
+
+A client's ledger holds what the account endpoint shows: account charges and
+payments, agreed pack values and billable hourly work, in total, per currency
+and per project.
+
+Time entry and account entry writes apply their signed amount to the one
+project and currency they touch, under a lock on the ledger row, so a write
+costs the same however long the client's history is. Hourly rate and project
+changes can reprice past work: they mark the affected ledgers stale right away
+and recompute them once the transaction commits, and a ledger read while stale
+is recomputed on the spot. Ledgers are computed in batches from grouped
+queries, so refreshing or listing many clients costs the same number of
+queries as one.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Callable, Iterable
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+from .. import models
+from . import money, rates, reporting
+
+ZERO = Decimal("0.00")
+CENT = Decimal("0.01")
+CURRENCY_FIELDS = ("charged", "paid", "pack_due", "hourly_due")
+ENTRY_FIELDS = ("project_id", "date", "billable", "duration_minutes")
+ACCOUNT_FIELDS = ("client_id", "entry_type", "amount", "currency", "occurred_at")
+LEDGER_FIELDS = (
+    "currency",
+    "account_charged",
+    "total_paid",
+    "pack_total_due",
+    "hourly_total_due",
+    "by_currency",
+    "pack_projects",
+    "hourly_projects",
+)
+
+
+def _latest_currency(client_id) -> Subquery:
+    """Currency of the client's newest account entry, in the order the entries are listed."""
+    entries = models.ClientAccountEntry.objects.filter(client_id=client_id).order_by("-occurred_at", "-created_at")
+    return Subquery(entries.values("currency")[:1])
+
+
+def _account_totals(client_ids: list[int]) -> dict[int, tuple[dict[str, list[Decimal]], str | None]]:
+    groups = (
+        models.ClientAccountEntry.objects.filter(client_id__in=client_ids)
+        .order_by()
+        .values("client_id", "currency")
+        .annotate(
+            charged=Sum("amount", filter=Q(entry_type=models.ClientAccountEntry.EntryType.CHARGE)),
+            paid=Sum("amount", filter=Q(entry_type=models.ClientAccountEntry.EntryType.PAYMENT)),
+            latest_currency=_latest_currency(OuterRef("client_id")),
+        )
+    )
+    totals: dict[int, dict[str, list[Decimal]]] = {}
+    latest: dict[int, str] = {}
+    for group in groups:
+        client_id = group["client_id"]
+        totals.setdefault(client_id, {})[group["currency"]] = [group["charged"] or ZERO, group["paid"] or ZERO]
+        latest[client_id] = group["latest_currency"]
+    return {client_id: (totals[client_id], latest[client_id]) for client_id in totals}
+
+
+def _pack_projects(client_ids: list[int]) -> dict[int, list[dict]]:
+    projects = models.Project.objects.filter(
+        client_id__in=client_ids,
+        billing_type=models.Project.BillingType.PACK,
+        pack_total_value__gt=0,
+    ).values("id", "client_id", "name", "pack_hours", "pack_total_value", "currency", "status")
+    grouped: dict[int, list[dict]] = {}
+    for project in projects:
+        client_id = project.pop("client_id")
+        grouped.setdefault(client_id, []).append(
+            {
+                **project,
+                "pack_hours": format(project["pack_hours"], "f") if project["pack_hours"] is not None else None,
+                "pack_total_value": format(project["pack_total_value"], "f"),
+            }
+        )
+    return grouped
+
+
+def _hourly_payload(project_id: int, name: str, minutes: int, amount: Decimal, currency: str) -> dict:
+    return {
+        "id": project_id,
+        "name": name,
+        "billable_minutes": minutes,
+        "billable_hours": format((Decimal(minutes) / Decimal(60)).quantize(CENT), "f"),
+        "amount": format(amount.quantize(CENT), "f"),
+        "currency": currency,
+    }
+
+
+def _by_name(projects: Iterable[dict]) -> list[dict]:
+    return sorted(projects, key=lambda project: (project["name"], project["id"]))
+
+
+def _hourly_projects(client_ids: list[int]) -> dict[int, list[dict]]:
+    return {
+        client_id: _by_name(
+            _hourly_payload(data["id"], data["name"], data["billable_minutes"], data["amount"], data["currency"])
+            for data in dues
+        )
+        for client_id, dues in reporting.hourly_dues_by_client(client_ids).items()
+    }
+
+
+def _currency_totals(totals: dict[str, Decimal]) -> dict[str, str] | None:
+    # Currencies with nothing charged, paid or due are left out.
+    if not any(totals.values()):
+        return None
+    return {
+        **{field: format(amount, "f") for field, amount in totals.items()},
+        "balance": format(totals["charged"] + totals["pack_due"] + totals["hourly_due"] - totals["paid"], "f"),
+    }
+
+
+def _ledger_currency(account_currency: str | None, pack_projects: list, hourly_projects: list) -> str:
+    return (
+        account_currency
+        or next((project["currency"] for project in pack_projects), None)
+        or next((project["currency"] for project in hourly_projects), None)
+        or "EUR"
+    )
+
+
+def _ledger_fields(accounts: dict, account_currency: str | None, pack_projects: list, hourly_projects: list) -> dict:
+    by_currency: dict[str, dict[str, Decimal]] = {}
+
+    def add(currency: str, field: str, amount: Decimal) -> None:
+        totals = by_currency.setdefault(currency, dict.fromkeys(CURRENCY_FIELDS, ZERO))
+        totals[field] += amount
+
+    for currency, (charged, paid) in accounts.items():
+        add(currency, "charged", charged)
+        add(currency, "paid", paid)
+    for project in pack_projects:
+        add(project["currency"], "pack_due", Decimal(project["pack_total_value"]))
+    for project in hourly_projects:
+        add(project["currency"], "hourly_due", Decimal(project["amount"]))
+
+    by_currency = {currency: _currency_totals(totals) for currency, totals in sorted(by_currency.items())}
+    return {
+        "currency": _ledger_currency(account_currency, pack_projects, hourly_projects),
+        "account_charged": sum((charged for charged, _ in accounts.values()), ZERO),
+        "total_paid": sum((paid for _, paid in accounts.values()), ZERO),
+        "pack_total_due": sum((Decimal(project["pack_total_value"]) for project in pack_projects), ZERO),
+        "hourly_total_due": sum((Decimal(project["amount"]) for project in hourly_projects), ZERO),
+        "by_currency": {currency: totals for currency, totals in by_currency.items() if totals},
+        "pack_projects": pack_projects,
+        "hourly_projects": hourly_projects,
+    }
+
+
+def compute_many(client_ids: Iterable[int]) -> dict[int, dict]:
+    """Ledger field values per client id, from the same four grouped queries however many clients."""
+    client_ids = list(client_ids)
+    accounts = _account_totals(client_ids)
+    pack_projects = _pack_projects(client_ids)
+    hourly_projects = _hourly_projects(client_ids)
+    return {
+        client_id: _ledger_fields(
+            *accounts.get(client_id, ({}, None)),
+            pack_projects.get(client_id, []),
+            hourly_projects.get(client_id, []),
+        )
+        for client_id in client_ids
+    }
+
+
+def compute(client_id: int) -> dict:
+    """Field values of ``client_id``'s ledger."""
+    return compute_many([client_id])[client_id]
+
+
+def refresh(*client_ids: int) -> None:
+    """Recompute the ledgers of the clients among ``client_ids`` that still exist, in one upsert."""
+    if not client_ids:
+        return
+    existing = list(models.Client.objects.filter(pk__in=set(client_ids)).values_list("pk", flat=True))
+    now = timezone.now()
+    models.ClientLedger.objects.bulk_create(
+        [
+            models.ClientLedger(client_id=client_id, **fields, stale=False, refreshed_at=now)
+            for client_id, fields in compute_many(existing).items()
+        ],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=("client",),
+        update_fields=(*LEDGER_FIELDS, "stale", "refreshed_at"),
+    )
+
+
+def ensure(clients) -> None:
+    """Recompute the missing or stale ledgers among ``clients`` (a Client queryset)."""
+    refresh(*clients.exclude(ledger__stale=False).values_list("pk", flat=True))
+
+
+def _refresh_stale(client_ids: set[int]) -> None:
+    # Several writes in one transaction schedule the same clients; the first refresh clears the flag.
+    stale = models.ClientLedger.objects.filter(client_id__in=client_ids, stale=True)
+    refresh(*stale.values_list("client_id", flat=True))
+
+
+def invalidate(*client_ids: int | None) -> None:
+    """Mark the ledgers of ``client_ids`` stale now and recompute them once the transaction commits.
+
+    Clients without a ledger yet get theirs on first read.
+    """
+    ids = {pk for pk in client_ids if pk}
+    if ids:
+        models.ClientLedger.objects.filter(client_id__in=ids).update(stale=True)
+        transaction.on_commit(lambda: _refresh_stale(ids))
+
+
+def _adjust(client_id: int, apply: Callable[[models.ClientLedger], None]) -> None:
+    # Missing ledgers are computed on first read and stale ones are about to be, so both are left alone.
+    with transaction.atomic():
+        ledger = models.ClientLedger.objects.select_for_update().filter(client_id=client_id, stale=False).first()
+        if ledger is not None:
+            apply(ledger)
+            ledger.save()
+
+
+def _add_to_currency(ledger: models.ClientLedger, currency: str, field: str, amount: Decimal) -> None:
+    stored = ledger.by_currency.get(currency, {})
+    totals = {name: Decimal(stored.get(name, ZERO)) for name in CURRENCY_FIELDS}
+    totals[field] += amount
+    by_currency = {**ledger.by_currency, currency: _currency_totals(totals)}
+    ledger.by_currency = {name: totals for name, totals in sorted(by_currency.items()) if totals}
+
+
+def _newest_account_currency(client_id: int) -> str | None:
+    entries = models.ClientAccountEntry.objects.filter(client_id=client_id).order_by("-occurred_at", "-created_at")
+    return entries.values_list("currency", flat=True).first()
+
+
+def _hourly_delta(state: dict) -> tuple[dict, int] | None:
+    """The entry's hourly project (with its ``client_id``) and billed cents, if it is billed hourly."""
+    if not state["billable"]:
+        return None
+    project = (
+        models.Project.objects.filter(pk=state["project_id"], billing_type=models.Project.BillingType.HOURLY)
+        .values("client_id", "name", "hourly_rate", "currency")
+        .first()
+    )
+    if project is None:
+        return None
+    rate = rates.get_timeline().rate_for(state["project_id"], project["client_id"], state["date"])
+    rate = rate[0] if rate is not None else project["hourly_rate"]
+    if rate is None:
+        return None
+    return project, money.entry_cents(state["duration_minutes"], money.to_cents(rate))
+
+
+def _apply_entry(state: dict, sign: int) -> None:
+    delta = _hourly_delta(state)
+    if delta is None:
+        return
+    project, cents = delta
+    minutes, amount = sign * state["duration_minutes"], money.from_cents(sign * cents)
+
+    def apply(ledger: models.ClientLedger) -> None:
+        projects = {payload["id"]: payload for payload in ledger.hourly_projects}
+        current = projects.pop(state["project_id"], None)
+        total_minutes = minutes + (current["billable_minutes"] if current else 0)
+        total_amount = amount + (Decimal(current["amount"]) if current else ZERO)
+        if total_minutes > 0:
+            projects[state["project_id"]] = _hourly_payload(
+                state["project_id"], project["name"], total_minutes, total_amount, project["currency"]
+            )
+        ledger.hourly_projects = _by_name(projects.values())
+        ledger.hourly_total_due += amount
+        _add_to_currency(ledger, project["currency"], "hourly_due", amount)
+        if current is None or total_minutes <= 0:
+            ledger.currency = _ledger_currency(
+                _newest_account_currency(ledger.client_id), ledger.pack_projects, ledger.hourly_projects
+            )
+
+    _adjust(project["client_id"], apply)
+
+
+def record_entry(entry: models.TimeEntry, previous: dict | None) -> None:
+    """Move a saved entry's hourly amount from its ``previous`` state to its current one."""
+    current = {field: getattr(entry, field) for field in ENTRY_FIELDS}
+    if previous is not None:
+        if {field: previous[field] for field in ENTRY_FIELDS} == current:
+            return
+        _apply_entry(previous, -1)
+    _apply_entry(current, 1)
+
+
+def discard_entry(entry: models.TimeEntry) -> None:
+    _apply_entry({field: getattr(entry, field) for field in ENTRY_FIELDS}, -1)
+
+
+def _apply_account_entries(states: Iterable[dict], sign: int) -> None:
+    by_client: dict[int, list[dict]] = {}
+    for state in states:
+        by_client.setdefault(state["client_id"], []).append(state)
+
+    def apply(ledger: models.ClientLedger) -> None:
+        for state in by_client[ledger.client_id]:
+            amount = sign * state["amount"]
+            if state["entry_type"] == models.ClientAccountEntry.EntryType.CHARGE:
+                ledger.account_charged += amount
+                _add_to_currency(ledger, state["currency"], "charged", amount)
+            else:
+                ledger.total_paid += amount
+                _add_to_currency(ledger, state["currency"], "paid", amount)
+        ledger.currency = _ledger_currency(
+            _newest_account_currency(ledger.client_id), ledger.pack_projects, ledger.hourly_projects
+        )
+
+    for client_id in by_client:
+        _adjust(client_id, apply)
+
+
+def record_account_entries(entries: Iterable[models.ClientAccountEntry]) -> None:
+    """Add new account entries, e.g. a bulk-created batch, to their clients' ledgers."""
+    _apply_account_entries(({field: getattr(entry, field) for field in ACCOUNT_FIELDS} for entry in entries), 1)
+
+
+def record_account_entry(entry: models.ClientAccountEntry, previous: dict | None) -> None:
+    """Move a saved account entry's amount from its ``previous`` state to its current one."""
+    current = {field: getattr(entry, field) for field in ACCOUNT_FIELDS}
+    if previous is not None:
+        if previous == current:
+            return
+        _apply_account_entries([previous], -1)
+    _apply_account_entries([current], 1)
+
+
+def discard_account_entry(entry: models.ClientAccountEntry) -> None:
+    _apply_account_entries([{field: getattr(entry, field) for field in ACCOUNT_FIELDS}], -1)
+
+
+def get(client: models.Client) -> models.ClientLedger:
+    """The client's ledger, recomputed first if it is missing or stale."""
+    ledger = models.ClientLedger.objects.filter(client=client, stale=False).first()
+    if ledger is None:
+        refresh(client.pk)
+        ledger = models.ClientLedger.objects.get(client=client)
+    return ledger
+
+
+def balances(clients):
+    """Totals and balance of each of ``clients`` (a Client queryset), as one annotated values query.
+
+    Missing or stale ledgers are recomputed first, together.
+    """
+    ensure(clients)
+    decimal = DecimalField(max_digits=14, decimal_places=2)
+    charged = ExpressionWrapper(F("account_charged") + F("pack_total_due") + F("hourly_total_due"), decimal)
+    return (
+        models.ClientLedger.objects.filter(client__in=clients)
+        .annotate(total_charged=charged)
+        .annotate(balance=ExpressionWrapper(F("total_charged") - F("total_paid"), decimal))
+        .order_by("client__name", "client_id")
+        .values(
+            "client_id",
+            "client__name",
+            "client__is_active",
+            "currency",
+            "balance",
+            "total_charged",
+            "total_paid",
+            "pack_total_due",
+            "hourly_total_due",
+            "by_currency",
+        )
+    )
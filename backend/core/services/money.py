@@ -0,0 +1,51 @@
+"""Per-entry amounts in integer cents.
+
+An entry's amount has always been ``(Decimal(minutes) / 60 * rate).quantize(CENT)``
+under the default decimal context. In cents that is ``minutes * rate_cents / 60``
+rounded to an integer, which plain integer division gets exactly right except on
+exact half-cent ties. There the old code's result depends on how the 28-digit
+context rounded ``minutes / 60``, so ties are delegated to the same Decimal
+expression. Hot loops accumulate integers and only turn them into Decimals with
+:func:`from_cents` at the serialization boundary.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+CENT = Decimal("0.01")
+
+
+def to_cents(amount: Decimal | None) -> int:
+    """Whole cents in ``amount``; rates and prices carry two decimal places."""
+    if not amount:
+        return 0
+    return int(amount.scaleb(2).to_integral_value())
+
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def _decimal_entry_cents(minutes: int, rate_cents: int) -> int:
+    amount = (Decimal(minutes) / Decimal(60)) * from_cents(rate_cents)
+    return to_cents(amount.quantize(CENT))
+
+
+def entry_cents(minutes: int, rate_cents: int) -> int:
+    """Amount billed for ``minutes`` at ``rate_cents`` per hour, in cents."""
+    cents, remainder = divmod(minutes * rate_cents, 60)
+    if remainder < 30:
+        return cents
+    if remainder > 30:
+        return cents + 1
+    return _decimal_entry_cents(minutes, rate_cents)
+
+
+def is_tie(minutes: int, rate_cents: int) -> bool:
+    return minutes * rate_cents % 60 == 30
+
+
+def entry_amount(minutes: int, rate: Decimal) -> Decimal:
+    """:func:`entry_cents` for a Decimal hourly rate, as a Decimal amount."""
+    return from_cents(entry_cents(minutes, to_cents(rate)))
@@ -0,0 +1,103 @@
+"""Hours-pack consumption, daily burn history and exhaustion forecast per project.
+
+A pack's consumption is every minute logged on the project, as on the client
+dashboard. The forecast fits a least-squares line through cumulative
+consumption over the last ``PACK_FORECAST_WINDOW_DAYS`` calendar days (idle
+days count as zero burn) and extends it until the pack runs out.
+
+Results are cached per project for the day they were computed on, keyed on
+the client's report generation, so they are never read again once the
+project's entries or pack terms change.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+
+from .. import models
+from . import report_cache, rollups
+
+PREFIX = "pack-burndown"
+
+
+def _key(project: models.Project) -> str:
+    return f"{PREFIX}:{project.pk}:{report_cache.client_generation(project.client_id)}"
+
+
+def daily_minutes(project_id: int) -> tuple[np.ndarray, np.ndarray]:
+    """Day ordinals with logged time on the project and the minutes logged each day."""
+    if rollups.can_serve():
+        queryset, field = models.TimeEntryRollup.objects.filter(project_id=project_id), "total_minutes"
+    else:
+        queryset, field = models.TimeEntry.objects.filter(project_id=project_id), "duration_minutes"
+    rows = list(queryset.order_by("date").values("date").annotate(minutes=Sum(field)).values_list("date", "minutes"))
+    ordinals = np.fromiter((day.toordinal() for day, _ in rows), dtype=np.int64, count=len(rows))
+    minutes = np.fromiter((minutes for _, minutes in rows), dtype=np.int64, count=len(rows))
+    return ordinals, minutes
+
+
+def burn_rate(ordinals: np.ndarray, minutes: np.ndarray, today: date, window: int) -> float:
+    """Minutes per day from a linear fit of cumulative burn over the last ``window`` days."""
+    start = today.toordinal() - window + 1
+    recent = (ordinals >= start) & (ordinals <= today.toordinal())
+    daily = np.bincount(ordinals[recent] - start, weights=minutes[recent], minlength=window)
+    if not daily.any():
+        return 0.0
+    slope, _ = np.polyfit(np.arange(window), np.cumsum(daily), 1)
+    return max(float(slope), 0.0)
+
+
+def _hours(minutes: int) -> str:
+    return str((Decimal(minutes) / 60).quantize(Decimal("0.01")))
+
+
+def compute(project: models.Project, today: date | None = None) -> dict:
+    today = today or date.today()
+    ordinals, minutes = daily_minutes(project.pk)
+    cumulative = np.cumsum(minutes)
+    consumed = int(cumulative[-1]) if len(cumulative) else 0
+    pack_minutes = int(project.pack_hours * 60) if project.pack_hours else None
+    rate = burn_rate(ordinals, minutes, today, settings.PACK_FORECAST_WINDOW_DAYS)
+
+    exhausted_on = projected = None
+    if pack_minutes is not None:
+        if consumed >= pack_minutes:
+            crossed = int(np.searchsorted(cumulative, pack_minutes))
+            exhausted_on = date.fromordinal(int(ordinals[crossed])).isoformat()
+        elif rate > 0:
+            projected = (today + timedelta(days=math.ceil((pack_minutes - consumed) / rate))).isoformat()
+
+    remaining = pack_minutes - consumed if pack_minutes is not None else None
+    return {
+        "project_id": project.pk,
+        "computed_on": today.isoformat(),
+        "pack_hours": _hours(pack_minutes) if pack_minutes is not None else None,
+        "consumed_hours": _hours(consumed),
+        "remaining_hours": _hours(remaining) if remaining is not None else None,
+        "burn_rate_hours_per_day": round(rate / 60, 2),
+        "exhausted_on": exhausted_on,
+        "projected_exhaustion": projected,
+        "history": {
+            "dates": [date.fromordinal(int(ordinal)).isoformat() for ordinal in ordinals],
+            "minutes": minutes.tolist(),
+            "remaining_minutes": (pack_minutes - cumulative).tolist() if pack_minutes is not None else None,
+        },
+    }
+
+
+def burndown(project: models.Project) -> dict:
+    """The project's burn-down for today, from the cache when it is still current."""
+    today = date.today()
+    key = _key(project)
+    data = cache.get(key)
+    if data is None or data["computed_on"] != today.isoformat():
+        data = compute(project, today)
+        cache.set(key, data, settings.REPORT_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,99 @@
+"""PDF rendering in a pool of processes that keep WeasyPrint warm.
+
+WeasyPrint is imported on first use so web workers that never render a PDF
+do not pay for loading it. Each pool process parses the report stylesheet and
+discovers fonts once, in its initializer, and reuses them for every render.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Sequence
+
+from django.conf import settings
+
+_WARMUP_HTML = "<h1>Worktrace</h1><table><tr><td>0</td></tr></table>"
+# How often a caller waiting on a pool render is told it is still running.
+WAIT_TICK_SECONDS = 30
+
+# Parsed stylesheets and font configurations of this process, keyed by CSS text.
+_renderers: dict[str, tuple] = {}
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _renderer(stylesheet: str) -> tuple:
+    renderer = _renderers.get(stylesheet)
+    if renderer is None:
+        from weasyprint import CSS, HTML
+        from weasyprint.text.fonts import FontConfiguration
+
+        font_config = FontConfiguration()
+        css = CSS(string=stylesheet, font_config=font_config)
+        HTML(string=_WARMUP_HTML).render(stylesheets=[css], font_config=font_config)
+        renderer = _renderers[stylesheet] = (css, font_config)
+    return renderer
+
+
+def render_chunks(chunks: Sequence[str], stylesheet: str, tick: Callable[[], None] | None = None) -> bytes:
+    """Lay out each HTML chunk on its own and write all their pages as one PDF.
+
+    ``tick`` is called after each chunk is laid out.
+    """
+    from weasyprint import HTML
+
+    css, font_config = _renderer(stylesheet)
+    documents = []
+    for chunk in chunks:
+        documents.append(HTML(string=chunk).render(stylesheets=[css], font_config=font_config))
+        if tick is not None:
+            tick()
+    pages = [page for document in documents for page in document.pages]
+    return documents[0].copy(pages).write_pdf()
+
+
+def _get_pool(stylesheet: str) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_renderer,
+                initargs=(stylesheet,),
+            )
+        return _pool
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def render(chunks: Sequence[str], stylesheet: str, tick: Callable[[], None] | None = None) -> bytes:
+    """Render HTML ``chunks`` styled by ``stylesheet`` into a single PDF.
+
+    With ``PDF_RENDER_WORKERS`` set to 0 the work happens in this process.
+    ``tick`` is called while the render runs: after each chunk in this
+    process, or every ``WAIT_TICK_SECONDS`` while waiting on the pool.
+    """
+    chunks = list(chunks)
+    if settings.PDF_RENDER_WORKERS <= 0:
+        return render_chunks(chunks, stylesheet, tick)
+    try:
+        future = _get_pool(stylesheet).submit(render_chunks, chunks, stylesheet)
+        while True:
+            try:
+                return future.result(timeout=WAIT_TICK_SECONDS if tick is not None else None)
+            except FutureTimeout:
+                tick()
+    except BrokenProcessPool:
+        shutdown()
+        raise
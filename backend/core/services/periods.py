@@ -0,0 +1,138 @@
+"""Closing months: frozen report totals for periods that can no longer change.
+
+Closing a month writes its report totals per project, user, billable flag and
+currency to PeriodSnapshot rows, converting them to the base currency at the
+FX rates known by then, and from then on time entries dated in it are locked.
+Summaries read closed months that their date range fully covers from the
+snapshots, and only aggregate the rest live, so a long range costs about the
+same as its open tail.
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Count
+
+from .. import models
+from . import fx, money, report_cache, reporting, rollups
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def month_end(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def _snapshots(period: models.ClosedPeriod) -> list[models.PeriodSnapshot]:
+    # Grouped by what the per-entry amount depends on, as in reporting.entry_partials.
+    entries = models.TimeEntry.objects.filter(date__gte=period.month, date__lte=month_end(period.month))
+    groups = (
+        reporting.annotate_effective_currency(reporting.annotate_effective_rate(entries))
+        .order_by()
+        .values("project_id", "user_id", "billable", "date", "duration_minutes", "effective_rate", "effective_currency")
+        .annotate(entries=Count("id"), **rollups.activity_aggregates())
+    )
+    table = fx.get_table()
+    buckets: dict[tuple, list] = {}
+    for group in groups:
+        key = (group["project_id"], group["user_id"], group["billable"], group["effective_currency"])
+        activity = rollups.last_activity(group["date"], group["newest_start"], group["untimed"])
+        bucket = buckets.setdefault(key, [0, 0, 0, group["date"], {}, activity])
+        bucket[0] += group["entries"]
+        bucket[1] += group["duration_minutes"] * group["entries"]
+        if group["effective_rate"]:
+            cents = money.entry_cents(group["duration_minutes"], money.to_cents(group["effective_rate"]))
+            bucket[2] += cents * group["entries"]
+            bucket[4][group["date"]] = bucket[4].get(group["date"], 0) + cents * group["entries"]
+        bucket[3] = max(bucket[3], group["date"])
+        bucket[5] = max(bucket[5], activity)
+
+    snapshots = []
+    for key, (entries, minutes, cents, last_date, days, activity) in buckets.items():
+        project_id, user_id, billable, currency = key
+        converted = [table.convert(amount, currency, day) for day, amount in days.items()]
+        snapshots.append(
+            models.PeriodSnapshot(
+                period=period,
+                project_id=project_id,
+                user_id=user_id,
+                billable=billable,
+                currency=currency,
+                entry_count=entries,
+                total_minutes=minutes,
+                total_amount=money.from_cents(cents),
+                base_amount=None if None in converted else money.from_cents(sum(converted)),
+                last_date=last_date,
+                last_activity=activity,
+            )
+        )
+    return snapshots
+
+
+@transaction.atomic
+def close(month: date, user=None) -> models.ClosedPeriod:
+    """Close the month holding ``month``; it must be over and not closed yet."""
+    month = month_start(month)
+    if month >= month_start(date.today()):
+        raise ValueError("Only past months can be closed.")
+    if models.ClosedPeriod.objects.filter(month=month).exists():
+        raise ValueError(f"{month:%Y-%m} is already closed.")
+    period = models.ClosedPeriod.objects.create(month=month, closed_by=user)
+    snapshots = _snapshots(period)
+    models.PeriodSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+    report_cache.invalidate(*_clients({snapshot.project_id for snapshot in snapshots}))
+    return period
+
+
+def _clients(project_ids) -> set[int]:
+    return set(models.Project.objects.filter(pk__in=project_ids).values_list("client_id", flat=True))
+
+
+@transaction.atomic
+def reopen(period: models.ClosedPeriod) -> None:
+    """Unlock the month's entries; reports over it are aggregated live again."""
+    project_ids = set(period.snapshots.values_list("project_id", flat=True))
+    period.delete()
+    report_cache.invalidate(*_clients(project_ids))
+
+
+def _parse(value: str | None) -> date | None:
+    return date.fromisoformat(value) if value else None
+
+
+def split(filters: reporting.ReportFilters) -> tuple[list[int], list[reporting.ReportFilters]]:
+    """Closed periods fully inside the filtered range, and filters for the open stretches around them."""
+    periods = list(models.ClosedPeriod.objects.order_by("month").values_list("pk", "month"))
+    if not periods:
+        return [], [filters]
+    try:
+        first, last = _parse(filters.date_from), _parse(filters.date_to)
+    except ValueError:
+        return [], [filters]
+
+    covered = [
+        (pk, month)
+        for pk, month in periods
+        if (first is None or month >= first) and (last is None or month_end(month) <= last)
+    ]
+    live = []
+    cursor = first
+    for _, month in covered:
+        if cursor is None or cursor < month:
+            live.append((cursor, month - timedelta(days=1)))
+        cursor = month_end(month) + timedelta(days=1)
+    if not covered or last is None or cursor <= last:
+        live.append((cursor, last))
+    return [pk for pk, _ in covered], [
+        replace(
+            filters,
+            date_from=start.isoformat() if start else None,
+            date_to=end.isoformat() if end else None,
+        )
+        for start, end in live
+    ]
@@ -0,0 +1,255 @@
+"""Multi-dimensional report pivots computed on columnar NumPy arrays.
+
+The filtered rows are loaded once into a :class:`Frame`: one array per
+column, with dates as ordinals and amounts in integer cents. Grouping turns
+every requested dimension into dense codes, folds them into a single key and
+aggregates each measure with ``np.bincount``, so the cost of a pivot is a few
+vectorized passes whatever the combination of dimensions. Amounts are never
+added across currencies: every pivot is also grouped by currency.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Sequence
+
+import numpy as np
+
+from .. import models
+from . import money, reporting, rollups
+
+DIMENSIONS = ("client", "project", "user", "day", "week", "month", "billable", "currency")
+MEASURES = ("entries", "total_minutes", "billable_minutes", "total_amount")
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Key spaces up to this size are aggregated with direct indexing instead of sorting.
+DENSE_LIMIT = 1 << 22
+
+
+@dataclass
+class Frame:
+    project_id: np.ndarray
+    client_id: np.ndarray
+    user_id: np.ndarray
+    date_ordinal: np.ndarray
+    billable: np.ndarray
+    entries: np.ndarray
+    minutes: np.ndarray
+    amount_cents: np.ndarray
+    # Index into ``currencies`` of each row's currency.
+    currency: np.ndarray
+    currencies: list[str]
+
+    def __len__(self) -> int:
+        return len(self.minutes)
+
+
+def _frame(columns: list[tuple], project_clients: dict[int, int]) -> Frame:
+    project_id, user_id, ordinal, billable, entries, minutes, cents, currency = (
+        np.array(column) for column in (zip(*columns) if columns else [()] * 8)
+    )
+    currencies, currency = np.unique(currency.astype(str), return_inverse=True)
+    project_id = project_id.astype(np.int64)
+    lookup = np.zeros(int(project_id.max(initial=0)) + 1, dtype=np.int64)
+    for pk, client_id in project_clients.items():
+        if pk < len(lookup):
+            lookup[pk] = client_id
+    return Frame(
+        project_id=project_id,
+        client_id=lookup[project_id],
+        user_id=user_id.astype(np.int64),
+        date_ordinal=ordinal.astype(np.int64),
+        billable=billable.astype(bool),
+        entries=entries.astype(np.int64),
+        minutes=minutes.astype(np.int64),
+        amount_cents=cents.astype(np.int64),
+        currency=currency.reshape(-1).astype(np.int64),
+        currencies=currencies.tolist(),
+    )
+
+
+def _load_rollups(user, filters: reporting.ReportFilters) -> list[tuple]:
+    rows = reporting.build_rollup_queryset(user, filters).values_list(
+        "project_id", "user_id", "date", "billable", "entry_count", "total_minutes", "total_amount", "currency"
+    )
+    return [
+        (project_id, user_id, day.toordinal(), billable, count, minutes, money.to_cents(amount), currency)
+        for project_id, user_id, day, billable, count, minutes, amount, currency in rows.iterator(
+            chunk_size=reporting.CHUNK_SIZE
+        )
+    ]
+
+
+def _load_entries(user, filters: reporting.ReportFilters) -> list[tuple]:
+    entries = reporting.annotate_effective_rate(reporting.build_queryset(user, filters))
+    rows = list(
+        reporting.annotate_effective_currency(entries)
+        .values_list(
+            "project_id", "user_id", "date", "billable", "duration_minutes", "effective_rate", "effective_currency"
+        )
+        .iterator(chunk_size=reporting.CHUNK_SIZE)
+    )
+    if not rows:
+        return []
+    minutes = np.fromiter((row[4] for row in rows), dtype=np.int64, count=len(rows))
+    rate_cents = np.fromiter((money.to_cents(row[5]) for row in rows), dtype=np.int64, count=len(rows))
+    amounts = entry_cents(minutes, rate_cents)
+    return [
+        (project_id, user_id, day.toordinal(), billable, 1, duration, int(amount), currency)
+        for (project_id, user_id, day, billable, duration, _, currency), amount in zip(rows, amounts)
+    ]
+
+
+def entry_cents(minutes: np.ndarray, rate_cents: np.ndarray) -> np.ndarray:
+    """Vectorized :func:`money.entry_cents`; only exact half-cent ties leave NumPy."""
+    cents, remainder = np.divmod(minutes * rate_cents, 60)
+    cents += remainder > 30
+    for index in np.flatnonzero(remainder == 30):
+        cents[index] = money.entry_cents(int(minutes[index]), int(rate_cents[index]))
+    return cents
+
+
+def load(user, filters: reporting.ReportFilters) -> Frame:
+    """Load the rows ``filters`` selects for ``user`` as columns, from rollups when possible."""
+    columns = _load_rollups(user, filters) if rollups.can_serve(filters) else _load_entries(user, filters)
+    project_clients = dict(
+        models.Project.objects.filter(pk__in={row[0] for row in columns}).values_list("pk", "client_id")
+    )
+    return _frame(columns, project_clients)
+
+
+def dimension_values(frame: Frame, name: str) -> np.ndarray:
+    if name == "client":
+        return frame.client_id
+    if name == "project":
+        return frame.project_id
+    if name == "user":
+        return frame.user_id
+    if name == "billable":
+        return frame.billable.astype(np.int64)
+    if name == "currency":
+        return frame.currency
+    if name == "week":
+        # Ordinal 1 (0001-01-01) is a Monday.
+        return frame.date_ordinal - (frame.date_ordinal - 1) % 7
+    if name == "month":
+        # Convert only the distinct days; calendar conversion is the slow part.
+        days, inverse = _factorize(frame.date_ordinal)
+        months = (days - _EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]")
+        return months.astype(np.int64)[inverse]
+    return frame.date_ordinal
+
+
+def _format(frame: Frame, name: str, values: np.ndarray) -> list:
+    if name == "currency":
+        return [frame.currencies[int(value)] for value in values]
+    if name == "billable":
+        return [bool(value) for value in values]
+    if name in ("day", "week"):
+        return [date.fromordinal(int(value)).isoformat() for value in values]
+    if name == "month":
+        return [str(value) for value in values.astype("datetime64[M]")]
+    return [int(value) for value in values]
+
+
+def _factorize(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted distinct ``values`` and each element's index into them.
+
+    Integer columns spanning a modest range are factorized in linear time
+    with a presence table; anything else falls back to ``np.unique``.
+    """
+    if len(values) and values.dtype.kind in "iub":
+        low = int(values.min())
+        span = int(values.max()) - low + 1
+        if span <= max(4 * len(values), DENSE_LIMIT):
+            offsets = values - low
+            present = np.zeros(span, dtype=bool)
+            present[offsets] = True
+            positions = np.cumsum(present) - 1
+            return np.flatnonzero(present) + low, positions[offsets]
+    values, inverse = np.unique(values, return_inverse=True)
+    return values, inverse.reshape(-1)
+
+
+def group(frame: Frame, group_by: Sequence[str]) -> tuple[list[np.ndarray], dict[str, np.ndarray]]:
+    """Aggregate ``frame`` over ``group_by``.
+
+    Returns the sorted distinct value of each dimension per group, and each
+    measure as an array aligned with them.
+    """
+    codes = np.zeros(len(frame), dtype=np.int64)
+    uniques = []
+    radix = 1
+    for name in group_by:
+        values, inverse = _factorize(dimension_values(frame, name))
+        cardinality = max(len(values), 1)
+        radix *= cardinality
+        if radix >= 2**62:
+            raise ValueError("Too many distinct groups for one pivot.")
+        codes = codes * cardinality + inverse
+        uniques.append(values)
+
+    weights = {
+        "entries": frame.entries,
+        "total_minutes": frame.minutes,
+        "billable_minutes": frame.minutes * frame.billable,
+        "total_amount": frame.amount_cents,
+    }
+    if radix <= max(4 * len(frame), DENSE_LIMIT):
+        # Aggregate straight into the full key space and keep the occupied keys.
+        occupied = np.bincount(codes, minlength=radix)
+        keys = np.flatnonzero(occupied)
+        measures = {name: np.bincount(codes, weights=column, minlength=radix)[keys] for name, column in weights.items()}
+    else:
+        keys, slots = np.unique(codes, return_inverse=True)
+        slots = slots.reshape(-1)
+        measures = {
+            name: np.bincount(slots, weights=column, minlength=len(keys)) for name, column in weights.items()
+        }
+    measures = {name: np.rint(values).astype(np.int64) for name, values in measures.items()}
+
+    dimensions = []
+    for values in reversed(uniques):
+        cardinality = max(len(values), 1)
+        dimensions.append(values[keys % cardinality] if len(values) else values)
+        keys = keys // cardinality
+    return dimensions[::-1], measures
+
+
+def _labels(group_by: Sequence[str], dimensions: list[np.ndarray]) -> dict:
+    labels = {}
+    for name, values in zip(group_by, dimensions):
+        ids = {int(value) for value in values}
+        if name == "client":
+            labels[name] = dict(models.Client.objects.filter(pk__in=ids).values_list("pk", "name"))
+        elif name == "project":
+            projects, _ = reporting.display_labels(ids, ())
+            labels[name] = {pk: project_name for pk, (_, project_name) in projects.items()}
+        elif name == "user":
+            _, labels[name] = reporting.display_labels((), ids)
+    return labels
+
+
+def build(user, filters: reporting.ReportFilters, group_by: Sequence[str]) -> dict:
+    """Return a pivot of the report over ``group_by`` and currency as column names plus row arrays."""
+    frame = load(user, filters)
+    group_by = [*group_by, *(() if "currency" in group_by else ("currency",))]
+    dimensions, measures = group(frame, group_by)
+    formatted = [_format(frame, name, values) for name, values in zip(group_by, dimensions)]
+    amounts = [str(money.from_cents(int(cents))) for cents in measures["total_amount"]]
+    rows = [
+        [*keys, int(entries), int(minutes), int(billable), amount]
+        for keys, entries, minutes, billable, amount in zip(
+            zip(*formatted) if formatted else [()] * len(amounts),
+            measures["entries"],
+            measures["total_minutes"],
+            measures["billable_minutes"],
+            amounts,
+        )
+    ]
+    return {
+        "group_by": list(group_by),
+        "columns": [*group_by, *MEASURES],
+        "rows": rows,
+        "labels": _labels(group_by, dimensions),
+    }
@@ -0,0 +1,109 @@
+"""Project time totals kept up to date by deltas.
+
+``Project.total_logged_minutes`` and ``last_logged_at`` (the newest entry's
+creation time) are adjusted with single ``UPDATE ... SET x = x + delta``
+statements from an entry's old and new values, so a write costs the same
+however long the project's history is. Only removing a project's newest entry
+reads its other entries again, to find the next newest. :func:`reconcile`
+compares the stored totals with one grouped query over all entries and repairs
+drift, e.g. after bulk inserts that skip the signals.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db.models import Case, F, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .. import models
+
+
+def _add(project_id: int, minutes: int, created_at: datetime) -> None:
+    models.Project.objects.filter(pk=project_id).update(
+        total_logged_minutes=F("total_logged_minutes") + minutes,
+        last_logged_at=Greatest(Coalesce("last_logged_at", Value(created_at)), Value(created_at)),
+        updated_at=timezone.now(),
+    )
+
+
+def _remove(project_id: int, minutes: int, created_at: datetime) -> None:
+    newest = (
+        models.TimeEntry.objects.filter(project_id=OuterRef("pk"))
+        .order_by()
+        .values("project_id")
+        .annotate(newest=Max("created_at"))
+        .values("newest")
+    )
+    models.Project.objects.filter(pk=project_id).update(
+        total_logged_minutes=Greatest(F("total_logged_minutes") - minutes, Value(0)),
+        last_logged_at=Case(
+            When(last_logged_at__lte=created_at, then=Subquery(newest)),
+            default=F("last_logged_at"),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def record_entry(entry: models.TimeEntry, previous: dict | None) -> None:
+    """Apply a saved entry; ``previous`` holds its ``project_id`` and ``duration_minutes`` before the save."""
+    if previous is None:
+        _add(entry.project_id, entry.duration_minutes, entry.created_at)
+    elif previous["project_id"] != entry.project_id:
+        _remove(previous["project_id"], previous["duration_minutes"], entry.created_at)
+        _add(entry.project_id, entry.duration_minutes, entry.created_at)
+    elif previous["duration_minutes"] != entry.duration_minutes:
+        models.Project.objects.filter(pk=entry.project_id).update(
+            total_logged_minutes=F("total_logged_minutes") + (entry.duration_minutes - previous["duration_minutes"]),
+            updated_at=timezone.now(),
+        )
+
+
+def discard_entry(entry: models.TimeEntry) -> None:
+    """Apply a deleted entry; the row is already gone."""
+    _remove(entry.project_id, entry.duration_minutes, entry.created_at)
+
+
+@dataclass(frozen=True)
+class Drift:
+    project_id: int
+    stored_minutes: int
+    actual_minutes: int
+    stored_last_logged_at: datetime | None
+    actual_last_logged_at: datetime | None
+
+
+def reconcile(repair: bool = True) -> list[Drift]:
+    """Projects whose stored totals differ from their entries, repaired unless ``repair`` is false."""
+    actual = {
+        group["project_id"]: (group["minutes"], group["newest"])
+        for group in models.TimeEntry.objects.order_by()
+        .values("project_id")
+        .annotate(minutes=Sum("duration_minutes"), newest=Max("created_at"))
+    }
+    drifted = []
+    for project_id, minutes, last_logged_at in models.Project.objects.values_list(
+        "pk", "total_logged_minutes", "last_logged_at"
+    ):
+        expected = actual.get(project_id, (0, None))
+        if (minutes, last_logged_at) != expected:
+            drifted.append(Drift(project_id, minutes, expected[0], last_logged_at, expected[1]))
+
+    if repair and drifted:
+        now = timezone.now()
+        models.Project.objects.bulk_update(
+            [
+                models.Project(
+                    pk=drift.project_id,
+                    total_logged_minutes=drift.actual_minutes,
+                    last_logged_at=drift.actual_last_logged_at,
+                    updated_at=now,
+                )
+                for drift in drifted
+            ],
+            ["total_logged_minutes", "last_logged_at", "updated_at"],
+            batch_size=500,
+        )
+    return drifted
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional, Tuple
+
+from django.db.models import Count, Max
+
+from .. import models
+
+Rate = Tuple[Decimal, str]
+
+
+class RateTimeline:
+    """HourlyRate intervals per project and client, indexed by date.
+
+    Each target's intervals are flattened into sorted, non-overlapping
+    segments, so "rate on date D" is a single binary search. Where intervals
+    overlap, the rate with the latest ``effective_from`` wins, as it does in
+    :func:`core.services.reporting.annotate_effective_rate`.
+    """
+
+    def __init__(self, rates: Iterable[tuple], fingerprint: tuple | None = None) -> None:
+        self.fingerprint = fingerprint
+        intervals: dict[tuple[str, int], list[tuple]] = defaultdict(list)
+        for rate_id, project_id, client_id, amount, currency, effective_from, effective_to in rates:
+            target = ("project", project_id) if project_id else ("client", client_id)
+            intervals[target].append((effective_from, rate_id, effective_to, (amount, currency)))
+        self._segments = {
+            target: self._flatten(target_intervals) for target, target_intervals in intervals.items()
+        }
+
+    @staticmethod
+    def _flatten(intervals: list[tuple]) -> tuple[list[date], list[Optional[Rate]]]:
+        intervals.sort(key=lambda interval: interval[:2], reverse=True)
+        breakpoints = {effective_from for effective_from, *_ in intervals}
+        breakpoints.update(
+            effective_to + timedelta(days=1)
+            for _, _, effective_to, _ in intervals
+            if effective_to is not None and effective_to < date.max
+        )
+        starts: list[date] = []
+        values: list[Optional[Rate]] = []
+        for start in sorted(breakpoints):
+            value = next(
+                (
+                    rate
+                    for effective_from, _, effective_to, rate in intervals
+                    if effective_from <= start and (effective_to is None or effective_to >= start)
+                ),
+                None,
+            )
+            if values and values[-1] == value:
+                continue
+            starts.append(start)
+            values.append(value)
+        return starts, values
+
+    def _lookup(self, target: tuple[str, int], on: date) -> Optional[Rate]:
+        segments = self._segments.get(target)
+        if segments is None:
+            return None
+        starts, values = segments
+        index = bisect_right(starts, on) - 1
+        if index < 0:
+            return None
+        return values[index]
+
+    def rate_for(self, project_id: int, client_id: int | None, on: date) -> Optional[Rate]:
+        """Return ``(amount, currency)`` in force on ``on``, project rates first."""
+        rate = self._lookup(("project", project_id), on)
+        if rate is None and client_id is not None:
+            rate = self._lookup(("client", client_id), on)
+        return rate
+
+
+def billing_rate(
+    timeline: RateTimeline,
+    *,
+    project_id: int,
+    client_id: int | None,
+    billing_type: str,
+    default_rate: Decimal | None,
+    default_currency: str,
+    on: date,
+) -> Optional[Rate]:
+    """Rate billed for an entry of an hourly project.
+
+    Falls back to ``Project.hourly_rate`` when no HourlyRate is in force;
+    pack projects are not billed per entry.
+    """
+    if billing_type != models.Project.BillingType.HOURLY:
+        return None
+    rate = timeline.rate_for(project_id, client_id, on)
+    if rate is not None:
+        return rate
+    if default_rate is not None:
+        return Decimal(default_rate), default_currency
+    return None
+
+
+_timeline: RateTimeline | None = None
+
+
+def _fingerprint() -> tuple:
+    aggregates = models.HourlyRate.objects.aggregate(count=Count("id"), changed=Max("updated_at"))
+    return aggregates["count"], aggregates["changed"]
+
+
+def get_timeline() -> RateTimeline:
+    """Return the process-wide timeline, rebuilding it if rates changed.
+
+    Saves and deletes in this process clear the cache through signals; the
+    fingerprint query catches changes made by other workers.
+    """
+    global _timeline
+    fingerprint = _fingerprint()
+    if _timeline is not None and _timeline.fingerprint == fingerprint:
+        return _timeline
+
+    rates = models.HourlyRate.objects.values_list(
+        "id",
+        "project_id",
+        "client_id",
+        "amount_decimal",
+        "currency",
+        "effective_from",
+        "effective_to",
+    )
+    _timeline = RateTimeline(rates, fingerprint=fingerprint)
+    return _timeline
+
+
+def invalidate() -> None:
+    global _timeline
+    _timeline = None
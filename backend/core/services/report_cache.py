@@ -0,0 +1,145 @@
+"""Report results cached per user scope, filters and data generation.
+
+Every client has a generation counter, plus one global counter that moves
+with any client's. Writes that can change a report bump the counters of the
+clients involved, so cached results are keyed on the generations they were
+computed from and are simply never read again once those move on. The
+counters are ReportGeneration rows, so every process agrees on them; only the
+results themselves (and the hit/miss counters) live in Django's cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .. import models, permissions
+
+PREFIX = "report-cache"
+GLOBAL_GENERATION = "global"
+HITS = f"{PREFIX}:hits"
+MISSES = f"{PREFIX}:misses"
+_MISSING = object()
+
+
+def _client_generation(client_id: int) -> str:
+    return f"client:{client_id}"
+
+
+def _generations(keys: list[str]) -> list[int]:
+    # A counter never bumped reads as 0; bumping creates it at 1.
+    values = dict(models.ReportGeneration.objects.filter(key__in=keys).values_list("key", "generation"))
+    return [values.get(key, 0) for key in keys]
+
+
+def client_generation(client_id: int) -> int:
+    """The current data generation of ``client_id``, for caches keyed on it."""
+    return _generations([_client_generation(client_id)])[0]
+
+
+def _count(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def bump(*client_ids: int | None) -> None:
+    keys = [GLOBAL_GENERATION, *(_client_generation(pk) for pk in sorted({pk for pk in client_ids if pk}))]
+    bumped = models.ReportGeneration.objects.filter(key__in=keys).update(generation=F("generation") + 1)
+    if bumped < len(keys):
+        models.ReportGeneration.objects.bulk_create(
+            [models.ReportGeneration(key=key, generation=1) for key in keys],
+            ignore_conflicts=True,
+        )
+
+
+def invalidate(*client_ids: int | None) -> None:
+    """Invalidate reports over ``client_ids`` once the current transaction commits.
+
+    The counters live in the database, so other connections only see the
+    writes and the bump together after the commit; a result computed from the
+    pre-commit data is stored under the old generation and never read again.
+    Bumping after the commit also keeps the shared counter rows locked only
+    briefly instead of for the whole writing transaction.
+    """
+    transaction.on_commit(lambda: bump(*client_ids))
+
+
+def dependent_clients(user, filters) -> list[int] | None:
+    """Clients whose data a report for ``user`` can contain; ``None`` means all of them."""
+    if getattr(user, "is_admin", False):
+        return [filters.client_id] if filters.client_id else None
+    client_ids = set(
+        models.Project.objects.filter(permissions.visible_projects_filter(user, project_lookup=None))
+        .values_list("client_id", flat=True)
+        .distinct()
+    )
+    if user.client_id:
+        client_ids.add(user.client_id)
+    return sorted(client_ids)
+
+
+def generation_token(user, filters) -> str:
+    client_ids = dependent_clients(user, filters)
+    if client_ids is None:
+        return f"g{_generations([GLOBAL_GENERATION])[0]}"
+    generations = _generations([_client_generation(pk) for pk in client_ids])
+    return ",".join(f"c{pk}:{generation}" for pk, generation in zip(client_ids, generations))
+
+
+def result_key(kind: str, user, filters) -> str:
+    scope = "admin" if getattr(user, "is_admin", False) else f"user:{user.pk}"
+    payload = json.dumps(
+        {
+            "kind": kind,
+            "scope": scope,
+            "filters": asdict(filters),
+            "generation": generation_token(user, filters),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return f"{PREFIX}:{kind}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+def cached(kind: str, user, filters, compute: Callable[[], Any]) -> Any:
+    """Return the cached ``kind`` report for ``user`` and ``filters``, computing it on a miss."""
+    key = result_key(kind, user, filters)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        _count(HITS)
+        return value
+    _count(MISSES)
+    value = compute()
+    cache.set(key, value, settings.REPORT_CACHE_TIMEOUT)
+    return value
+
+
+def stats() -> dict:
+    counters = cache.get_many([HITS, MISSES])
+    hits = counters.get(HITS, 0)
+    misses = counters.get(MISSES, 0)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / lookups, 4) if lookups else None,
+    }
+
+
+def clients_of_projects(project_ids: Iterable[int | None]) -> list[int]:
+    project_ids = [pk for pk in project_ids if pk]
+    if not project_ids:
+        return []
+    return list(
+        models.Project.objects.filter(pk__in=project_ids).values_list("client_id", flat=True).distinct()
+    )
@@ -1,22 +1,61 @@
 from __future__ import annotations
 
 import csv
-import io
-from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from decimal import Decimal
-from typing import Iterable, List, Tuple
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Tuple
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Prefetch, Q
-from django.http import HttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, DecimalField, F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, StreamingHttpResponse
 from django.template.loader import render_to_string
-from weasyprint import HTML
 
-from .. import models
+from .. import models, permissions
+from . import fx, money, pdf, periods, rates, rollups, sharding
 
 User = get_user_model()
 
+CENT = Decimal("0.01")
+CHUNK_SIZE = 2000
+# Summary orderings mapped to the rollup aggregate they sort on.
+SUMMARY_ORDERINGS = {
+    "total_minutes": "minutes",
+    "billable_minutes": "billable_part",
+    "non_billable_minutes": "non_billable_part",
+    "total_amount": "amount",
+    "last_activity": "activity",
+}
+DEFAULT_ORDERING = "-last_activity"
+SUMMARY_FIELDS = (
+    "client",
+    "project",
+    "user",
+    "total_minutes",
+    "billable_minutes",
+    "non_billable_minutes",
+    "total_amount",
+    "base_amount",
+    "base_currency",
+)
+ENTRY_FIELDS = (
+    "id",
+    "date",
+    "client",
+    "project",
+    "user",
+    "task",
+    "notes",
+    "duration_minutes",
+    "billable",
+    "hourly_rate",
+    "amount",
+    "currency",
+)
+
 
 @dataclass
 class ReportFilters:
@@ -26,25 +65,20 @@ class ReportFilters:
     date_from: str | None = None
     date_to: str | None = None
     billable: bool | None = None
+    ordering: str | None = None
+    limit: int | None = None
+    offset: int = 0
 
+    @property
+    def order(self) -> tuple[str, bool]:
+        """The summary ordering key and whether it is descending."""
+        ordering = self.ordering or DEFAULT_ORDERING
+        return ordering.lstrip("-"), ordering.startswith("-")
 
-def build_queryset(user: User, filters: ReportFilters):
-    queryset = models.TimeEntry.objects.select_related("project", "project__client", "user").prefetch_related(
-        Prefetch(
-            "project__hourly_rates",
-            queryset=models.HourlyRate.objects.order_by("-effective_from"),
-        ),
-        Prefetch(
-            "project__client__hourly_rates",
-            queryset=models.HourlyRate.objects.order_by("-effective_from"),
-        ),
-    )
 
+def _scope(queryset, user: User, filters: ReportFilters):
     if user.is_client:
-        queryset = queryset.filter(
-            Q(project__assignments__user=user, project__assignments__is_active=True)
-            | Q(project__client=user.client)
-        )
+        queryset = queryset.filter(permissions.visible_projects_filter(user))
 
     if filters.client_id:
         queryset = queryset.filter(project__client_id=filters.client_id)
@@ -59,91 +93,613 @@ def build_queryset(user: User, filters: ReportFilters):
     if filters.billable is not None:
         queryset = queryset.filter(billable=filters.billable)
 
-    return queryset.distinct()
+    return queryset
 
 
-def resolve_rate(entry: models.TimeEntry) -> Decimal | None:
-    date = entry.date
-    project_rates = entry.project.hourly_rates.all()
-    client_rates = entry.project.client.hourly_rates.all()
+def build_queryset(user: User, filters: ReportFilters):
+    return _scope(models.TimeEntry.objects.all(), user, filters)
+
 
-    for rate in project_rates:
-        if rate.effective_from <= date and (not rate.effective_to or rate.effective_to >= date):
-            return rate.amount_decimal
+def build_rollup_queryset(user: User, filters: ReportFilters):
+    return _scope(models.TimeEntryRollup.objects.all(), user, filters)
 
-    for rate in client_rates:
-        if rate.effective_from <= date and (not rate.effective_to or rate.effective_to >= date):
-            return rate.amount_decimal
-    return None
 
+def _rate_lookup(field: str = "amount_decimal", **target) -> Subquery:
+    candidates = (
+        models.HourlyRate.objects.filter(effective_from__lte=OuterRef("date"), **target)
+        .filter(Q(effective_to__isnull=True) | Q(effective_to__gte=OuterRef("date")))
+        .order_by("-effective_from", "-id")
+    )
+    return Subquery(candidates.values(field)[:1])
 
-def summarize(user: User, filters: ReportFilters) -> List[dict]:
-    queryset = build_queryset(user, filters)
-    summary_map: dict[Tuple[int, int], dict] = {}
 
-    for entry in queryset:
-        key = (entry.project_id, entry.user_id)
-        if key not in summary_map:
-            summary_map[key] = {
-                "client": entry.project.client.name,
-                "project": entry.project.name,
-                "user": entry.user.get_full_name() or entry.user.email,
-                "total_minutes": 0,
-                "billable_minutes": 0,
-                "non_billable_minutes": 0,
-                "total_amount": Decimal("0.00"),
+def annotate_effective_rate(queryset):
+    """Annotate each entry with the HourlyRate in force on its date.
+
+    Project rates win over client rates, mirroring :func:`resolve_rate`.
+    """
+    return queryset.annotate(
+        effective_rate=Coalesce(
+            _rate_lookup(project_id=OuterRef("project_id")),
+            _rate_lookup(client_id=OuterRef("project__client_id")),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        )
+    )
+
+
+def annotate_effective_currency(queryset):
+    """Annotate each entry with the currency of its effective rate, else its project's."""
+    return queryset.annotate(
+        effective_currency=Coalesce(
+            _rate_lookup("currency", project_id=OuterRef("project_id")),
+            _rate_lookup("currency", client_id=OuterRef("project__client_id")),
+            F("project__currency"),
+        )
+    )
+
+
+def resolve_rate(entry: models.TimeEntry, timeline: rates.RateTimeline | None = None) -> Decimal | None:
+    if timeline is None:
+        timeline = rates.get_timeline()
+    rate = timeline.rate_for(entry.project_id, entry.project.client_id, entry.date)
+    if rate is None:
+        return None
+    return rate[0]
+
+
+def display_labels(
+    project_ids: Iterable[int], user_ids: Iterable[int]
+) -> Tuple[dict[int, tuple[str, str]], dict[int, str]]:
+    projects = {
+        pk: (client_name, name)
+        for pk, name, client_name in models.Project.objects.filter(pk__in=set(project_ids))
+        .values_list("pk", "name", "client__name")
+    }
+    users = {
+        user.pk: user.get_full_name() or user.email
+        for user in User.objects.filter(pk__in=set(user_ids)).only(
+            "first_name", "last_name", "email"
+        )
+    }
+    return projects, users
+
+
+# Per (project, user): [total, billable, non-billable minutes, amount in cents,
+# last activity (see rollups.last_activity), cents per currency,
+# cents in the base currency or None when an FX rate is missing].
+Partials = dict[Tuple[int, int], list]
+PARTIAL_POSITIONS = {
+    "total_minutes": 0,
+    "billable_minutes": 1,
+    "non_billable_minutes": 2,
+    "total_amount": 3,
+    "last_activity": 4,
+}
+
+
+def _add_amount(totals: list, currency: str, cents: int) -> None:
+    if cents:
+        totals[3] += cents
+        totals[5][currency] = totals[5].get(currency, 0) + cents
+
+
+def _add_base(totals: list, cents: int | None) -> None:
+    if totals[6] is not None:
+        totals[6] = None if cents is None else totals[6] + cents
+
+
+def entry_partials(user: User, filters: ReportFilters) -> Partials:
+    """Aggregate raw entries per (project, user), ignoring ordering and paging.
+
+    Entries are grouped in the database by everything the per-entry amount
+    depends on (resolved rate and duration), so each distinct amount is
+    rounded once and multiplied by its entry count. Totals are identical to
+    rounding every entry individually. Amounts in other currencies are
+    converted per day, as they are from the rollups.
+    """
+    groups = (
+        annotate_effective_currency(annotate_effective_rate(build_queryset(user, filters)))
+        .order_by()
+        .values("project_id", "user_id", "billable", "date", "duration_minutes", "effective_rate", "effective_currency")
+        .annotate(entries=Count("id"), **rollups.activity_aggregates())
+    )
+
+    table = fx.get_table()
+    partials: Partials = {}
+    foreign: dict[tuple, int] = {}
+    for group in groups:
+        key = (group["project_id"], group["user_id"])
+        activity = rollups.last_activity(group["date"], group["newest_start"], group["untimed"])
+        totals = partials.get(key)
+        if totals is None:
+            totals = partials[key] = [0, 0, 0, 0, activity, {}, 0]
+        elif activity > totals[4]:
+            totals[4] = activity
+
+        minutes = group["duration_minutes"] * group["entries"]
+        totals[0] += minutes
+        totals[1 if group["billable"] else 2] += minutes
+        rate = group["effective_rate"]
+        if rate:
+            cents = money.entry_cents(group["duration_minutes"], money.to_cents(rate)) * group["entries"]
+            currency = group["effective_currency"]
+            _add_amount(totals, currency, cents)
+            if currency == table.base:
+                totals[6] += cents
+            else:
+                day = (key, group["billable"], currency, group["date"])
+                foreign[day] = foreign.get(day, 0) + cents
+    for (key, _, currency, day), cents in foreign.items():
+        _add_base(partials[key], table.convert(cents, currency, day))
+    return partials
+
+
+def _grouped_partials(queryset, base_amount: str | None = None) -> Partials:
+    """Aggregate rollup-shaped rows per (project, user).
+
+    ``base_amount`` names a stored base-currency amount; without one, rows in
+    other currencies are converted one by one at their date's FX rate.
+    """
+    table = fx.get_table()
+    aggregates = {
+        "minutes": Sum("total_minutes"),
+        "billable_part": Coalesce(Sum("total_minutes", filter=Q(billable=True)), 0),
+        "non_billable_part": Coalesce(Sum("total_minutes", filter=Q(billable=False)), 0),
+        "amount": Sum("total_amount"),
+        "activity": Max("last_activity"),
+    }
+    if base_amount:
+        aggregates["base"] = Sum(base_amount)
+        aggregates["unconverted"] = Count("id", filter=Q(**{f"{base_amount}__isnull": True}))
+    groups = queryset.order_by().values("project_id", "user_id", "currency").annotate(**aggregates)
+
+    partials: Partials = {}
+    for group in groups.iterator(chunk_size=CHUNK_SIZE):
+        key = (group["project_id"], group["user_id"])
+        totals = partials.get(key)
+        if totals is None:
+            totals = partials[key] = [0, 0, 0, 0, group["activity"], {}, 0]
+        elif group["activity"] > totals[4]:
+            totals[4] = group["activity"]
+        totals[0] += group["minutes"]
+        totals[1] += group["billable_part"]
+        totals[2] += group["non_billable_part"]
+        cents = money.to_cents(group["amount"])
+        _add_amount(totals, group["currency"], cents)
+        if base_amount:
+            _add_base(totals, None if group["unconverted"] else money.to_cents(group["base"]))
+        elif group["currency"] == table.base:
+            totals[6] += cents
+
+    if not base_amount:
+        foreign = (
+            queryset.exclude(currency=table.base)
+            .exclude(total_amount=0)
+            .values_list("project_id", "user_id", "currency", "date", "total_amount")
+        )
+        for project_id, user_id, currency, day, amount in foreign.iterator(chunk_size=CHUNK_SIZE):
+            _add_base(partials[(project_id, user_id)], table.convert(money.to_cents(amount), currency, day))
+    return partials
+
+
+def rollup_partials(user: User, filters: ReportFilters) -> Partials:
+    return _grouped_partials(build_rollup_queryset(user, filters))
+
+
+def snapshot_partials(user: User, filters: ReportFilters, period_ids: Iterable[int]) -> Partials:
+    """Frozen totals of the closed periods ``period_ids``; their months replace the date filters."""
+    snapshots = models.PeriodSnapshot.objects.filter(period_id__in=list(period_ids))
+    undated = replace(filters, date_from=None, date_to=None)
+    return _grouped_partials(_scope(snapshots, user, undated), base_amount="base_amount")
+
+
+def _live_partials(user: User, filters: ReportFilters, shard: bool) -> Partials:
+    if shard:
+        return sharding.sharded_partials(user, filters)
+    if rollups.can_serve(filters):
+        return rollup_partials(user, filters)
+    return entry_partials(user, filters)
+
+
+def merge_partials(parts: Iterable[Partials]) -> Partials:
+    """Add up partial totals; cents are integers, so the merge is exact."""
+    merged: Partials = {}
+    for part in parts:
+        for key, totals in part.items():
+            current = merged.get(key)
+            if current is None:
+                merged[key] = list(totals)
+                continue
+            for index in range(4):
+                current[index] += totals[index]
+            if totals[4] > current[4]:
+                current[4] = totals[4]
+            current[5] = {
+                currency: current[5].get(currency, 0) + totals[5].get(currency, 0)
+                for currency in current[5].keys() | totals[5].keys()
             }
+            _add_base(current, totals[6])
+    return merged
+
+
+def _amount_fields(totals: list) -> dict:
+    return {
+        "amounts": {currency: money.from_cents(cents) for currency, cents in sorted(totals[5].items())},
+        "base_amount": money.from_cents(totals[6]) if totals[6] is not None else None,
+        "base_currency": settings.REPORTS_BASE_CURRENCY,
+    }
+
+
+def page_partials(partials: Partials, filters: ReportFilters) -> list[tuple[int, int, dict]]:
+    """Order and slice ``partials`` with the same tie-breaks as the rollup query."""
+    field, descending = filters.order
+    position = PARTIAL_POSITIONS[field]
+    keys = sorted(partials)
+    keys.sort(key=lambda key: partials[key][position], reverse=descending)
+    end = filters.offset + filters.limit if filters.limit else None
+    page = []
+    for project_id, user_id in keys[filters.offset : end]:
+        totals = partials[(project_id, user_id)]
+        total, billable, non_billable, cents = totals[:4]
+        page.append(
+            (
+                project_id,
+                user_id,
+                {
+                    "total_minutes": total,
+                    "billable_minutes": billable,
+                    "non_billable_minutes": non_billable,
+                    "total_amount": money.from_cents(cents),
+                    **_amount_fields(totals),
+                },
+            )
+        )
+    return page
+
+
+def _rollup_totals(user: User, filters: ReportFilters) -> Iterator[tuple[int, int, dict]]:
+    scope = build_rollup_queryset(user, filters)
+    groups = (
+        scope.order_by()
+        .values("project_id", "user_id")
+        .annotate(
+            minutes=Sum("total_minutes"),
+            billable_part=Coalesce(Sum("total_minutes", filter=Q(billable=True)), 0),
+            non_billable_part=Coalesce(Sum("total_minutes", filter=Q(billable=False)), 0),
+            amount=Sum("total_amount"),
+            activity=Max("last_activity"),
+        )
+    )
+    field, descending = filters.order
+    order = F(SUMMARY_ORDERINGS[field])
+    groups = groups.order_by(order.desc() if descending else order.asc(), "project_id", "user_id")
+    if filters.limit:
+        groups = groups[filters.offset : filters.offset + filters.limit]
+    elif filters.offset:
+        groups = groups[filters.offset :]
+    rows = groups.iterator(chunk_size=CHUNK_SIZE)
+    while chunk := list(islice(rows, CHUNK_SIZE)):
+        # The currency split of a page comes from one more grouped pass over its keys.
+        amounts = _grouped_partials(
+            scope.filter(
+                project_id__in={group["project_id"] for group in chunk},
+                user_id__in={group["user_id"] for group in chunk},
+            ),
+        )
+        for group in chunk:
+            yield (
+                group["project_id"],
+                group["user_id"],
+                {
+                    "total_minutes": group["minutes"],
+                    "billable_minutes": group["billable_part"],
+                    "non_billable_minutes": group["non_billable_part"],
+                    "total_amount": group["amount"].quantize(CENT),
+                    **_amount_fields(amounts[(group["project_id"], group["user_id"])]),
+                },
+            )
+
 
-        payload = summary_map[key]
-        payload["total_minutes"] += entry.duration_minutes
-        if entry.billable:
-            payload["billable_minutes"] += entry.duration_minutes
+def iter_summary(user: User, filters: ReportFilters, parallel: bool | None = None) -> Iterator[dict]:
+    """Yield report totals per (project, user), most recently active first.
+
+    ``filters.ordering``, ``limit`` and ``offset`` select a page of the totals;
+    on rollups the database does the top-N selection.
+
+    Rollup-backed reports are read through a chunked cursor and labelled
+    one chunk at a time, so memory stays flat however many rows match.
+
+    Each row carries its amounts per currency and their sum converted to
+    ``REPORTS_BASE_CURRENCY``, which is ``None`` when an FX rate is missing.
+
+    Closed months the date range fully covers are read from their snapshots.
+    Reports estimated above ``REPORTS_PARALLEL_MIN_ROWS`` rows are split into
+    date shards aggregated in a process pool; ``parallel`` forces that on or off.
+    The estimate is made once for the whole range, not per open stretch.
+    """
+    shard = sharding.should_shard(user, filters, force=parallel)
+    closed, live = periods.split(filters)
+    if closed:
+        partials = merge_partials(
+            [snapshot_partials(user, filters, closed), *(_live_partials(user, part, shard) for part in live)]
+        )
+        totals: Iterable[tuple[int, int, dict]] = page_partials(partials, filters)
+    elif shard:
+        totals = page_partials(sharding.sharded_partials(user, filters), filters)
+    elif rollups.can_serve(filters):
+        totals = _rollup_totals(user, filters)
+    else:
+        # Amounts need per-entry rounding, so raw reports are ordered and paged here.
+        totals = page_partials(entry_partials(user, filters), filters)
+
+    totals = iter(totals)
+    while chunk := list(islice(totals, CHUNK_SIZE)):
+        projects, users = display_labels(
+            (project_id for project_id, _, _ in chunk),
+            (user_id for _, user_id, _ in chunk),
+        )
+        for project_id, user_id, payload in chunk:
+            client_name, project_name = projects[project_id]
+            yield {
+                "client": client_name,
+                "project": project_name,
+                "user": users[user_id],
+                **payload,
+            }
+
+
+def summarize(user: User, filters: ReportFilters, parallel: bool | None = None) -> List[dict]:
+    """Report totals per (project, user), most recently active first."""
+    return list(iter_summary(user, filters, parallel))
+
+
+def iter_entries(user: User, filters: ReportFilters) -> Iterator[dict]:
+    """Yield every filtered entry with its billed rate and amount.
+
+    Rows come straight from a chunked ``values_list`` cursor; rates are
+    resolved against the shared :class:`~core.services.rates.RateTimeline`.
+    """
+    entries = (
+        build_queryset(user, filters)
+        .order_by("-date", "-start", "-id")
+        .values_list(
+            "id",
+            "date",
+            "project__client__name",
+            "project__name",
+            "user__first_name",
+            "user__last_name",
+            "user__email",
+            "task",
+            "notes",
+            "duration_minutes",
+            "billable",
+            "project_id",
+            "project__client_id",
+            "project__billing_type",
+            "project__hourly_rate",
+            "project__currency",
+        )
+    )
+    timeline = rates.get_timeline()
+    hourly = models.Project.BillingType.HOURLY
+
+    for (
+        entry_id,
+        entry_date,
+        client_name,
+        project_name,
+        first_name,
+        last_name,
+        email,
+        task,
+        notes,
+        minutes,
+        billable,
+        project_id,
+        client_id,
+        billing_type,
+        default_rate,
+        default_currency,
+    ) in entries.iterator(chunk_size=CHUNK_SIZE):
+        rate = rates.billing_rate(
+            timeline,
+            project_id=project_id,
+            client_id=client_id,
+            billing_type=billing_type,
+            default_rate=default_rate,
+            default_currency=default_currency,
+            on=entry_date,
+        )
+        if rate is None:
+            hourly_rate, amount = None, None
+            currency = default_currency if billing_type == hourly else None
         else:
-            payload["non_billable_minutes"] += entry.duration_minutes
+            hourly_rate, currency = rate[0].quantize(CENT), rate[1]
+            amount = money.entry_amount(minutes, rate[0]) if billable else None
+        yield {
+            "id": entry_id,
+            "date": entry_date,
+            "client": client_name,
+            "project": project_name,
+            "user": f"{first_name} {last_name}".strip() or email,
+            "task": task,
+            "notes": notes,
+            "duration_minutes": minutes,
+            "billable": billable,
+            "hourly_rate": hourly_rate,
+            "amount": amount,
+            "currency": currency,
+        }
 
-        rate = resolve_rate(entry)
-        if rate:
-            hours = Decimal(entry.duration_minutes) / Decimal(60)
-            payload["total_amount"] += (hours * rate).quantize(Decimal("0.01"))
-
-    return list(summary_map.values())
-
-
-def export_csv(rows: Iterable[dict]) -> HttpResponse:
-    buffer = io.StringIO()
-    writer = csv.DictWriter(
-        buffer,
-        fieldnames=[
-            "client",
-            "project",
-            "user",
-            "total_minutes",
-            "billable_minutes",
-            "non_billable_minutes",
-            "total_amount",
-        ],
+
+def _hourly_entry_dues(client_ids: Iterable[int]) -> dict[int, list[dict]]:
+    entries = models.TimeEntry.objects.filter(
+        project__client_id__in=client_ids,
+        project__billing_type=models.Project.BillingType.HOURLY,
+        billable=True,
+    ).select_related("project")
+    timeline = rates.get_timeline()
+
+    dues: dict[int, dict[int, dict]] = {}
+    for entry in entries:
+        rate = resolve_rate(entry, timeline)
+        if rate is None:
+            rate = entry.project.hourly_rate
+        if rate is None:
+            continue
+        payload = dues.setdefault(entry.project.client_id, {}).setdefault(
+            entry.project_id,
+            {
+                "id": entry.project_id,
+                "name": entry.project.name,
+                "billable_minutes": 0,
+                "amount": 0,
+                "currency": entry.project.currency,
+            },
+        )
+        payload["billable_minutes"] += entry.duration_minutes
+        payload["amount"] += money.entry_cents(entry.duration_minutes, money.to_cents(rate))
+    for projects in dues.values():
+        for payload in projects.values():
+            payload["amount"] = money.from_cents(payload["amount"])
+    return {client_id: list(projects.values()) for client_id, projects in dues.items()}
+
+
+def _hourly_rollup_dues(client_ids: Iterable[int]) -> dict[int, list[dict]]:
+    groups = (
+        models.TimeEntryRollup.objects.filter(
+            project__client_id__in=client_ids,
+            project__billing_type=models.Project.BillingType.HOURLY,
+            billable=True,
+        )
+        .filter(Q(rated=True) | Q(project__hourly_rate__isnull=False))
+        .order_by()
+        .values("project_id", "project__client_id", "project__name", "project__currency")
+        .annotate(
+            billable_minutes=Sum("total_minutes"),
+            amount=Sum(F("total_amount") + F("default_rate_amount")),
+            last_date=Max("date"),
+        )
+        .order_by("-last_date", "project_id")
     )
-    writer.writeheader()
+    dues: dict[int, list[dict]] = {}
+    for group in groups:
+        dues.setdefault(group["project__client_id"], []).append(
+            {
+                "id": group["project_id"],
+                "name": group["project__name"],
+                "billable_minutes": group["billable_minutes"],
+                "amount": group["amount"].quantize(CENT),
+                "currency": group["project__currency"],
+            }
+        )
+    return dues
+
+
+def hourly_dues_by_client(client_ids: Iterable[int]) -> dict[int, list[dict]]:
+    """Billable minutes and amount due per hourly project, keyed by client id.
+
+    Entries without an HourlyRate fall back to ``Project.hourly_rate``. The
+    query count does not depend on how many clients are asked for; clients
+    without hourly work are left out.
+    """
+    client_ids = list(client_ids)
+    if rollups.can_serve():
+        return _hourly_rollup_dues(client_ids)
+    return _hourly_entry_dues(client_ids)
+
+
+def hourly_project_dues(client: models.Client) -> list[dict]:
+    """Billable minutes and amount due per hourly project of ``client``."""
+    return hourly_dues_by_client([client.pk]).get(client.pk, [])
+
+
+class _Echo:
+    """File-like object whose ``write`` hands back the line instead of storing it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(rows: Iterable[dict], fieldnames: Iterable[str]) -> Iterator[str]:
+    """Yield CSV text for ``rows`` in blocks of ``CHUNK_SIZE`` lines."""
+    writer = csv.DictWriter(_Echo(), fieldnames=list(fieldnames), extrasaction="ignore")
+    block = [writer.writeheader()]
     for row in rows:
-        writer.writerow(row)
+        block.append(writer.writerow(row))
+        if len(block) >= CHUNK_SIZE:
+            yield "".join(block)
+            block = []
+    if block:
+        yield "".join(block)
+
 
-    response = HttpResponse(buffer.getvalue(), content_type="text/csv")
+def export_csv(rows: Iterable[dict]) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(iter_csv(rows, SUMMARY_FIELDS), content_type="text/csv")
     response["Content-Disposition"] = 'attachment; filename="worktrace-report.csv"'
     return response
 
 
+def iter_ndjson(rows: Iterable[dict]) -> Iterator[str]:
+    """Yield one JSON document per row, in blocks of ``CHUNK_SIZE`` lines."""
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    block: list[str] = []
+    for row in rows:
+        block.append(encoder.encode(row) + "\n")
+        if len(block) >= CHUNK_SIZE:
+            yield "".join(block)
+            block = []
+    if block:
+        yield "".join(block)
+
+
+def export_entries_csv(rows: Iterable[dict]) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(iter_csv(rows, ENTRY_FIELDS), content_type="text/csv")
+    response["Content-Disposition"] = 'attachment; filename="worktrace-entries.csv"'
+    return response
+
+
+def export_entries_ndjson(rows: Iterable[dict]) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(iter_ndjson(rows), content_type="application/x-ndjson")
+    response["Content-Disposition"] = 'attachment; filename="worktrace-entries.ndjson"'
+    return response
+
+
+def summary_pages(rows: Iterable[dict], chunk_rows: int | None = None) -> List[str]:
+    """Render the summary template once per ``chunk_rows`` rows.
+
+    WeasyPrint lays out each chunk separately, which keeps very large tables
+    from being laid out as a single document.
+    """
+    chunk_rows = chunk_rows or settings.PDF_CHUNK_ROWS
+    rows = iter(rows)
+    pages = []
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if pages and not chunk:
+            return pages
+        pages.append(
+            render_to_string(
+                "reports/summary.html",
+                {
+                    "rows": chunk,
+                    "show_title": not pages,
+                    "branding": {
+                        "title": "Worktrace Report",
+                    },
+                },
+            )
+        )
+
+
+def render_pdf(rows: Iterable[dict], tick: Callable[[], None] | None = None) -> bytes:
+    """Render the summary ``rows`` as a PDF; ``tick`` is passed on to :func:`pdf.render`."""
+    return pdf.render(summary_pages(rows), render_to_string("reports/summary.css"), tick)
+
+
 def export_pdf(rows: Iterable[dict]) -> HttpResponse:
-    html_content = render_to_string(
-        "reports/summary.html",
-        {
-            "rows": rows,
-            "branding": {
-                "title": "Worktrace Report",
-            },
-        },
-    )
-    pdf_file = HTML(string=html_content).write_pdf()
-    response = HttpResponse(pdf_file, content_type="application/pdf")
+    response = HttpResponse(render_pdf(rows), content_type="application/pdf")
     response["Content-Disposition"] = 'attachment; filename="worktrace-report.pdf"'
     return response
 
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Max, Q, Value
+from django.db.models.functions import Greatest
+
+from .. import models
+from . import money, rates
+
+TRACKED_FIELDS = ("project_id", "user_id", "date", "billable", "duration_minutes", "start")
+PRICED_FIELDS = ("project_id", "user_id", "date", "billable", "duration_minutes")
+BUCKET_FIELDS = ("project_id", "user_id", "date", "billable")
+BATCH_SIZE = 1000
+
+
+def can_serve(filters=None) -> bool:
+    """Whether a report with ``filters`` can be answered from the rollups.
+
+    Every ``ReportFilters`` field is a rollup dimension, so this only depends
+    on the ``REPORTS_USE_ROLLUPS`` switch.
+    """
+    return settings.REPORTS_USE_ROLLUPS
+
+
+def last_activity(day: date, newest_start: time | None, untimed: bool = False) -> datetime:
+    """Sort key of the newest of a day's entries under ``TimeEntry.Meta.ordering``.
+
+    ``newest_start`` is their latest ``start`` and ``untimed`` whether any has
+    none; a missing start sorts where the database puts NULLs, so summaries
+    list equal last dates in the order the entries themselves come up.
+    """
+    missing = time.max if connection.features.nulls_order_largest else time.min
+    if newest_start is None:
+        newest_start = missing
+    elif untimed:
+        newest_start = max(newest_start, missing)
+    return datetime.combine(day, newest_start, tzinfo=timezone.utc)
+
+
+def activity_aggregates() -> dict:
+    """Aggregates feeding :func:`last_activity` for a group of entries."""
+    return {"newest_start": Max("start"), "untimed": Count("id", filter=Q(start__isnull=True))}
+
+
+def _project_pricing(project_ids: Iterable[int] | None = None) -> dict[int, tuple]:
+    projects = models.Project.objects.all()
+    if project_ids is not None:
+        projects = projects.filter(pk__in=project_ids)
+    return {
+        pk: (client_id, hourly_rate, currency)
+        for pk, client_id, hourly_rate, currency in projects.values_list("pk", "client_id", "hourly_rate", "currency")
+    }
+
+
+def _price(minutes: int, rate: Optional[rates.Rate], default_rate: Decimal | None) -> tuple[int, int]:
+    """Cents at the effective rate and at the project's default rate."""
+    if rate is not None:
+        return money.entry_cents(minutes, money.to_cents(rate[0])), 0
+    if default_rate is not None:
+        return 0, money.entry_cents(minutes, money.to_cents(default_rate))
+    return 0, 0
+
+
+def _add(
+    key: dict,
+    *,
+    entries: int,
+    minutes: int,
+    amount: Decimal,
+    default_amount: Decimal,
+    rated: bool,
+    currency: str,
+    activity: datetime,
+) -> None:
+    buckets = models.TimeEntryRollup.objects.filter(**key)
+    changes = {
+        "entry_count": F("entry_count") + entries,
+        "total_minutes": F("total_minutes") + minutes,
+        "total_amount": F("total_amount") + amount,
+        "default_rate_amount": F("default_rate_amount") + default_amount,
+    }
+    if entries > 0:
+        changes["last_activity"] = Greatest(F("last_activity"), Value(activity))
+    if buckets.update(**changes):
+        if entries < 0:
+            buckets.filter(entry_count=0).delete()
+            _reset_activity(key, buckets.filter(last_activity__lte=activity))
+        return
+    if entries < 0:
+        return
+    try:
+        with transaction.atomic():
+            models.TimeEntryRollup.objects.create(
+                **key,
+                entry_count=entries,
+                total_minutes=minutes,
+                rated=rated,
+                currency=currency,
+                total_amount=amount,
+                default_rate_amount=default_amount,
+                last_activity=activity,
+            )
+    except IntegrityError:
+        buckets.update(**changes)
+
+
+def _reset_activity(key: dict, buckets) -> None:
+    # Only removing the bucket's newest entry reads the day's other entries again.
+    if buckets.exists():
+        seen = models.TimeEntry.objects.filter(**key).aggregate(**activity_aggregates())
+        buckets.update(last_activity=last_activity(key["date"], seen["newest_start"], seen["untimed"]))
+
+
+def _apply(state: dict, sign: int, timeline: rates.RateTimeline) -> None:
+    pricing = _project_pricing([state["project_id"]]).get(state["project_id"])
+    if pricing is None:
+        return
+    client_id, default_rate, currency = pricing
+    rate = timeline.rate_for(state["project_id"], client_id, state["date"])
+    amount, default_amount = _price(state["duration_minutes"], rate, default_rate)
+    _add(
+        {field: state[field] for field in BUCKET_FIELDS},
+        entries=sign,
+        minutes=sign * state["duration_minutes"],
+        amount=money.from_cents(sign * amount),
+        default_amount=money.from_cents(sign * default_amount),
+        rated=rate is not None,
+        currency=rate[1] if rate is not None else currency,
+        activity=last_activity(state["date"], state["start"]),
+    )
+
+
+def entry_state(entry: models.TimeEntry) -> dict:
+    return {field: getattr(entry, field) for field in TRACKED_FIELDS}
+
+
+def record_entry(entry: models.TimeEntry, previous: dict | None) -> None:
+    """Move an entry's contribution from its ``previous`` bucket to its current one."""
+    current = entry_state(entry)
+    if previous is not None and {field: previous[field] for field in TRACKED_FIELDS} == current:
+        return
+    timeline = rates.get_timeline()
+    if previous is not None:
+        _apply(previous, -1, timeline)
+    _apply(current, 1, timeline)
+
+
+def discard_entry(entry: models.TimeEntry) -> None:
+    _apply(entry_state(entry), -1, rates.get_timeline())
+
+
+def rebuild(
+    project_ids: Iterable[int] | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> int:
+    """Recompute the rollups in scope from the raw entries.
+
+    Returns the number of rollup rows written.
+    """
+    if project_ids is not None:
+        project_ids = list(project_ids)
+    entries = models.TimeEntry.objects.all()
+    buckets = models.TimeEntryRollup.objects.all()
+    if project_ids is not None:
+        entries = entries.filter(project_id__in=project_ids)
+        buckets = buckets.filter(project_id__in=project_ids)
+    if date_from:
+        entries = entries.filter(date__gte=date_from)
+        buckets = buckets.filter(date__gte=date_from)
+    if date_to:
+        entries = entries.filter(date__lte=date_to)
+        buckets = buckets.filter(date__lte=date_to)
+
+    groups = (
+        entries.order_by()
+        .values(*PRICED_FIELDS)
+        .annotate(entries=Count("id"), **activity_aggregates())
+        .order_by(*BUCKET_FIELDS)
+    )
+    pricing = _project_pricing(project_ids)
+    timeline = rates.get_timeline()
+
+    written = 0
+    with transaction.atomic():
+        buckets.delete()
+        batch: list[models.TimeEntryRollup] = []
+        bucket = bucket_key = None
+        amount_cents = default_cents = 0
+        for group in groups.iterator(chunk_size=BATCH_SIZE):
+            key = tuple(group[field] for field in BUCKET_FIELDS)
+            if bucket is None or key != bucket_key:
+                if bucket is not None:
+                    bucket.total_amount = money.from_cents(amount_cents)
+                    bucket.default_rate_amount = money.from_cents(default_cents)
+                    batch.append(bucket)
+                if len(batch) >= BATCH_SIZE:
+                    models.TimeEntryRollup.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+                client_id, default_rate, currency = pricing[group["project_id"]]
+                rate = timeline.rate_for(group["project_id"], client_id, group["date"])
+                bucket_key = key
+                bucket = models.TimeEntryRollup(
+                    **dict(zip(BUCKET_FIELDS, key)),
+                    rated=rate is not None,
+                    currency=rate[1] if rate is not None else currency,
+                )
+                amount_cents = default_cents = 0
+            amount, default_amount = _price(group["duration_minutes"], rate, default_rate)
+            activity = last_activity(group["date"], group["newest_start"], group["untimed"])
+            if bucket.last_activity is None or activity > bucket.last_activity:
+                bucket.last_activity = activity
+            bucket.entry_count += group["entries"]
+            bucket.total_minutes += group["duration_minutes"] * group["entries"]
+            amount_cents += amount * group["entries"]
+            default_cents += default_amount * group["entries"]
+        if bucket is not None:
+            bucket.total_amount = money.from_cents(amount_cents)
+            bucket.default_rate_amount = money.from_cents(default_cents)
+            batch.append(bucket)
+        models.TimeEntryRollup.objects.bulk_create(batch)
+        written += len(batch)
+    return written
+
+
+def refresh_rate_scope(*states: dict | None) -> None:
+    """Rebuild the rollups priced by the given HourlyRate states.
+
+    ``states`` are ``project_id``/``client_id``/``effective_from``/``effective_to``
+    snapshots of a rate before and after a change.
+    """
+    project_ids: set[int] = set()
+    starts: list[date] = []
+    ends: list[date | None] = []
+    for state in filter(None, states):
+        if state["project_id"]:
+            project_ids.add(state["project_id"])
+        else:
+            project_ids.update(
+                models.Project.objects.filter(client_id=state["client_id"]).values_list("pk", flat=True)
+            )
+        starts.append(state["effective_from"])
+        ends.append(state["effective_to"])
+    if not project_ids:
+        return
+    date_to = None if None in ends else max(ends)
+    rebuild(project_ids, date_from=min(starts), date_to=date_to)
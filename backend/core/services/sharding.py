@@ -0,0 +1,180 @@
+"""Summary totals for very large reports, aggregated in date shards across processes.
+
+The report's date range is cut into contiguous shards. Each shard is summed by
+:func:`reporting.entry_partials` or :func:`reporting.rollup_partials` in a
+pool process with its own database connection, and the partials are merged in
+the caller. Amounts travel as integer cents, so the merged totals are exactly
+those of a single pass.
+
+Pool processes are spawned and set Django up in their initializer; this module
+must not import models at the top, since it is imported there before setup.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace
+from datetime import date, timedelta
+
+from django.conf import settings
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def workers() -> int:
+    return settings.REPORTS_PARALLEL_WORKERS or os.cpu_count() or 1
+
+
+def _setup(settings_module: str) -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_setup,
+                initargs=(os.environ["DJANGO_SETTINGS_MODULE"],),
+            )
+        return _pool
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _queryset(user, filters):
+    from . import reporting, rollups
+
+    if rollups.can_serve(filters):
+        return reporting.build_rollup_queryset(user, filters)
+    return reporting.build_queryset(user, filters)
+
+
+def estimate_rows(user, filters) -> int:
+    """Rows the report reads: the planner's estimate on PostgreSQL, a count elsewhere."""
+    from django.db import connection
+
+    queryset = _queryset(user, filters)
+    if connection.vendor == "postgresql":
+        plan = json.loads(queryset.explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+    return queryset.count()
+
+
+def _spans_many_days(filters) -> bool:
+    """Whether the date range is open-ended or covers at least ``REPORTS_PARALLEL_MIN_DAYS`` days."""
+    if not filters.date_from or not filters.date_to:
+        return True
+    try:
+        days = (date.fromisoformat(filters.date_to) - date.fromisoformat(filters.date_from)).days + 1
+    except ValueError:
+        return True
+    return days >= settings.REPORTS_PARALLEL_MIN_DAYS
+
+
+def should_shard(user, filters, force: bool | None = None) -> bool:
+    """Whether to shard; ``force`` skips the row estimate either way.
+
+    Rollups already hold one row per project, user and day, so rollup-backed
+    reports over short ranges are answered in one pass without estimating.
+    """
+    from . import rollups
+
+    if force is not None:
+        return force
+    threshold = settings.REPORTS_PARALLEL_MIN_ROWS
+    if threshold <= 0 or (rollups.can_serve(filters) and not _spans_many_days(filters)):
+        return False
+    return estimate_rows(user, filters) >= threshold
+
+
+def _bounds(user, filters) -> tuple[date, date] | None:
+    from django.db.models import Max, Min
+
+    first = date.fromisoformat(filters.date_from) if filters.date_from else None
+    last = date.fromisoformat(filters.date_to) if filters.date_to else None
+    if first is None or last is None:
+        seen = _queryset(user, filters).aggregate(first=Min("date"), last=Max("date"))
+        first, last = first or seen["first"], last or seen["last"]
+    if first is None or last is None or first > last:
+        return None
+    return first, last
+
+
+def date_shards(first: date, last: date, count: int) -> list[tuple[date, date]]:
+    """Split ``first``..``last`` (inclusive) into at most ``count`` contiguous ranges."""
+    days = (last - first).days + 1
+    count = max(1, min(count, days))
+    size, extra = divmod(days, count)
+    shards = []
+    start = first
+    for index in range(count):
+        end = start + timedelta(days=size + (index < extra) - 1)
+        shards.append((start, end))
+        start = end + timedelta(days=1)
+    return shards
+
+
+def _partials(user, filters, use_rollups: bool) -> dict:
+    from . import reporting
+
+    if use_rollups:
+        return reporting.rollup_partials(user, filters)
+    return reporting.entry_partials(user, filters)
+
+
+def shard_partials(user_id: int, filters, use_rollups: bool) -> dict:
+    """Partial totals for one shard; runs in a pool process."""
+    from django.contrib.auth import get_user_model
+    from django.db import close_old_connections
+
+    close_old_connections()
+    try:
+        return _partials(get_user_model().objects.get(pk=user_id), filters, use_rollups)
+    finally:
+        close_old_connections()
+
+
+def sharded_partials(user, filters) -> dict:
+    """:func:`reporting.entry_partials` or ``rollup_partials`` for ``filters``, computed per date shard.
+
+    With ``REPORTS_PARALLEL_WORKERS`` set to 1 the shards run in this process.
+    """
+    from . import reporting, rollups
+
+    # Decided here once so every shard reads the same source as the caller.
+    use_rollups = rollups.can_serve(filters)
+    bounds = _bounds(user, filters)
+    if bounds is None:
+        return {}
+    count = workers()
+    shards = [
+        replace(filters, date_from=start.isoformat(), date_to=end.isoformat(), ordering=None, limit=None, offset=0)
+        for start, end in date_shards(*bounds, count * 2)
+    ]
+    if count <= 1:
+        return reporting.merge_partials(_partials(user, shard, use_rollups) for shard in shards)
+    pool = _get_pool()
+    try:
+        partials = pool.map(shard_partials, [user.pk] * len(shards), shards, [use_rollups] * len(shards))
+        return reporting.merge_partials(partials)
+    except BrokenProcessPool:
+        shutdown()
+        raise
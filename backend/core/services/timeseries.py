@@ -0,0 +1,181 @@
+"""Hours and revenue over time, bucketed by day, week or month in the database."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Iterator
+
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
+
+from .. import models
+from . import money, reporting, rollups
+
+INTERVALS = {
+    # ``date`` is a DateField, so it already is its own day bucket.
+    "day": F,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+SPLITS = {
+    "client": "project__client_id",
+    "project": "project_id",
+    "user": "user_id",
+}
+MAX_BUCKETS = 1500
+
+# (bucket, split key, minutes, billable minutes, currency, amount in cents)
+Point = tuple[date, "int | None", int, int, str, int]
+
+
+def bucket_start(day: date, interval: str) -> date:
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(bucket: date, interval: str) -> date:
+    if interval == "week":
+        return bucket + timedelta(days=7)
+    if interval == "month":
+        return (bucket.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return bucket + timedelta(days=1)
+
+
+def bucket_range(first: date, last: date, interval: str) -> list[date]:
+    """Every bucket from the one holding ``first`` to the one holding ``last``."""
+    bucket, last = bucket_start(first, interval), bucket_start(last, interval)
+    if interval == "month":
+        count = (last.year - bucket.year) * 12 + last.month - bucket.month + 1
+    else:
+        count = (last - bucket).days // (7 if interval == "week" else 1) + 1
+    if count > MAX_BUCKETS:
+        raise ValueError(f"Too many {interval} buckets ({count}); narrow the date range or use a longer interval.")
+    buckets = []
+    while bucket <= last:
+        buckets.append(bucket)
+        bucket = _next_bucket(bucket, interval)
+    return buckets
+
+
+def _parse_date(value) -> date | None:
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _rollup_points(user, filters: reporting.ReportFilters, interval: str, split_field: str | None) -> Iterator[Point]:
+    dimensions = ["bucket", *([split_field] if split_field else [])]
+    groups = (
+        reporting.build_rollup_queryset(user, filters)
+        .annotate(bucket=INTERVALS[interval]("date"))
+        .order_by()
+        .values(*dimensions, "currency")
+        .annotate(
+            minutes=Sum("total_minutes"),
+            billable_part=Coalesce(Sum("total_minutes", filter=Q(billable=True)), 0),
+            amount=Sum("total_amount"),
+        )
+    )
+    for group in groups.iterator(chunk_size=reporting.CHUNK_SIZE):
+        yield (
+            group["bucket"],
+            group[split_field] if split_field else None,
+            group["minutes"],
+            group["billable_part"],
+            group["currency"],
+            money.to_cents(group["amount"]),
+        )
+
+
+def _entry_points(user, filters: reporting.ReportFilters, interval: str, split_field: str | None) -> Iterator[Point]:
+    # Grouped by what the per-entry amount depends on, as in reporting.entry_partials.
+    dimensions = ["bucket", *([split_field] if split_field else [])]
+    entries = reporting.annotate_effective_rate(reporting.build_queryset(user, filters))
+    groups = (
+        reporting.annotate_effective_currency(entries)
+        .annotate(bucket=INTERVALS[interval]("date"))
+        .order_by()
+        .values(*dimensions, "billable", "duration_minutes", "effective_rate", "effective_currency")
+        .annotate(entries=Count("id"))
+    )
+    for group in groups.iterator(chunk_size=reporting.CHUNK_SIZE):
+        minutes = group["duration_minutes"] * group["entries"]
+        rate = group["effective_rate"]
+        amount = money.entry_cents(group["duration_minutes"], money.to_cents(rate)) * group["entries"]
+        yield (
+            group["bucket"],
+            group[split_field] if split_field else None,
+            minutes,
+            minutes if group["billable"] else 0,
+            group["effective_currency"],
+            amount,
+        )
+
+
+def _labels(split: str | None, keys) -> dict:
+    if split == "client":
+        return dict(models.Client.objects.filter(pk__in=keys).values_list("pk", "name"))
+    if split == "project":
+        projects, _ = reporting.display_labels(keys, ())
+        return {pk: name for pk, (_, name) in projects.items()}
+    if split == "user":
+        _, users = reporting.display_labels((), keys)
+        return users
+    return {None: None}
+
+
+def build(user, filters: reporting.ReportFilters, interval: str = "day", split: str | None = None) -> dict:
+    """Return zero-filled totals per bucket as parallel arrays, one series per split key.
+
+    Buckets span the requested date range, or the data's range when a bound
+    is missing. Amounts follow the same rate rules as the summary report and
+    are kept per currency, one array each under ``amounts``.
+    """
+    split_field = SPLITS[split] if split else None
+    source = _rollup_points if rollups.can_serve(filters) else _entry_points
+
+    totals: dict = {} if split else {None: {}}
+    for bucket, key, minutes, billable_minutes, currency, amount in source(user, filters, interval, split_field):
+        point = totals.setdefault(key, {}).setdefault(bucket_start(bucket, interval), [0, 0, {}])
+        point[0] += minutes
+        point[1] += billable_minutes
+        if amount:
+            point[2][currency] = point[2].get(currency, 0) + amount
+
+    seen = [bucket for points in totals.values() for bucket in points]
+    first = _parse_date(filters.date_from) or min(seen, default=None)
+    last = _parse_date(filters.date_to) or max(seen, default=None)
+    buckets = bucket_range(first, last, interval) if first and last and first <= last else []
+
+    labels = _labels(split, [key for key in totals if key is not None])
+    series = []
+    for key in sorted(totals, key=lambda key: (str(labels.get(key) or ""), key or 0)):
+        points = totals[key]
+        empty = (0, 0, {})
+        currencies = sorted({currency for point in points.values() for currency in point[2]})
+        series.append(
+            {
+                "key": key,
+                "label": labels.get(key),
+                "minutes": [points.get(bucket, empty)[0] for bucket in buckets],
+                "billable_minutes": [points.get(bucket, empty)[1] for bucket in buckets],
+                "amounts": {
+                    currency: [
+                        str(money.from_cents(points.get(bucket, empty)[2].get(currency, 0))) for bucket in buckets
+                    ]
+                    for currency in currencies
+                },
+            }
+        )
+    return {
+        "interval": interval,
+        "split": split,
+        "buckets": [bucket.isoformat() for bucket in buckets],
+        "series": series,
+    }
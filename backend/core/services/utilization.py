@@ -0,0 +1,113 @@
+"""Per-user utilization by ISO week.
+
+Utilization is billable minutes against ``UTILIZATION_WEEKLY_CAPACITY_MINUTES``;
+the billable ratio is billable minutes against all minutes logged. Weekly totals
+and each user's previous week come from one grouped query with ``LAG`` window
+functions. SQLite, and any backend without window support, gets the same rows
+from the grouped query alone, with the previous week carried over in Python:
+there the window pass costs more than the loop it replaces.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Iterator
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q, Sum, Window
+from django.db.models.functions import Coalesce, Lag, TruncWeek
+
+from . import reporting, rollups
+
+# (user id, week start, total minutes, billable minutes, previous week start,
+#  previous total minutes, previous billable minutes)
+Week = tuple[int, date, int, int, "date | None", "int | None", "int | None"]
+
+
+def _weekly(user, filters: reporting.ReportFilters):
+    if rollups.can_serve(filters):
+        queryset, minutes = reporting.build_rollup_queryset(user, filters), "total_minutes"
+    else:
+        queryset, minutes = reporting.build_queryset(user, filters), "duration_minutes"
+    total = Sum(minutes)
+    billable = Coalesce(Sum(minutes, filter=Q(billable=True)), 0)
+    weekly = (
+        queryset.annotate(week=TruncWeek("date"))
+        .order_by()
+        .values("user_id", "week")
+        .annotate(total=total, billable_part=billable)
+    )
+    return weekly, total, billable
+
+
+def _window_weeks(user, filters: reporting.ReportFilters) -> Iterator[Week]:
+    weekly, total, billable = _weekly(user, filters)
+    previous = {"partition_by": [F("user_id")], "order_by": F("week").asc()}
+    rows = weekly.annotate(
+        previous_week=Window(Lag("week"), **previous),
+        previous_total=Window(Lag(total), **previous),
+        previous_billable=Window(Lag(billable), **previous),
+    ).order_by("user_id", "week")
+    for row in rows.iterator(chunk_size=reporting.CHUNK_SIZE):
+        yield (
+            row["user_id"],
+            row["week"],
+            row["total"],
+            row["billable_part"],
+            row["previous_week"],
+            row["previous_total"],
+            row["previous_billable"],
+        )
+
+
+def _python_weeks(user, filters: reporting.ReportFilters) -> Iterator[Week]:
+    weekly, _, _ = _weekly(user, filters)
+    last = None
+    for row in weekly.order_by("user_id", "week").iterator(chunk_size=reporting.CHUNK_SIZE):
+        previous = last if last is not None and last[0] == row["user_id"] else (None, None, None, None)
+        yield (row["user_id"], row["week"], row["total"], row["billable_part"], *previous[1:])
+        last = (row["user_id"], row["week"], row["total"], row["billable_part"])
+
+
+def _ratio(part: int, whole: int) -> float | None:
+    return round(part / whole, 4) if whole else None
+
+
+def build(user, filters: reporting.ReportFilters, use_window: bool | None = None) -> dict:
+    """Return utilization per user and ISO week, with changes against the week before.
+
+    Only weeks with logged time are listed. The ``*_change`` fields compare
+    with the calendar week before, counting a week without entries as zero.
+    """
+    if use_window is None:
+        use_window = connection.vendor != "sqlite" and connection.features.supports_over_clause
+    weeks = list((_window_weeks if use_window else _python_weeks)(user, filters))
+    capacity = settings.UTILIZATION_WEEKLY_CAPACITY_MINUTES
+    _, users = reporting.display_labels((), {week[0] for week in weeks})
+
+    rows = []
+    for user_id, week, total, billable, previous_week, previous_total, previous_billable in weeks:
+        if previous_week != week - timedelta(days=7):
+            previous_total = previous_billable = 0
+        utilization = _ratio(billable, capacity)
+        previous_utilization = _ratio(previous_billable, capacity)
+        iso_year, iso_week, _ = week.isocalendar()
+        rows.append(
+            {
+                "user_id": user_id,
+                "user": users[user_id],
+                "week": f"{iso_year}-W{iso_week:02d}",
+                "week_start": week.isoformat(),
+                "total_minutes": total,
+                "billable_minutes": billable,
+                "billable_ratio": _ratio(billable, total),
+                "utilization": utilization,
+                "total_minutes_change": total - previous_total,
+                "billable_minutes_change": billable - previous_billable,
+                "utilization_change": (
+                    round(utilization - previous_utilization, 4) if utilization is not None else None
+                ),
+            }
+        )
+    return {"capacity_minutes": capacity, "rows": rows}
@@ -1,28 +1,140 @@
 from __future__ import annotations
 
 from django.db import models
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from .models import Project, TimeEntry
+from .models import Client, ClientAccountEntry, FxRate, HourlyRate, Project, ProjectAssignment, TimeEntry, User
+from .services import fx, ledgers, project_metrics, rates, report_cache, rollups
 
+RATE_SCOPE_FIELDS = ("project_id", "client_id", "effective_from", "effective_to")
+PROJECT_PRICING_FIELDS = ("client_id", "hourly_rate", "currency")
+PROJECT_METRIC_FIELDS = {"total_logged_minutes", "last_logged_at", "updated_at"}
 
-def _refresh_project_metrics(project: Project) -> None:
-    aggregates = project.time_entries.aggregate(
-        total_minutes=models.Sum("duration_minutes"),
-        last_logged=models.Max("created_at"),
-    )
-    project.total_logged_minutes = aggregates.get("total_minutes") or 0
-    project.last_logged_at = aggregates.get("last_logged")
-    project.save(update_fields=["total_logged_minutes", "last_logged_at", "updated_at"])
+
+def _previous_state(instance: models.Model, fields: tuple[str, ...], update_fields=None) -> dict | None:
+    if instance.pk is None:
+        return None
+    if update_fields is not None:
+        tracked = {field.removesuffix("_id") for field in fields}
+        if not tracked.intersection(update_fields):
+            return None
+    return type(instance)._default_manager.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver(pre_save, sender=TimeEntry)
+def time_entry_pre_save(sender, instance: TimeEntry, **kwargs) -> None:
+    instance._previous_state = _previous_state(instance, rollups.TRACKED_FIELDS)
 
 
 @receiver(post_save, sender=TimeEntry)
 def time_entry_saved(sender, instance: TimeEntry, **kwargs) -> None:
-    _refresh_project_metrics(instance.project)
+    previous = getattr(instance, "_previous_state", None)
+    rollups.record_entry(instance, previous)
+    project_metrics.record_entry(instance, previous)
+    client_ids = [instance.project.client_id]
+    if previous is not None and previous["project_id"] != instance.project_id:
+        client_ids += report_cache.clients_of_projects([previous["project_id"]])
+    report_cache.invalidate(*client_ids)
+    ledgers.record_entry(instance, previous)
 
 
 @receiver(post_delete, sender=TimeEntry)
 def time_entry_deleted(sender, instance: TimeEntry, **kwargs) -> None:
-    _refresh_project_metrics(instance.project)
+    rollups.discard_entry(instance)
+    project_metrics.discard_entry(instance)
+    report_cache.invalidate(instance.project.client_id)
+    ledgers.discard_entry(instance)
+
+
+@receiver(pre_save, sender=HourlyRate)
+def hourly_rate_pre_save(sender, instance: HourlyRate, **kwargs) -> None:
+    instance._previous_state = _previous_state(instance, RATE_SCOPE_FIELDS)
+
+
+@receiver(post_save, sender=HourlyRate)
+@receiver(post_delete, sender=HourlyRate)
+def hourly_rate_changed(sender, instance: HourlyRate, **kwargs) -> None:
+    rates.invalidate()
+    current = {field: getattr(instance, field) for field in RATE_SCOPE_FIELDS}
+    previous = getattr(instance, "_previous_state", None)
+    rollups.refresh_rate_scope(previous, current)
+    states = [state for state in (previous, current) if state]
+    client_ids = [
+        *(state["client_id"] for state in states),
+        *report_cache.clients_of_projects(state["project_id"] for state in states),
+    ]
+    report_cache.invalidate(*client_ids)
+    ledgers.invalidate(*client_ids)
+
+
+@receiver(post_save, sender=FxRate)
+@receiver(post_delete, sender=FxRate)
+def fx_rate_changed(sender, instance: FxRate, **kwargs) -> None:
+    fx.invalidate()
+    report_cache.invalidate(*Client.objects.values_list("pk", flat=True))
+
+
+@receiver(pre_save, sender=Project)
+def project_pre_save(sender, instance: Project, update_fields=None, **kwargs) -> None:
+    instance._previous_state = _previous_state(instance, PROJECT_PRICING_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance: Project, update_fields=None, **kwargs) -> None:
+    previous = getattr(instance, "_previous_state", None)
+    if previous is not None and any(previous[field] != getattr(instance, field) for field in PROJECT_PRICING_FIELDS):
+        rollups.rebuild([instance.pk])
+    if update_fields is not None and PROJECT_METRIC_FIELDS.issuperset(update_fields):
+        return
+    report_cache.invalidate(instance.client_id, previous["client_id"] if previous else None)
+    ledgers.invalidate(instance.client_id, previous["client_id"] if previous else None)
 
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance: Project, **kwargs) -> None:
+    report_cache.invalidate(instance.client_id)
+    ledgers.invalidate(instance.client_id)
+
+
+@receiver(post_save, sender=ProjectAssignment)
+@receiver(post_delete, sender=ProjectAssignment)
+def assignment_changed(sender, instance: ProjectAssignment, **kwargs) -> None:
+    report_cache.invalidate(*report_cache.clients_of_projects([instance.project_id]))
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def client_changed(sender, instance: Client, **kwargs) -> None:
+    report_cache.invalidate(instance.pk)
+
+
+@receiver(pre_save, sender=ClientAccountEntry)
+def account_entry_pre_save(sender, instance: ClientAccountEntry, **kwargs) -> None:
+    instance._previous_state = _previous_state(instance, ledgers.ACCOUNT_FIELDS)
+
+
+@receiver(post_save, sender=ClientAccountEntry)
+def account_entry_saved(sender, instance: ClientAccountEntry, **kwargs) -> None:
+    previous = getattr(instance, "_previous_state", None)
+    report_cache.invalidate(instance.client_id, previous["client_id"] if previous else None)
+    ledgers.record_account_entry(instance, previous)
+
+
+@receiver(post_delete, sender=ClientAccountEntry)
+def account_entry_deleted(sender, instance: ClientAccountEntry, **kwargs) -> None:
+    report_cache.invalidate(instance.client_id)
+    ledgers.discard_account_entry(instance)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance: User, created=False, update_fields=None, **kwargs) -> None:
+    if created or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+    client_ids = (
+        TimeEntry.objects.filter(user=instance)
+        .order_by()
+        .values_list("project__client_id", flat=True)
+        .distinct()
+    )
+    report_cache.invalidate(instance.client_id, *client_ids)
@@ -1,12 +1,24 @@
 from __future__ import annotations
 
+import json
+from datetime import date
 from decimal import Decimal
+from io import StringIO
+from pathlib import Path
 
 import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
+from model_bakery import baker
 
 from core import models
+from core.pagination import AccountEntryPagination
+from core.services import aging, exports, ledgers, pdf, report_cache, reporting
 
 
 @pytest.mark.django_db
@@ -45,6 +57,23 @@ def test_projects_list_for_client(api_client, client_user, project):
     assert "Hidden" not in names
 
 
+@pytest.mark.django_db
+def test_projects_list_for_client_ignores_assignments_to_other_clients(api_client, client_user, project):
+    other_client = models.Client.objects.create(name="Other", email="other@example.com")
+    hidden = models.Project.objects.create(
+        name="Hidden",
+        client=other_client,
+        created_by=project.created_by,
+        visibility=models.Project.Visibility.CLIENT,
+    )
+    models.ProjectAssignment.objects.create(project=hidden, user=client_user, is_active=True)
+    api_client.force_authenticate(client_user)
+
+    response = api_client.get(reverse("project-list"))
+    assert response.status_code == 200
+    assert [item["name"] for item in response.data["results"]] == ["Project Alpha"]
+
+
 @pytest.mark.django_db
 def test_reports_summary_returns_data(api_client, admin_user, project):
     models.TimeEntry.objects.create(
@@ -122,11 +151,13 @@ def test_client_account_summary_returns_expected_data(api_client, admin_user, cl
     assert pack_payload["pack_hours"] == "50.00"
     assert pack_payload["status"] == models.Project.Status.ACTIVE
     assert pack_payload["currency"] == "EUR"
-    assert len(response.data["entries"]) == 2
+    assert "entries" not in response.data
 
 
 @pytest.mark.django_db
-def test_client_account_summary_includes_hourly_work(api_client, admin_user, client_obj):
+@pytest.mark.parametrize("use_rollups", [True, False])
+def test_client_account_summary_includes_hourly_work(settings, api_client, admin_user, client_obj, use_rollups):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
     hourly_project = models.Project.objects.create(
         name="Hourly Strategy",
         client=client_obj,
@@ -169,6 +200,270 @@ def test_client_account_summary_includes_hourly_work(api_client, admin_user, cli
     assert hourly_payload["currency"] == "EUR"
 
 
+@pytest.mark.django_db
+def test_client_account_reads_ledger_refreshed_after_writes(
+    api_client, admin_user, client_obj, django_capture_on_commit_callbacks
+):
+    project = models.Project.objects.create(
+        name="Hourly Ops",
+        client=client_obj,
+        created_by=admin_user,
+        billing_type=models.Project.BillingType.HOURLY,
+        hourly_rate=Decimal("60.00"),
+        currency="EUR",
+    )
+    for index in range(3):
+        models.ClientAccountEntry.objects.create(
+            client=client_obj,
+            entry_type=models.ClientAccountEntry.EntryType.PAYMENT,
+            amount=Decimal("10.00"),
+            currency="EUR",
+            occurred_at=date(2024, 1, index + 1),
+            recorded_by=admin_user,
+        )
+    api_client.force_authenticate(admin_user)
+    url = reverse("client-account", args=[client_obj.pk])
+
+    response = api_client.get(url)
+    assert Decimal(response.data["balance"]) == Decimal("-30.00")
+    ledger = models.ClientLedger.objects.get(client=client_obj)
+    assert not ledger.stale
+
+    with django_capture_on_commit_callbacks(execute=True):
+        models.TimeEntry.objects.create(
+            project=project, user=admin_user, date=date(2024, 1, 2), duration_minutes=90, task="Ops", billable=True
+        )
+    ledger.refresh_from_db()
+    assert not ledger.stale
+    assert ledger.hourly_total_due == Decimal("90.00")
+    assert ledger.by_currency["EUR"]["balance"] == "60.00"
+
+    project.hourly_rate = Decimal("80.00")
+    project.save()
+    ledger.refresh_from_db()
+    assert ledger.stale
+
+    response = api_client.get(url)
+    assert Decimal(response.data["hourly_total_due"]) == Decimal("120.00")
+    assert Decimal(response.data["balance"]) == Decimal("90.00")
+    with CaptureQueriesContext(connection) as queries:
+        assert api_client.get(url).status_code == 200
+    assert not any("core_timeentry" in query["sql"] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+def test_ledger_applies_entry_and_account_writes_as_deltas(settings, admin_user, client_obj, use_rollups):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    hourly, other = (
+        models.Project.objects.create(
+            name=name,
+            client=client_obj,
+            created_by=admin_user,
+            billing_type=models.Project.BillingType.HOURLY,
+            hourly_rate=Decimal("60.00"),
+            currency=currency,
+        )
+        for name, currency in (("Hourly Ops", "EUR"), ("Hourly Audit", "USD"))
+    )
+    models.HourlyRate.objects.create(project=other, amount_decimal=Decimal("95.50"), effective_from=date(2024, 1, 1))
+    models.TimeEntry.objects.create(
+        project=hourly, user=admin_user, date=date(2024, 1, 1), duration_minutes=45, task="Ops"
+    )
+    ledgers.get(client_obj)
+
+    with CaptureQueriesContext(connection) as queries:
+        entry = models.TimeEntry.objects.create(
+            project=hourly, user=admin_user, date=date(2024, 1, 2), duration_minutes=95, task="Ops"
+        )
+    # Nothing reads the client's other entries or account history back.
+    assert not [query for query in queries if query["sql"].startswith("SELECT") and '"core_timeentry"' in query["sql"]]
+
+    entry.project, entry.duration_minutes = other, 50
+    entry.save()
+    models.TimeEntry.objects.create(
+        project=hourly, user=admin_user, date=date(2024, 1, 3), duration_minutes=20, task="Ops", billable=False
+    )
+    charge = models.ClientAccountEntry.objects.create(
+        client=client_obj,
+        entry_type=models.ClientAccountEntry.EntryType.CHARGE,
+        amount=Decimal("12.50"),
+        currency="GBP",
+        occurred_at=date(2024, 1, 5),
+        recorded_by=admin_user,
+    )
+    charge.amount, charge.currency = Decimal("20.00"), "EUR"
+    charge.save()
+    models.ClientAccountEntry.objects.create(
+        client=client_obj,
+        entry_type=models.ClientAccountEntry.EntryType.PAYMENT,
+        amount=Decimal("7.25"),
+        currency="USD",
+        occurred_at=date(2024, 1, 4),
+        recorded_by=admin_user,
+    )
+    models.TimeEntry.objects.get(project=hourly, billable=True).delete()
+
+    ledger = models.ClientLedger.objects.get(client=client_obj)
+    assert not ledger.stale
+    assert {field: getattr(ledger, field) for field in ledgers.LEDGER_FIELDS} == ledgers.compute(client_obj.pk)
+    assert [project["name"] for project in ledger.hourly_projects] == ["Hourly Audit"]
+    assert ledger.currency == "EUR"
+
+
+@pytest.mark.django_db
+def test_ledger_currency_follows_the_newest_account_entry(admin_user, client_obj):
+    for currency in ("EUR", "GBP", "USD"):
+        models.ClientAccountEntry.objects.create(
+            client=client_obj,
+            entry_type=models.ClientAccountEntry.EntryType.CHARGE,
+            amount=Decimal("10.00"),
+            currency=currency,
+            occurred_at=date(2024, 1, 1),
+            recorded_by=admin_user,
+        )
+    # Same day for all three: the last one recorded is listed first, so its currency is the ledger's.
+    assert ledgers.compute(client_obj.pk)["currency"] == "USD"
+    assert client_obj.account_entries.first().currency == "USD"
+
+
+@pytest.mark.django_db
+def test_client_account_entries_are_keyset_paginated(monkeypatch, api_client, admin_user, client_obj):
+    monkeypatch.setattr(AccountEntryPagination, "page_size", 2)
+    entries = [
+        models.ClientAccountEntry.objects.create(
+            client=client_obj,
+            entry_type=models.ClientAccountEntry.EntryType.CHARGE,
+            amount=Decimal("10.00"),
+            occurred_at=date(2024, 1, 1 + index // 2),
+            recorded_by=admin_user,
+        )
+        for index in range(5)
+    ]
+    api_client.force_authenticate(admin_user)
+    url = reverse("client-account-entries", args=[client_obj.pk])
+
+    seen = []
+    first = api_client.get(url)
+    assert first.status_code == 200
+    seen.extend(row["id"] for row in first.data["results"])
+    # An entry recorded between pages lands before the cursor and does not shift the next page.
+    models.ClientAccountEntry.objects.create(
+        client=client_obj,
+        entry_type=models.ClientAccountEntry.EntryType.PAYMENT,
+        amount=Decimal("5.00"),
+        occurred_at=date(2024, 2, 1),
+    )
+    next_url = first.data["next"]
+    while next_url:
+        with CaptureQueriesContext(connection) as queries:
+            page = api_client.get(next_url)
+        assert len(queries) <= 3
+        seen.extend(row["id"] for row in page.data["results"])
+        next_url = page.data["next"]
+
+    assert seen == [entry.pk for entry in reversed(entries)]
+    assert first.data["results"][0]["recorded_by_name"]
+    assert api_client.get(url, {"cursor": "not-a-cursor"}).status_code == 404
+
+
+@pytest.mark.django_db
+def test_client_balances_use_a_fixed_number_of_queries(api_client, admin_user, client_obj, client_user):
+    def add_client(name: str, charged: str, paid: str, is_active: bool = True) -> models.Client:
+        client = models.Client.objects.create(name=name, is_active=is_active)
+        for entry_type, amount in (("charge", charged), ("payment", paid)):
+            models.ClientAccountEntry.objects.create(
+                client=client, entry_type=entry_type, amount=Decimal(amount), occurred_at=date(2024, 3, 1)
+            )
+        return client
+
+    add_client("Beta", "300.00", "100.00")
+    add_client("Gamma", "50.00", "50.00", is_active=False)
+    api_client.force_authenticate(admin_user)
+    url = reverse("client-balances")
+
+    def balances(**params):
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url, params)
+        assert response.status_code == 200
+        return response.data, len(queries)
+
+    rows, cold = balances()
+    assert [(row["name"], row["balance"]) for row in rows] == [
+        (client_obj.name, "0.00"),
+        ("Beta", "200.00"),
+        ("Gamma", "0.00"),
+    ]
+    for index in range(5):
+        add_client(f"Zeta {index}", "10.00", "0.00")
+    rows, grown = balances()
+    assert len(rows) == 8
+    assert grown == cold
+    assert balances()[1] < cold
+
+    rows, _ = balances(is_active="true", min_balance="10")
+    assert [row["name"] for row in rows] == ["Beta", *(f"Zeta {index}" for index in range(5))]
+    assert rows[0]["total_charged"] == "300.00"
+    assert rows[0]["total_paid"] == "100.00"
+    assert api_client.get(url, {"min_balance": "lots"}).status_code == 400
+
+    api_client.force_authenticate(client_user)
+    assert [row["client"] for row in api_client.get(url).data] == [client_obj.pk]
+
+
+@pytest.mark.django_db
+def test_import_account_entries_dedupes_references(
+    tmp_path, api_client, admin_user, client_obj, django_capture_on_commit_callbacks
+):
+    other = models.Client.objects.create(name="Other")
+    models.ClientAccountEntry.objects.create(
+        client=client_obj, entry_type="payment", amount=Decimal("5.00"), reference="TRX-1"
+    )
+    api_client.force_authenticate(admin_user)
+    url = reverse("client-import")
+    batch = [
+        {"client": client_obj.pk, "entry_type": "payment", "amount": "40.00", "reference": "TRX-1"},
+        {"client": client_obj.pk, "entry_type": "Charge", "amount": "90.5", "occurred_at": "2024-05-01"},
+        {"client": other.pk, "entry_type": "payment", "amount": "12.00", "reference": "TRX-1"},
+        {"client": other.pk, "entry_type": "payment", "amount": "12.00", "reference": "TRX-1"},
+    ]
+
+    invalid = api_client.post(
+        url, [*batch, {"client": 999999, "entry_type": "refund", "amount": "-1"}], format="json"
+    )
+    assert invalid.status_code == 400
+    assert invalid.data["errors"] == [
+        {
+            "line": 5,
+            "entry_type": "Must be charge or payment.",
+            "amount": "Must be a positive amount with at most two decimals.",
+        },
+        {"line": 5, "client": "Client 999999 does not exist."},
+    ]
+    assert models.ClientAccountEntry.objects.count() == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(url, {"entries": batch}, format="json")
+    assert response.status_code == 201
+    assert response.data == {"created": 2, "skipped": 2}
+    charge = models.ClientAccountEntry.objects.get(client=client_obj, entry_type="charge")
+    assert (charge.amount, charge.occurred_at, charge.recorded_by) == (Decimal("90.50"), date(2024, 5, 1), admin_user)
+    assert ledgers.get(other).total_paid == Decimal("12.00")
+
+    upload = SimpleUploadedFile(
+        "statement.csv",
+        f"client,entry_type,amount,reference\n{other.pk},payment,7.00,TRX-2\n{other.pk},payment,12.00,TRX-1\n".encode(),
+    )
+    response = api_client.post(url, {"file": upload}, format="multipart")
+    assert response.data == {"created": 1, "skipped": 1}
+
+    out = StringIO()
+    statement = tmp_path / "statement.json"
+    statement.write_text(json.dumps([{"client": other.pk, "entry_type": "payment", "amount": "1.00"}] * 2))
+    call_command("import_account_entries", str(statement), stdout=out)
+    assert "Imported 2 account entries, skipped 0 duplicates." in out.getvalue()
+
+
 @pytest.mark.django_db
 def test_create_client_payment_records_entry(api_client, admin_user, client_obj):
     login_response = api_client.post(
@@ -202,3 +497,590 @@ def test_create_client_payment_records_entry(api_client, admin_user, client_obj)
     entry = models.ClientAccountEntry.objects.get(pk=data["id"])
     assert entry.client == client_obj
     assert entry.recorded_by == admin_user
+
+
+@pytest.mark.django_db
+def test_reports_export_csv_streams_rows(api_client, admin_user, project):
+    models.TimeEntry.objects.create(
+        project=project,
+        user=admin_user,
+        date=timezone.now().date(),
+        duration_minutes=90,
+        task="Planning",
+        notes="",
+    )
+    login_response = api_client.post(
+        reverse("auth-login"),
+        {"email": admin_user.email, "password": "password123"},
+        format="json",
+    )
+    assert login_response.status_code == 200
+
+    response = api_client.get(reverse("reports-export-csv"))
+    assert response.status_code == 200
+    assert response.streaming
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert lines[0] == (
+        "client,project,user,total_minutes,billable_minutes,non_billable_minutes,total_amount,base_amount,base_currency"
+    )
+    user = admin_user.get_full_name() or admin_user.email
+    assert lines[1:] == [f"Acme Corp,Project Alpha,{user},90,90,0,0.00,0.00,EUR"]
+
+
+@pytest.mark.django_db
+def test_report_exports_ignore_summary_paging(api_client, admin_user, client_obj, project):
+    other = models.Project.objects.create(name="Project Beta", client=client_obj, created_by=admin_user)
+    for target in (project, other):
+        models.TimeEntry.objects.create(
+            project=target, user=admin_user, date=date(2024, 1, 2), duration_minutes=30, task="Work"
+        )
+    api_client.force_authenticate(admin_user)
+    paging = {"limit": 1, "offset": 1}
+
+    assert len(api_client.get(reverse("reports-summary"), paging).data) == 1
+    response = api_client.get(reverse("reports-export-csv"), paging)
+    assert len(b"".join(response.streaming_content).decode().splitlines()) == 3
+    job = api_client.post(reverse("reportexport-list"), {"format": "csv", **paging}, format="json")
+    assert job.data["filters"]["limit"] is None
+    assert job.data["filters"]["offset"] == 0
+
+
+@pytest.mark.django_db
+def test_reports_entries_ndjson_matches_time_entry_api(api_client, admin_user, project, client_obj):
+    project.hourly_rate = Decimal("80.00")
+    project.save()
+    models.HourlyRate.objects.create(
+        client=client_obj,
+        amount_decimal=Decimal("65.00"),
+        effective_from=timezone.now().date(),
+    )
+    for offset, billable in ((0, True), (3, True), (5, False)):
+        models.TimeEntry.objects.create(
+            project=project,
+            user=admin_user,
+            date=timezone.now().date() - timezone.timedelta(days=offset),
+            duration_minutes=50 + offset,
+            task="Delivery",
+            notes="",
+            billable=billable,
+        )
+    login_response = api_client.post(
+        reverse("auth-login"),
+        {"email": admin_user.email, "password": "password123"},
+        format="json",
+    )
+    assert login_response.status_code == 200
+
+    response = api_client.get(reverse("reports-entries-ndjson"))
+    assert response.status_code == 200
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    exported = {row["id"]: row for row in map(json.loads, lines)}
+
+    listed = api_client.get(reverse("timeentry-list")).data["results"]
+    assert len(exported) == len(listed) == 3
+    for item in listed:
+        row = exported[item["id"]]
+        assert (row["hourly_rate"], row["amount"], row["currency"]) == (
+            item["hourly_rate"],
+            item["amount"],
+            item["currency"],
+        )
+
+
+@pytest.mark.django_db
+def test_report_export_job_renders_and_purges_artifact(settings, tmp_path, api_client, admin_user, project):
+    settings.MEDIA_ROOT = tmp_path
+    models.TimeEntry.objects.create(
+        project=project,
+        user=admin_user,
+        date=timezone.now().date(),
+        duration_minutes=90,
+        task="Planning",
+        notes="",
+    )
+    login_response = api_client.post(
+        reverse("auth-login"),
+        {"email": admin_user.email, "password": "password123"},
+        format="json",
+    )
+    assert login_response.status_code == 200
+
+    payload = {"format": "csv", "project": project.pk}
+    created = api_client.post(reverse("reportexport-list"), payload, format="json")
+    assert created.status_code == 201
+    assert created.data["status"] == "pending"
+    duplicate = api_client.post(reverse("reportexport-list"), payload, format="json")
+    assert duplicate.status_code == 200
+    assert duplicate.data["id"] == created.data["id"]
+
+    job_id = created.data["id"]
+    not_ready = api_client.get(reverse("reportexport-download", args=[job_id]))
+    assert not_ready.status_code == 409
+
+    call_command("run_report_exports", "--once", stdout=StringIO())
+    detail = api_client.get(reverse("reportexport-detail", args=[job_id]))
+    assert detail.data["status"] == "done"
+    assert detail.data["download_url"].endswith(reverse("reportexport-download", args=[job_id]))
+
+    download = api_client.get(reverse("reportexport-download", args=[job_id]))
+    assert download.status_code == 200
+    exported = b"".join(download.streaming_content)
+    streamed = b"".join(api_client.get(reverse("reports-export-csv"), {"project": project.pk}).streaming_content)
+    assert exported == streamed
+
+    job = models.ReportExportJob.objects.get(pk=job_id)
+    artifact_path = job.artifact.path
+    job.expires_at = timezone.now() - timezone.timedelta(minutes=1)
+    job.save(update_fields=["expires_at"])
+    call_command("purge_report_exports", stdout=StringIO())
+    assert not models.ReportExportJob.objects.filter(pk=job_id).exists()
+    assert not Path(artifact_path).exists()
+
+
+@pytest.mark.django_db
+def test_report_export_job_with_dead_worker_is_failed_and_requeued(settings, api_client, admin_user, project):
+    settings.REPORT_EXPORT_LEASE = timezone.timedelta(minutes=15)
+    login_response = api_client.post(
+        reverse("auth-login"),
+        {"email": admin_user.email, "password": "password123"},
+        format="json",
+    )
+    assert login_response.status_code == 200
+
+    payload = {"format": "csv", "project": project.pk}
+    created = api_client.post(reverse("reportexport-list"), payload, format="json")
+    job = models.ReportExportJob.objects.get(pk=created.data["id"])
+    started = timezone.now() - timezone.timedelta(minutes=5)
+    job.status = models.ReportExportJob.Status.RUNNING
+    job.started_at = job.heartbeat_at = started
+    job.save(update_fields=["status", "started_at", "heartbeat_at"])
+    live = api_client.post(reverse("reportexport-list"), payload, format="json")
+    assert live.status_code == 200
+    assert live.data["id"] == job.pk
+
+    job.heartbeat_at = timezone.now() - timezone.timedelta(minutes=20)
+    job.save(update_fields=["heartbeat_at"])
+    requeued = api_client.post(reverse("reportexport-list"), payload, format="json")
+    assert requeued.status_code == 201
+    assert requeued.data["id"] != job.pk
+
+    call_command("purge_report_exports", stdout=StringIO())
+    job.refresh_from_db()
+    assert job.status == models.ReportExportJob.Status.FAILED
+    assert job.error == exports.STALE_ERROR
+    assert job.finished_at is not None
+
+
+@pytest.mark.django_db
+def test_report_export_rejects_malformed_filters(api_client, admin_user):
+    api_client.force_authenticate(admin_user)
+    for filters in ({"ordering": 1}, {"ordering": ["-total_minutes"]}, {"from": ["2024-01-01"]}, {"client": "acme"}):
+        response = api_client.post(reverse("reportexport-list"), {"format": "csv", **filters}, format="json")
+        assert response.status_code == 400, filters
+    assert not models.ReportExportJob.objects.exists()
+
+
+@pytest.mark.django_db
+def test_report_export_failed_as_stale_while_rendering_stays_failed(monkeypatch, settings, admin_user, project):
+    job, _ = exports.request_export(admin_user, "pdf", reporting.ReportFilters())
+    job = exports.claim_next()
+    ticks = []
+
+    def render(chunks, stylesheet, tick=None):
+        # A long single render: the worker is failed as stale, then keeps ticking until it is done.
+        ticks.append(tick)
+        exports.fail_stale(timezone.now() + settings.REPORT_EXPORT_LEASE * 2)
+        tick()
+        return b"%PDF-late"
+
+    monkeypatch.setattr(pdf, "render", render)
+    exports.run(job)
+    assert ticks and ticks[0] is not None
+    job.refresh_from_db()
+    assert job.status == models.ReportExportJob.Status.FAILED
+    assert job.error == exports.STALE_ERROR
+    assert not job.artifact
+    assert not list(Path(settings.MEDIA_ROOT, "exports").glob(f"{job.pk}-*"))
+
+
+@pytest.mark.django_db
+def test_reports_summary_is_cached_until_data_changes(
+    api_client, admin_user, project, django_capture_on_commit_callbacks
+):
+    models.TimeEntry.objects.create(
+        project=project,
+        user=admin_user,
+        date=timezone.now().date(),
+        duration_minutes=60,
+        task="Planning",
+        notes="",
+    )
+    login_response = api_client.post(
+        reverse("auth-login"),
+        {"email": admin_user.email, "password": "password123"},
+        format="json",
+    )
+    assert login_response.status_code == 200
+
+    first = api_client.get(reverse("reports-summary"))
+    second = api_client.get(reverse("reports-summary"))
+    assert first.data == second.data
+    stats = api_client.get(reverse("reports-cache-stats")).data
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    # Generations are bumped once the write commits.
+    with django_capture_on_commit_callbacks(execute=True):
+        models.TimeEntry.objects.create(
+            project=project,
+            user=admin_user,
+            date=timezone.now().date() - timezone.timedelta(days=1),
+            duration_minutes=30,
+            task="Review",
+            notes="",
+        )
+    refreshed = api_client.get(reverse("reports-summary"))
+    assert refreshed.data[0]["total_minutes"] == 90
+    stats = api_client.get(reverse("reports-cache-stats")).data
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+@pytest.mark.django_db
+def test_reports_cache_generations_are_per_client(
+    api_client, admin_user, client_user, project, assignment, django_capture_on_commit_callbacks
+):
+    other_project = baker.make(models.Project, client=baker.make(models.Client, name="Globex"), name="Other")
+    models.TimeEntry.objects.create(
+        project=project,
+        user=client_user,
+        date=timezone.now().date(),
+        duration_minutes=45,
+        task="Support",
+        notes="",
+    )
+    login_response = api_client.post(
+        reverse("auth-login"),
+        {"email": client_user.email, "password": "password123"},
+        format="json",
+    )
+    assert login_response.status_code == 200
+    api_client.get(reverse("reports-summary"))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        models.TimeEntry.objects.create(
+            project=other_project,
+            user=admin_user,
+            date=timezone.now().date(),
+            duration_minutes=120,
+            task="Elsewhere",
+            notes="",
+        )
+    api_client.get(reverse("reports-summary"))
+    assert report_cache.stats()["hits"] == 1
+
+    project.name = "Project Beta"
+    with django_capture_on_commit_callbacks(execute=True):
+        project.save()
+    renamed = api_client.get(reverse("reports-summary"))
+    assert [row["project"] for row in renamed.data] == ["Project Beta"]
+    assert report_cache.stats()["misses"] == 2
+
+
+@pytest.mark.django_db
+def test_reports_timeseries_returns_zero_filled_arrays(api_client, admin_user, project):
+    today = timezone.now().date()
+    models.TimeEntry.objects.create(
+        project=project,
+        user=admin_user,
+        date=today,
+        duration_minutes=75,
+        task="Planning",
+        notes="",
+    )
+    login_response = api_client.post(
+        reverse("auth-login"),
+        {"email": admin_user.email, "password": "password123"},
+        format="json",
+    )
+    assert login_response.status_code == 200
+
+    response = api_client.get(
+        reverse("reports-timeseries"),
+        {"interval": "day", "from": (today - timezone.timedelta(days=2)).isoformat(), "to": today.isoformat()},
+    )
+    assert response.status_code == 200
+    assert response.data["buckets"] == [
+        (today - timezone.timedelta(days=offset)).isoformat() for offset in (2, 1, 0)
+    ]
+    assert response.data["series"] == [
+        {
+            "key": None,
+            "label": None,
+            "minutes": [0, 0, 75],
+            "billable_minutes": [0, 0, 75],
+            "amounts": {},
+        }
+    ]
+
+    invalid = api_client.get(reverse("reports-timeseries"), {"interval": "hour"})
+    assert invalid.status_code == 400
+
+
+@pytest.mark.django_db
+def test_reports_utilization_lists_user_weeks(settings, api_client, admin_user, project):
+    settings.UTILIZATION_WEEKLY_CAPACITY_MINUTES = 2400
+    models.TimeEntry.objects.create(
+        project=project,
+        user=admin_user,
+        date=timezone.datetime(2024, 3, 6).date(),
+        duration_minutes=600,
+        task="Planning",
+        notes="",
+    )
+    login_response = api_client.post(
+        reverse("auth-login"),
+        {"email": admin_user.email, "password": "password123"},
+        format="json",
+    )
+    assert login_response.status_code == 200
+
+    response = api_client.get(reverse("reports-utilization"))
+    assert response.status_code == 200
+    assert response.data["capacity_minutes"] == 2400
+    [row] = response.data["rows"]
+    assert (row["week"], row["week_start"]) == ("2024-W10", "2024-03-04")
+    assert (row["billable_ratio"], row["utilization"], row["utilization_change"]) == (1.0, 0.25, 0.25)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+def test_reports_aging_settles_oldest_dues_first(
+    settings, api_client, admin_user, client_obj, use_rollups, django_assert_num_queries
+):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    today = timezone.now().date()
+    charge, payment = models.ClientAccountEntry.EntryType.CHARGE, models.ClientAccountEntry.EntryType.PAYMENT
+    movements = ((10, charge, "100.00"), (45, charge, "200.00"), (100, charge, "300.00"), (5, payment, "350.00"))
+    for days, entry_type, amount in movements:
+        baker.make(
+            models.ClientAccountEntry,
+            client=client_obj,
+            entry_type=entry_type,
+            amount=Decimal(amount),
+            occurred_at=today - timezone.timedelta(days=days),
+        )
+    baker.make(
+        models.Project,
+        client=client_obj,
+        created_by=admin_user,
+        billing_type=models.Project.BillingType.PACK,
+        pack_total_value=Decimal("500.00"),
+    )
+    hourly = baker.make(models.Project, client=client_obj, created_by=admin_user, hourly_rate=Decimal("80.00"))
+    models.TimeEntry.objects.create(
+        project=hourly,
+        user=admin_user,
+        date=today - timezone.timedelta(days=70),
+        duration_minutes=150,
+        task="Workshop",
+    )
+    baker.make(
+        models.ClientAccountEntry,
+        client=client_obj,
+        entry_type=charge,
+        amount=Decimal("70.00"),
+        currency="USD",
+        occurred_at=today - timezone.timedelta(days=40),
+    )
+    overpaid = baker.make(models.Client, name="Zeta Ltd")
+    baker.make(
+        models.ClientAccountEntry, client=overpaid, entry_type=payment, amount=Decimal("40.00"), occurred_at=today
+    )
+    for _ in range(3):
+        baker.make(models.Client)
+
+    with django_assert_num_queries(4):
+        aging.build(admin_user)
+
+    login_response = api_client.post(
+        reverse("auth-login"),
+        {"email": admin_user.email, "password": "password123"},
+        format="json",
+    )
+    assert login_response.status_code == 200
+    response = api_client.get(reverse("reports-aging"))
+    assert response.status_code == 200
+    rows = {(row["client_id"], row["currency"]): row for row in response.data["rows"]}
+    assert len(rows) == 6
+    acme = rows[(client_obj.pk, "EUR")]
+    assert acme["buckets"] == {"0-30": "600.00", "31-60": "200.00", "61-90": "150.00", "90+": "0.00"}
+    assert (acme["total_charged"], acme["total_paid"], acme["balance"]) == ("1300.00", "350.00", "950.00")
+    account = api_client.get(reverse("client-account", args=[client_obj.pk]))
+    assert account.data["by_currency"]["EUR"]["balance"] == acme["balance"]
+    # Euro payments never settle dollar charges.
+    acme_usd = rows[(client_obj.pk, "USD")]
+    assert acme_usd["buckets"] == {"0-30": "0.00", "31-60": "70.00", "61-90": "0.00", "90+": "0.00"}
+    zeta = rows[(overpaid.pk, "EUR")]
+    assert (zeta["balance"], zeta["credit"]) == ("-40.00", "40.00")
+    assert response.data["totals"]["EUR"]["0-30"] == "600.00"
+    assert response.data["totals"]["USD"]["31-60"] == "70.00"
+
+    assert api_client.get(reverse("reports-aging"), {"as_of": "soon"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_reports_aging_leaves_out_amounts_dated_after_as_of(admin_user, client_obj):
+    today = timezone.now().date()
+    baker.make(
+        models.ClientAccountEntry,
+        client=client_obj,
+        entry_type=models.ClientAccountEntry.EntryType.CHARGE,
+        amount=Decimal("120.00"),
+        occurred_at=today + timezone.timedelta(days=5),
+    )
+
+    [row] = aging.build(admin_user, today)["rows"]
+    assert row["total_charged"] == "0.00"
+    assert set(row["buckets"].values()) == {"0.00"}
+
+    [row] = aging.build(admin_user, today + timezone.timedelta(days=5))["rows"]
+    assert row["total_charged"] == "120.00"
+    assert row["buckets"]["0-30"] == "120.00"
+
+
+@pytest.mark.django_db
+def test_project_burndown_is_cached_until_entries_change(
+    api_client, admin_user, project, django_capture_on_commit_callbacks
+):
+    project.billing_type = models.Project.BillingType.PACK
+    project.pack_hours = Decimal("20.00")
+    project.save()
+    models.TimeEntry.objects.create(
+        project=project, user=admin_user, date=timezone.now().date(), duration_minutes=90, task="Setup"
+    )
+    login_response = api_client.post(
+        reverse("auth-login"),
+        {"email": admin_user.email, "password": "password123"},
+        format="json",
+    )
+    assert login_response.status_code == 200
+
+    url = reverse("project-burndown", args=[project.pk])
+    assert api_client.get(url).data["consumed_hours"] == "1.50"
+    models.Project.objects.filter(pk=project.pk).update(pack_hours=Decimal("1.00"))
+    assert api_client.get(url).data["remaining_hours"] == "18.50"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        models.TimeEntry.objects.create(
+            project=project, user=admin_user, date=timezone.now().date(), duration_minutes=30, task="Review"
+        )
+    response = api_client.get(url)
+    assert (response.data["consumed_hours"], response.data["remaining_hours"]) == ("2.00", "-1.00")
+
+    hourly = baker.make(models.Project, client=project.client, created_by=admin_user)
+    assert api_client.get(reverse("project-burndown", args=[hourly.pk])).status_code == 400
+
+
+@pytest.mark.django_db
+def test_closing_a_period_locks_time_entry_api(api_client, admin_user, project, assignment):
+    entry = models.TimeEntry.objects.create(
+        project=project,
+        user=assignment.user,
+        date=timezone.datetime(2024, 6, 3).date(),
+        duration_minutes=45,
+        task="Work",
+    )
+    login_response = api_client.post(
+        reverse("auth-login"),
+        {"email": admin_user.email, "password": "password123"},
+        format="json",
+    )
+    assert login_response.status_code == 200
+
+    response = api_client.post(reverse("closedperiod-list"), {"month": "2024-06"}, format="json")
+    assert response.status_code == 201
+    assert (response.data["month"], response.data["snapshot_rows"]) == ("2024-06", 1)
+    assert api_client.post(reverse("closedperiod-list"), {"month": "2024-06"}, format="json").status_code == 400
+
+    detail = reverse("timeentry-detail", args=[entry.pk])
+    patched = api_client.patch(detail, {"duration_minutes": 60}, format="json")
+    assert patched.status_code == 400
+    assert "date" in patched.data
+    assert api_client.delete(detail).status_code == 400
+
+    assert api_client.delete(reverse("closedperiod-detail", args=[response.data["id"]])).status_code == 204
+    assert api_client.patch(detail, {"duration_minutes": 60}, format="json").status_code == 200
+
+
+def _seed_endpoint_rows(admin_user, client_obj, count: int) -> None:
+    """``count`` more rows behind every list endpoint, each with its related objects."""
+    existing = models.ClosedPeriod.objects.count()
+    for index in range(existing, existing + count):
+        other = baker.make(models.Client, name=f"Client {index}")
+        member = baker.make(
+            models.User, role=models.User.Roles.CLIENT, client=other, email=f"member{index}@example.com"
+        )
+        project = baker.make(
+            models.Project,
+            client=other,
+            created_by=admin_user,
+            billing_type=models.Project.BillingType.HOURLY,
+            hourly_rate=Decimal("50.00"),
+        )
+        baker.make(models.ProjectAssignment, project=project, user=member, is_active=True)
+        baker.make(models.HourlyRate, project=project, amount_decimal=Decimal("70.00"), effective_from=date(2023, 1, 1))
+        models.TimeEntry.objects.create(
+            project=project, user=member, date=date(2024, 5, 1), duration_minutes=30 + index, task="Work"
+        )
+        baker.make(models.TimeEntryTimer, project=project, user=member)
+        baker.make(models.ReportExportJob, requested_by=admin_user, format=models.ReportExportJob.Format.SUMMARY_CSV)
+        models.ClosedPeriod.objects.create(month=date(2020 + index // 12, index % 12 + 1, 1), closed_by=admin_user)
+        baker.make(models.ClientAccountEntry, client=client_obj, amount=Decimal("10.00"))
+        baker.make(
+            models.Project,
+            client=client_obj,
+            created_by=admin_user,
+            billing_type=models.Project.BillingType.PACK,
+            pack_total_value=Decimal("100.00"),
+        )
+
+
+QUERY_BUDGET_ENDPOINTS = [
+    ("client-list", False),
+    ("client-account", True),
+    ("client-account-entries", True),
+    ("project-list", False),
+    ("assignment-list", False),
+    ("user-list", False),
+    ("hourlyrate-list", False),
+    ("timeentry-list", False),
+    ("timeentrytimer-list", False),
+    ("reportexport-list", False),
+    ("closedperiod-list", False),
+    ("reports-summary", False),
+]
+
+
+@pytest.mark.django_db
+def test_endpoint_query_counts_do_not_grow_with_rows(
+    api_client, admin_user, client_obj, django_capture_on_commit_callbacks
+):
+    api_client.force_authenticate(admin_user)
+
+    def query_counts() -> dict[str, int]:
+        cache.clear()
+        counts = {}
+        for name, detail in QUERY_BUDGET_ENDPOINTS:
+            with CaptureQueriesContext(connection) as queries:
+                response = api_client.get(reverse(name, args=[client_obj.pk] if detail else None))
+            assert response.status_code == 200, name
+            counts[name] = len(queries)
+        return counts
+
+    # Run the commit hooks so ledgers are refreshed as they would be after the writes commit.
+    with django_capture_on_commit_callbacks(execute=True):
+        _seed_endpoint_rows(admin_user, client_obj, 2)
+    query_counts()  # Warm the process-wide rate tables first.
+    few = query_counts()
+    with django_capture_on_commit_callbacks(execute=True):
+        _seed_endpoint_rows(admin_user, client_obj, 6)
+    assert query_counts() == few
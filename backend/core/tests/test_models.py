@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from io import StringIO
+
 import pytest
 from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
 from django.utils import timezone
 
 from core import models
@@ -62,3 +65,39 @@ def test_project_metrics_update(project, admin_user):
     assert project.total_logged_minutes == 120
 
 
+@pytest.mark.django_db
+def test_project_metrics_follow_edits_moves_and_deletes(project, admin_user):
+    other = models.Project.objects.create(name="Other", client=project.client, created_by=admin_user)
+
+    def entry(minutes: int) -> models.TimeEntry:
+        return models.TimeEntry.objects.create(
+            project=project, user=admin_user, date=timezone.now().date(), duration_minutes=minutes, task="Work"
+        )
+
+    def metrics(target: models.Project) -> tuple:
+        target.refresh_from_db()
+        return target.total_logged_minutes, target.last_logged_at
+
+    first, second = entry(30), entry(45)
+    assert metrics(project) == (75, second.created_at)
+
+    first.duration_minutes = 60
+    first.save()
+    assert metrics(project) == (105, second.created_at)
+
+    second.project = other
+    second.save()
+    assert metrics(project) == (60, first.created_at)
+    assert metrics(other) == (45, second.created_at)
+
+    second.delete()
+    assert metrics(other) == (0, None)
+
+    models.TimeEntry.objects.filter(pk=first.pk).update(duration_minutes=10)
+    with pytest.raises(CommandError, match="^1 project has drifted.$"):
+        call_command("reconcile_project_metrics", "--check", stdout=StringIO())
+    assert metrics(project) == (60, first.created_at)
+    out = StringIO()
+    call_command("reconcile_project_metrics", stdout=out)
+    assert "Repaired 1 project." in out.getvalue()
+    assert metrics(project) == (10, first.created_at)
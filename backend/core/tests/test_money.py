@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import random
+from decimal import Decimal
+
+import numpy as np
+
+from core.services import money, pivot
+
+
+def _legacy_amount(minutes: int, rate: Decimal) -> Decimal:
+    return ((Decimal(minutes) / Decimal(60)) * rate).quantize(Decimal("0.01"))
+
+
+def test_entry_cents_matches_decimal_rounding_exhaustively():
+    rates = [Decimal(cents).scaleb(-2) for cents in (*range(0, 1000), *range(1000, 100_000, 997), 99_999_999)]
+    for minutes in range(0, 24 * 60 + 1):
+        for rate in rates[:: 1 if minutes <= 180 else 37]:
+            assert money.entry_amount(minutes, rate) == _legacy_amount(minutes, rate), (minutes, rate)
+
+
+def test_entry_cents_matches_decimal_rounding_on_random_inputs():
+    generator = random.Random(20240101)
+    for _ in range(50_000):
+        minutes = generator.randint(0, 100_000)
+        rate = Decimal(generator.randint(0, 10_000_000)).scaleb(-2)
+        assert money.entry_amount(minutes, rate) == _legacy_amount(minutes, rate), (minutes, rate)
+
+
+def test_entry_cents_matches_decimal_rounding_on_every_half_cent_tie():
+    ties = [
+        (minutes, rate_cents)
+        for minutes in range(1, 2000)
+        for rate_cents in range(1, 400)
+        if money.is_tie(minutes, rate_cents)
+    ]
+    assert len(ties) > 1000
+    for minutes, rate_cents in ties:
+        rate = money.from_cents(rate_cents)
+        assert money.entry_amount(minutes, rate) == _legacy_amount(minutes, rate), (minutes, rate)
+
+
+def test_vectorized_entry_cents_matches_scalar():
+    generator = np.random.default_rng(7)
+    minutes = generator.integers(0, 2000, 20_000)
+    rate_cents = generator.integers(0, 30_000, 20_000)
+    rate_cents[:500] = 30  # plenty of half-cent ties
+    expected = [money.entry_cents(int(m), int(r)) for m, r in zip(minutes, rate_cents)]
+    assert pivot.entry_cents(minutes, rate_cents).tolist() == expected
+
+
+def test_cents_round_trip():
+    assert money.to_cents(Decimal("92.50")) == 9250
+    assert money.to_cents(None) == 0
+    assert str(money.from_cents(0)) == "0.00"
+    assert str(money.from_cents(123456)) == "1234.56"
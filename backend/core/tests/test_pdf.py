@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import importlib
+import re
+import sys
+
+import pytest
+
+from core.services import pdf, reporting
+
+# Lays out one page per summary row and writes their labels in order, so page merging is visible in the output.
+WEASYPRINT_STUB = '''
+import re
+
+rendered = []
+
+
+class CSS:
+    def __init__(self, string, font_config=None):
+        self.string = string
+
+
+class Document:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def copy(self, pages):
+        return Document(list(pages))
+
+    def write_pdf(self):
+        return ("%PDF-stub\\n" + "\\n".join(self.pages)).encode()
+
+
+class HTML:
+    def __init__(self, string):
+        self.string = string
+
+    def render(self, stylesheets=(), font_config=None):
+        rendered.append(self.string)
+        return Document(re.findall(r"Row \\d+", self.string))
+'''
+
+
+@pytest.fixture
+def weasyprint(tmp_path, monkeypatch):
+    """A stand-in WeasyPrint importable by this process and by spawned pool workers."""
+    package = tmp_path / "weasyprint"
+    (package / "text").mkdir(parents=True)
+    (package / "__init__.py").write_text(WEASYPRINT_STUB)
+    (package / "text" / "__init__.py").write_text("")
+    (package / "text" / "fonts.py").write_text("class FontConfiguration:\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in [name for name in sys.modules if name == "weasyprint" or name.startswith("weasyprint.")]:
+        monkeypatch.delitem(sys.modules, name)
+    monkeypatch.setattr(pdf, "_renderers", {})
+    pdf.shutdown()
+    yield importlib.import_module("weasyprint")
+    pdf.shutdown()
+
+
+def _rows(count: int) -> list[dict]:
+    return [
+        {
+            "client": "Acme",
+            "project": f"Row {index}",
+            "user": "admin@example.com",
+            "total_minutes": 60,
+            "billable_minutes": 60,
+            "non_billable_minutes": 0,
+            "total_amount": "50.00",
+        }
+        for index in range(count)
+    ]
+
+
+def _pages(document: bytes) -> list[str]:
+    header, *pages = document.decode().split("\n")
+    assert header == "%PDF-stub"
+    return pages
+
+
+def test_pdf_renders_chunks_in_process_and_merges_pages_in_order(settings, weasyprint):
+    settings.PDF_RENDER_WORKERS = 0
+    settings.PDF_CHUNK_ROWS = 2
+
+    document = reporting.render_pdf(_rows(5))
+
+    assert _pages(document) == [f"Row {index}" for index in range(5)]
+    # The warm-up render, then one layout per chunk of PDF_CHUNK_ROWS rows; only the first carries the title.
+    chunks = weasyprint.rendered[1:]
+    assert [re.findall(r"Row \d+", chunk) for chunk in chunks] == [["Row 0", "Row 1"], ["Row 2", "Row 3"], ["Row 4"]]
+    assert ["<h1>" in chunk for chunk in chunks] == [True, False, False]
+
+    ticks = []
+    reporting.render_pdf(_rows(5), tick=lambda: ticks.append(len(weasyprint.rendered)))
+    assert len(ticks) == 3
+
+
+def test_pdf_pool_render_matches_in_process_fallback(settings, weasyprint):
+    settings.PDF_CHUNK_ROWS = 3
+    chunks = reporting.summary_pages(_rows(7))
+    assert len(chunks) == 3
+
+    settings.PDF_RENDER_WORKERS = 1
+    pooled = pdf.render(chunks, "table { width: 100%; }")
+    settings.PDF_RENDER_WORKERS = 0
+    in_process = pdf.render(chunks, "table { width: 100%; }")
+
+    assert pooled == in_process
+    assert _pages(pooled) == [f"Row {index}" for index in range(7)]
+    # The pool worker laid the chunks out; this process only rendered for the fallback.
+    assert len(weasyprint.rendered) == 1 + len(chunks)
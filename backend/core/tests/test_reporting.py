@@ -0,0 +1,710 @@
+from __future__ import annotations
+
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core import models, permissions
+from core.services import (
+    fx,
+    packs,
+    periods,
+    pivot,
+    rates,
+    report_cache,
+    reporting,
+    rollups,
+    sharding,
+    timeseries,
+    utilization,
+)
+
+
+def _legacy_summary(queryset) -> dict:
+    summary: dict = {}
+    for entry in queryset.select_related("project", "project__client", "user"):
+        payload = summary.setdefault(
+            (entry.project.name, entry.user.email),
+            {"total_minutes": 0, "billable_minutes": 0, "non_billable_minutes": 0, "total_amount": Decimal("0.00")},
+        )
+        payload["total_minutes"] += entry.duration_minutes
+        key = "billable_minutes" if entry.billable else "non_billable_minutes"
+        payload[key] += entry.duration_minutes
+        rate = reporting.resolve_rate(entry)
+        if rate:
+            hours = Decimal(entry.duration_minutes) / Decimal(60)
+            payload["total_amount"] += (hours * rate).quantize(Decimal("0.01"))
+    return summary
+
+
+@pytest.fixture
+def rated_entries(project, admin_user, client_obj):
+    other = models.Project.objects.create(
+        name="Project Beta",
+        client=client_obj,
+        created_by=admin_user,
+    )
+    start = date(2024, 1, 1)
+    models.HourlyRate.objects.create(client=client_obj, amount_decimal=Decimal("45.00"), effective_from=start)
+    models.HourlyRate.objects.create(
+        project=project,
+        amount_decimal=Decimal("92.50"),
+        effective_from=start + timedelta(days=10),
+        effective_to=start + timedelta(days=20),
+    )
+    models.HourlyRate.objects.create(
+        project=project,
+        amount_decimal=Decimal("61.30"),
+        effective_from=start + timedelta(days=15),
+        effective_to=start + timedelta(days=17),
+    )
+    durations = [1, 7, 13, 20, 45, 61, 90, 101]
+    for offset in range(30):
+        for index, minutes in enumerate(durations[offset % 3 :: 3]):
+            models.TimeEntry.objects.create(
+                project=project if (offset + index) % 2 else other,
+                user=admin_user,
+                date=start + timedelta(days=offset),
+                duration_minutes=minutes,
+                task="Work",
+                billable=bool(offset % 4),
+            )
+    return start
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+def test_summarize_matches_per_entry_rounding(settings, admin_user, rated_entries, use_rollups):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    filters = reporting.ReportFilters()
+    rows = reporting.summarize(admin_user, filters)
+
+    expected = _legacy_summary(reporting.build_queryset(admin_user, filters))
+    assert len(rows) == len(expected) == 2
+    for row in rows:
+        totals = expected[(row["project"], row["user"])]
+        assert {key: row[key] for key in totals} == totals
+        assert str(row["total_amount"]) == str(totals["total_amount"])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+@pytest.mark.parametrize("ordering", ["-total_minutes", "total_amount", "-last_activity"])
+def test_summarize_orders_and_pages_totals(settings, admin_user, client_user, rated_entries, use_rollups, ordering):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    for index, project in enumerate(models.Project.objects.order_by("pk")):
+        models.TimeEntry.objects.create(
+            project=project,
+            user=client_user,
+            date=rated_entries + timedelta(days=3 + index),
+            duration_minutes=200 + 150 * index,
+            task="Review",
+        )
+    everything = reporting.summarize(admin_user, reporting.ReportFilters())
+    field = ordering.lstrip("-")
+    if field != "last_activity":
+        everything.sort(key=lambda row: row[field], reverse=ordering.startswith("-"))
+
+    page = reporting.summarize(admin_user, reporting.ReportFilters(ordering=ordering, limit=2, offset=1))
+
+    assert len(everything) == 4
+    assert page == everything[1:3]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+@pytest.mark.parametrize("ordering", [None, "-total_amount"])
+def test_sharded_summary_matches_single_pass(settings, admin_user, rated_entries, use_rollups, ordering):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    settings.REPORTS_PARALLEL_WORKERS = 1
+    filters = reporting.ReportFilters(ordering=ordering, limit=1 if ordering else None)
+
+    settings.REPORTS_PARALLEL_MIN_ROWS = 1
+    sharded = reporting.summarize(admin_user, filters)
+    settings.REPORTS_PARALLEL_MIN_ROWS = 0
+    assert sharded == reporting.summarize(admin_user, filters)
+    assert sharded
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+def test_shard_estimate_runs_once_and_only_when_needed(monkeypatch, settings, admin_user, rated_entries, use_rollups):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    settings.REPORTS_PARALLEL_MIN_ROWS = 1_000_000
+    estimates = []
+    monkeypatch.setattr(sharding, "estimate_rows", lambda user, filters: estimates.append(filters) or 0)
+    models.ClosedPeriod.objects.create(month=date(2024, 2, 1))
+
+    reporting.summarize(admin_user, reporting.ReportFilters(date_from="2024-01-01", date_to="2024-03-31"))
+    assert len(estimates) == (0 if use_rollups else 1)
+    estimates.clear()
+    reporting.summarize(admin_user, reporting.ReportFilters())
+    assert len(estimates) == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+@pytest.mark.parametrize("parallel", [True, False])
+def test_summary_breaks_last_activity_ties_like_entry_order(
+    settings, admin_user, client_obj, project, use_rollups, parallel
+):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    settings.REPORTS_PARALLEL_WORKERS = 1
+    late, untimed, older = (
+        models.Project.objects.create(name=name, client=client_obj, created_by=admin_user)
+        for name in ("Late", "Untimed", "Older")
+    )
+    day = date(2024, 3, 4)
+    for target, on, start, end in [
+        (project, day, time(9), time(10)),
+        (late, day, time(14), time(15)),
+        (late, day - timedelta(days=1), time(16), time(17)),
+        (untimed, day, None, None),
+        (older, day - timedelta(days=1), time(18), time(19)),
+    ]:
+        models.TimeEntry.objects.create(
+            project=target, user=admin_user, date=on, start=start, end=end, duration_minutes=60, task="Work"
+        )
+
+    # The order in which each (project, user) first came up when summaries walked the entries.
+    baseline = list(
+        dict.fromkeys(entry.project.name for entry in models.TimeEntry.objects.select_related("project"))
+    )
+    assert baseline == ["Late", project.name, "Untimed", "Older"]
+    rows = reporting.summarize(admin_user, reporting.ReportFilters(), parallel=parallel)
+    assert [row["project"] for row in rows] == baseline
+    rows = reporting.summarize(admin_user, reporting.ReportFilters(ordering="last_activity"), parallel=parallel)
+    assert [row["project"] for row in rows] == baseline[::-1]
+
+
+@pytest.mark.django_db
+def test_closed_month_summaries_keep_tie_order_without_reading_entries(admin_user, client_obj, project):
+    late = models.Project.objects.create(name="Late", client=client_obj, created_by=admin_user)
+    for target, start in [(project, time(9)), (late, time(14))]:
+        models.TimeEntry.objects.create(
+            project=target, user=admin_user, date=date(2024, 3, 4), start=start, duration_minutes=60, task="Work"
+        )
+    periods.close(date(2024, 3, 1), admin_user)
+
+    filters = reporting.ReportFilters(date_from="2024-03-01", date_to="2024-03-31")
+    with CaptureQueriesContext(connection) as queries:
+        rows = reporting.summarize(admin_user, filters, parallel=False)
+    assert [row["project"] for row in rows] == ["Late", project.name]
+    assert not [query for query in queries if models.TimeEntry._meta.db_table in query["sql"]]
+
+
+def test_date_shards_cover_the_range_without_overlap():
+    shards = sharding.date_shards(date(2024, 1, 1), date(2024, 1, 31), 4)
+    assert shards[0][0] == date(2024, 1, 1) and shards[-1][1] == date(2024, 1, 31)
+    assert all(end + timedelta(days=1) == start for (_, end), (start, _) in zip(shards, shards[1:]))
+    assert [(end - start).days + 1 for start, end in shards] == [8, 8, 8, 7]
+    assert sharding.date_shards(date(2024, 1, 1), date(2024, 1, 2), 8) == [
+        (date(2024, 1, 1), date(2024, 1, 1)),
+        (date(2024, 1, 2), date(2024, 1, 2)),
+    ]
+
+
+@pytest.mark.django_db
+def test_summarize_client_scope_counts_assigned_entries_once(client_user, assignment, rated_entries):
+    filters = reporting.ReportFilters(project_id=assignment.project_id)
+    rows = reporting.summarize(client_user, filters)
+
+    expected = _legacy_summary(reporting.build_queryset(client_user, filters))
+    assert [(row["project"], row["total_minutes"]) for row in rows] == [
+        (project, totals["total_minutes"]) for (project, _), totals in expected.items()
+    ]
+
+
+@pytest.mark.django_db
+def test_rate_timeline_matches_linear_scan(project, client_obj, rated_entries):
+    timeline = rates.get_timeline()
+    candidates = list(models.HourlyRate.objects.order_by("-effective_from", "-id"))
+
+    for offset in range(-5, 40):
+        day = rated_entries + timedelta(days=offset)
+        expected = None
+        for target in ("project", "client"):
+            expected = expected or next(
+                (
+                    (rate.amount_decimal, rate.currency)
+                    for rate in candidates
+                    if getattr(rate, f"{target}_id")
+                    and rate.effective_from <= day
+                    and (rate.effective_to is None or rate.effective_to >= day)
+                ),
+                None,
+            )
+        assert timeline.rate_for(project.pk, client_obj.pk, day) == expected
+
+
+@pytest.mark.django_db
+def test_rate_timeline_refreshes_after_rate_changes(project, client_obj, rated_entries):
+    day = rated_entries + timedelta(days=25)
+    assert rates.get_timeline().rate_for(project.pk, client_obj.pk, day)[0] == Decimal("45.00")
+
+    models.HourlyRate.objects.create(project=project, amount_decimal=Decimal("70.00"), effective_from=day)
+    assert rates.get_timeline().rate_for(project.pk, client_obj.pk, day)[0] == Decimal("70.00")
+
+
+def _rollup_rows() -> list[tuple]:
+    return sorted(
+        models.TimeEntryRollup.objects.values_list(
+            "project_id",
+            "user_id",
+            "date",
+            "billable",
+            "entry_count",
+            "total_minutes",
+            "rated",
+            "total_amount",
+            "last_activity",
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_rollups_follow_entry_changes(project, admin_user, rated_entries):
+    entry = models.TimeEntry.objects.filter(project=project).first()
+    entry.project = models.Project.objects.get(name="Project Beta")
+    entry.date = rated_entries + timedelta(days=12)
+    entry.duration_minutes += 17
+    entry.billable = not entry.billable
+    entry.save()
+    models.TimeEntry.objects.filter(project=project).last().delete()
+    # Moving and then removing a day's newest entry hands the sort key back to the next newest.
+    newest, other = models.TimeEntry.objects.filter(project=project)[:2]
+    other.date, other.billable, other.start = newest.date, newest.billable, time(8)
+    other.save()
+    newest.start = time(17)
+    newest.save()
+    newest.start = None
+    newest.save()
+    newest.delete()
+
+    maintained = _rollup_rows()
+    rates.invalidate()
+    rollups.rebuild()
+    assert maintained == _rollup_rows()
+
+
+@pytest.mark.django_db
+def test_rollups_are_repriced_when_rates_change(project, admin_user, rated_entries):
+    rate = models.HourlyRate.objects.get(amount_decimal=Decimal("61.30"))
+    rate.amount_decimal = Decimal("33.33")
+    rate.save()
+    models.HourlyRate.objects.get(amount_decimal=Decimal("92.50")).delete()
+
+    maintained = _rollup_rows()
+    rollups.rebuild()
+    assert maintained == _rollup_rows()
+    assert models.TimeEntryRollup.objects.filter(total_amount__gt=0).exists()
+
+
+def test_summary_pages_split_large_reports():
+    rows = [
+        {
+            "client": "Acme Corp",
+            "project": f"Project {index}",
+            "user": "ana@example.com",
+            "total_minutes": 60,
+            "billable_minutes": 60,
+            "non_billable_minutes": 0,
+            "total_amount": Decimal("50.00"),
+        }
+        for index in range(5)
+    ]
+
+    pages = reporting.summary_pages(rows, chunk_rows=2)
+
+    assert len(pages) == 3
+    assert [page.count("<h1>") for page in pages] == [1, 0, 0]
+    assert [page.count("Project ") for page in pages] == [2, 2, 1]
+    assert "No data available" in reporting.summary_pages([], chunk_rows=2)[0]
+
+
+@pytest.mark.django_db
+def test_client_visibility_uses_exists_without_duplicates(client_user, assignment, project, admin_user):
+    other_client = models.Client.objects.create(name="Globex", email="globex@example.com")
+    shared = models.Project.objects.create(name="Shared", client=other_client, created_by=admin_user)
+    hidden = models.Project.objects.create(name="Hidden", client=other_client, created_by=admin_user)
+    models.ProjectAssignment.objects.create(project=shared, user=client_user, is_active=True)
+    models.ProjectAssignment.objects.create(project=project, user=admin_user, is_active=True)
+    projects = [project, shared, hidden]
+    start = date(2024, 1, 1)
+    models.TimeEntry.objects.bulk_create(
+        (
+            models.TimeEntry(
+                project=projects[index % 3],
+                user=admin_user,
+                date=start + timedelta(days=index % 365),
+                duration_minutes=15 + index % 90,
+                task="Bulk",
+            )
+            for index in range(100_000)
+        ),
+        batch_size=5000,
+    )
+
+    queryset = reporting.build_queryset(client_user, reporting.ReportFilters())
+    sql = str(queryset.query).upper()
+    assert "EXISTS" in sql and "DISTINCT" not in sql
+    assert "DISTINCT" not in queryset.explain().upper()
+    ids = list(queryset.values_list("id", flat=True))
+    assert len(ids) == len(set(ids)) == models.TimeEntry.objects.exclude(project=hidden).count()
+
+    visible = models.Project.objects.filter(
+        permissions.visible_projects_filter(client_user, project_lookup=None)
+    )
+    assert "DISTINCT" not in str(visible.query).upper()
+    assert sorted(visible.values_list("name", flat=True)) == ["Project Alpha", "Shared"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+@pytest.mark.parametrize("interval", ["day", "week", "month"])
+def test_timeseries_buckets_match_entries(settings, admin_user, rated_entries, use_rollups, interval):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    filters = reporting.ReportFilters(date_from="2023-12-25", date_to="2024-02-10")
+    data = timeseries.build(admin_user, filters, interval, split="project")
+
+    expected: dict = {}
+    for entry in reporting.build_queryset(admin_user, filters).select_related("project"):
+        bucket = timeseries.bucket_start(entry.date, interval).isoformat()
+        point = expected.setdefault(entry.project.name, {}).setdefault(bucket, [0, 0, Decimal("0.00")])
+        point[0] += entry.duration_minutes
+        point[1] += entry.duration_minutes if entry.billable else 0
+        rate = reporting.resolve_rate(entry)
+        if rate:
+            point[2] += ((Decimal(entry.duration_minutes) / Decimal(60)) * rate).quantize(Decimal("0.01"))
+
+    assert data["buckets"][0] == timeseries.bucket_start(date(2023, 12, 25), interval).isoformat()
+    assert data["buckets"][-1] == timeseries.bucket_start(date(2024, 2, 10), interval).isoformat()
+    assert [series["label"] for series in data["series"]] == ["Project Alpha", "Project Beta"]
+    for series in data["series"]:
+        points = expected[series["label"]]
+        for index, bucket in enumerate(data["buckets"]):
+            minutes, billable, amount = points.get(bucket, (0, 0, Decimal("0.00")))
+            assert series["minutes"][index] == minutes
+            assert series["billable_minutes"][index] == billable
+            assert series["amounts"]["EUR"][index] == str(amount)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+def test_pivot_matches_per_entry_totals(settings, admin_user, rated_entries, use_rollups):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    filters = reporting.ReportFilters()
+    data = pivot.build(admin_user, filters, ["client", "project", "month", "billable"])
+
+    expected: dict = {}
+    for entry in reporting.build_queryset(admin_user, filters).select_related("project"):
+        key = (entry.project.client_id, entry.project_id, entry.date.strftime("%Y-%m"), entry.billable)
+        totals = expected.setdefault(key, [0, 0, 0, Decimal("0.00")])
+        totals[0] += 1
+        totals[1] += entry.duration_minutes
+        totals[2] += entry.duration_minutes if entry.billable else 0
+        rate = reporting.resolve_rate(entry)
+        if rate:
+            totals[3] += ((Decimal(entry.duration_minutes) / Decimal(60)) * rate).quantize(Decimal("0.01"))
+
+    assert data["columns"] == ["client", "project", "month", "billable", "currency", *pivot.MEASURES]
+    assert [tuple(row[:4]) for row in data["rows"]] == sorted(expected)
+    for row in data["rows"]:
+        entries, minutes, billable, amount = expected[tuple(row[:4])]
+        assert row[4:] == ["EUR", entries, minutes, billable, str(amount)]
+    assert set(data["labels"]["project"].values()) == {"Project Alpha", "Project Beta"}
+
+
+def test_pivot_groups_weeks_and_handles_empty_frames():
+    start = date(2024, 1, 1)
+    ordinals = np.array([start.toordinal() + offset for offset in (0, 6, 7, 13, 14)])
+    frame = pivot.Frame(
+        project_id=np.array([1, 1, 2, 2, 1]),
+        client_id=np.array([9, 9, 9, 9, 9]),
+        user_id=np.array([5, 5, 5, 5, 5]),
+        date_ordinal=ordinals,
+        billable=np.array([True, False, True, True, False]),
+        entries=np.ones(5, dtype=np.int64),
+        minutes=np.array([10, 20, 30, 40, 50]),
+        amount_cents=np.array([100, 0, 300, 400, 0]),
+        currency=np.zeros(5, dtype=np.int64),
+        currencies=["EUR"],
+    )
+    dimensions, measures = pivot.group(frame, ["week"])
+    assert [date.fromordinal(int(value)) for value in dimensions[0]] == [
+        date(2024, 1, 1),
+        date(2024, 1, 8),
+        date(2024, 1, 15),
+    ]
+    assert measures["total_minutes"].tolist() == [30, 70, 50]
+    assert measures["billable_minutes"].tolist() == [10, 70, 0]
+    assert measures["total_amount"].tolist() == [100, 700, 0]
+
+    empty = pivot.Frame(*(np.array([], dtype=np.int64) for _ in range(9)), currencies=[])
+    dimensions, measures = pivot.group(empty, ["project", "billable"])
+    assert [len(values) for values in dimensions] == [0, 0]
+    assert measures["entries"].tolist() == []
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+@pytest.mark.parametrize("use_window", [True, False])
+def test_utilization_per_user_and_iso_week(
+    settings, admin_user, client_user, project, rated_entries, use_rollups, use_window
+):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    settings.UTILIZATION_WEEKLY_CAPACITY_MINUTES = 600
+    for offset, minutes in ((0, 300), (15, 120)):
+        models.TimeEntry.objects.create(
+            project=project,
+            user=client_user,
+            date=rated_entries + timedelta(days=offset),
+            duration_minutes=minutes,
+            task="Review",
+        )
+    filters = reporting.ReportFilters()
+    data = utilization.build(admin_user, filters, use_window=use_window)
+
+    expected: dict = {}
+    for entry in reporting.build_queryset(admin_user, filters):
+        week = entry.date - timedelta(days=entry.date.weekday())
+        totals = expected.setdefault((entry.user_id, week), [0, 0])
+        totals[0] += entry.duration_minutes
+        totals[1] += entry.duration_minutes if entry.billable else 0
+
+    assert data["capacity_minutes"] == 600
+    assert [(row["user_id"], row["week_start"]) for row in data["rows"]] == [
+        (user_id, week.isoformat()) for user_id, week in sorted(expected)
+    ]
+    for row in data["rows"]:
+        week = date.fromisoformat(row["week_start"])
+        total, billable = expected[(row["user_id"], week)]
+        previous_total, previous_billable = expected.get((row["user_id"], week - timedelta(days=7)), (0, 0))
+        assert row["week"] == "%d-W%02d" % week.isocalendar()[:2]
+        assert (row["total_minutes"], row["billable_minutes"]) == (total, billable)
+        assert row["billable_ratio"] == round(billable / total, 4)
+        assert row["utilization"] == round(billable / 600, 4)
+        assert row["total_minutes_change"] == total - previous_total
+        assert row["billable_minutes_change"] == billable - previous_billable
+
+    client_weeks = [row for row in data["rows"] if row["user_id"] == client_user.pk]
+    assert [row["week"] for row in client_weeks] == ["2024-W01", "2024-W03"]
+    assert client_weeks[1]["utilization_change"] == 0.2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+def test_pack_burndown_projects_exhaustion_from_recent_burn(settings, admin_user, project, use_rollups):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    settings.PACK_FORECAST_WINDOW_DAYS = 7
+    project.billing_type = models.Project.BillingType.PACK
+    project.pack_hours = Decimal("10.00")
+    project.save()
+    today = date(2024, 5, 20)
+    for offset in range(7):
+        models.TimeEntry.objects.create(
+            project=project, user=admin_user, date=today - timedelta(days=offset), duration_minutes=60, task="Work"
+        )
+
+    data = packs.compute(project, today)
+    assert (data["pack_hours"], data["consumed_hours"], data["remaining_hours"]) == ("10.00", "7.00", "3.00")
+    assert data["burn_rate_hours_per_day"] == 1.0
+    assert data["projected_exhaustion"] == "2024-05-23"
+    assert data["exhausted_on"] is None
+    assert data["history"]["minutes"] == [60] * 7
+    assert data["history"]["remaining_minutes"] == [540, 480, 420, 360, 300, 240, 180]
+
+    models.TimeEntry.objects.create(
+        project=project, user=admin_user, date=today - timedelta(days=30), duration_minutes=200, task="Kickoff"
+    )
+    data = packs.compute(project, today)
+    assert data["remaining_hours"] == "-0.33"
+    assert data["exhausted_on"] == "2024-05-20"
+    assert data["projected_exhaustion"] is None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+def test_closed_months_are_served_from_snapshots(settings, admin_user, project, rated_entries, use_rollups):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    january = reporting.ReportFilters(date_from="2024-01-01", date_to="2024-01-31")
+    ranges = [
+        january,
+        reporting.ReportFilters(),
+        reporting.ReportFilters(date_from="2024-01-01", date_to="2024-02-29"),
+        reporting.ReportFilters(date_from="2024-01-10", ordering="total_amount", limit=1),
+    ]
+    before = [reporting.summarize(admin_user, filters) for filters in ranges]
+
+    period = periods.close(date(2024, 1, 15), admin_user)
+    assert period.month == date(2024, 1, 1)
+    assert period.snapshots.count() == 4
+    assert [reporting.summarize(admin_user, filters) for filters in ranges] == before
+
+    # Snapshots keep the amounts a later rate change would alter, while open months stay live.
+    for rate in models.HourlyRate.objects.filter(project=project):
+        rate.delete()
+    models.TimeEntry.objects.create(
+        project=project, user=admin_user, date=date(2024, 2, 5), duration_minutes=30, task="Follow-up"
+    )
+    assert reporting.summarize(admin_user, january) == before[0]
+    minutes = {row["project"]: row["total_minutes"] for row in reporting.summarize(admin_user, ranges[2])}
+    assert minutes == {
+        row["project"]: row["total_minutes"] + (30 if row["project"] == project.name else 0) for row in before[2]
+    }
+
+    periods.reopen(period)
+    assert reporting.summarize(admin_user, january) != before[0]
+
+
+@pytest.mark.django_db
+def test_closing_and_reopening_a_period_invalidates_cached_reports(
+    admin_user, project, rated_entries, django_capture_on_commit_callbacks
+):
+    generation = report_cache.client_generation(project.client_id)
+    with django_capture_on_commit_callbacks(execute=True):
+        period = periods.close(date(2024, 1, 15), admin_user)
+    assert report_cache.client_generation(project.client_id) == generation + 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        periods.reopen(period)
+    assert report_cache.client_generation(project.client_id) == generation + 2
+
+
+def test_period_split_keeps_open_stretches_live(db):
+    for month in (date(2024, 1, 1), date(2024, 2, 1), date(2024, 4, 1)):
+        models.ClosedPeriod.objects.create(month=month)
+    ids = dict(models.ClosedPeriod.objects.values_list("month", "pk"))
+
+    closed, live = periods.split(reporting.ReportFilters(date_from="2023-12-15", date_to="2024-04-30"))
+    assert closed == [ids[date(2024, 1, 1)], ids[date(2024, 2, 1)], ids[date(2024, 4, 1)]]
+    assert [(part.date_from, part.date_to) for part in live] == [
+        ("2023-12-15", "2023-12-31"),
+        ("2024-03-01", "2024-03-31"),
+    ]
+
+    closed, live = periods.split(reporting.ReportFilters(date_from="2024-01-02"))
+    assert closed == [ids[date(2024, 2, 1)], ids[date(2024, 4, 1)]]
+    assert [(part.date_from, part.date_to) for part in live] == [
+        ("2024-01-02", "2024-01-31"),
+        ("2024-03-01", "2024-03-31"),
+        ("2024-05-01", None),
+    ]
+
+    assert periods.split(reporting.ReportFilters(date_to="2024-01-30")) == (
+        [],
+        [reporting.ReportFilters(date_to="2024-01-30")],
+    )
+
+
+@pytest.mark.django_db
+def test_closed_period_locks_its_entries(admin_user, project):
+    entry = models.TimeEntry.objects.create(
+        project=project, user=admin_user, date=date(2024, 3, 4), duration_minutes=45, task="Work"
+    )
+    period = periods.close(date(2024, 3, 1), admin_user)
+    with pytest.raises(ValueError):
+        periods.close(date(2024, 3, 20), admin_user)
+    with pytest.raises(ValueError):
+        periods.close(date.today(), admin_user)
+
+    entry.duration_minutes = 50
+    with pytest.raises(ValidationError):
+        entry.save()
+    entry.refresh_from_db()
+    entry.date = date(2024, 4, 1)
+    with pytest.raises(ValidationError):
+        entry.save()
+    with pytest.raises(ValidationError):
+        entry.delete()
+    with pytest.raises(ValidationError):
+        models.TimeEntry.objects.create(
+            project=project, user=admin_user, date=date(2024, 3, 5), duration_minutes=10, task="Late"
+        )
+
+    periods.reopen(period)
+    entry.save()
+    assert models.TimeEntry.objects.get(pk=entry.pk).date == date(2024, 4, 1)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+def test_summary_converts_currencies_at_daily_fx_rates(
+    settings, tmp_path, admin_user, client_obj, project, use_rollups
+):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    dollars, pounds = (
+        models.Project.objects.create(name=f"Project {code}", client=client_obj, created_by=admin_user, currency=code)
+        for code in ("USD", "GBP")
+    )
+    start = date(2024, 1, 1)
+    models.HourlyRate.objects.create(project=project, amount_decimal=Decimal("60.00"), effective_from=start)
+    models.HourlyRate.objects.create(
+        project=dollars, amount_decimal=Decimal("100.00"), currency="USD", effective_from=start
+    )
+    models.HourlyRate.objects.create(
+        project=pounds, amount_decimal=Decimal("80.00"), currency="GBP", effective_from=start
+    )
+    for target, day, minutes in [(project, 2, 60), (dollars, 2, 60), (dollars, 4, 30), (pounds, 3, 45)]:
+        models.TimeEntry.objects.create(
+            project=target, user=admin_user, date=date(2024, 1, day), duration_minutes=minutes, task="Work"
+        )
+    rates_file = tmp_path / "rates.csv"
+    rates_file.write_text("date,currency,rate\n2024-01-01,usd,0.9\n2024-01-03,USD,0.8\n2024-01-01,EUR,1\n")
+    call_command("load_fx_rates", str(rates_file))
+
+    table = fx.get_table()
+    assert table.rate_on("USD", date(2023, 12, 31)) is None
+    assert table.rate_on("USD", date(2024, 1, 2)) == Decimal("0.9")
+    assert table.convert(5000, "USD", date(2024, 2, 1)) == 4000
+    assert models.FxRate.objects.count() == 2
+
+    expected = {
+        project.name: ({"EUR": Decimal("60.00")}, Decimal("60.00")),
+        dollars.name: ({"USD": Decimal("150.00")}, Decimal("130.00")),
+        pounds.name: ({"GBP": Decimal("60.00")}, None),
+    }
+
+    def amounts(filters):
+        return {
+            row["project"]: (row["amounts"], row["base_amount"])
+            for row in reporting.summarize(admin_user, filters)
+            if row["base_currency"] == "EUR"
+        }
+
+    assert amounts(reporting.ReportFilters()) == expected
+    periods.close(start, admin_user)
+    assert amounts(reporting.ReportFilters(date_from="2024-01-01", date_to="2024-01-31")) == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rollups", [True, False])
+def test_timeseries_and_pivot_keep_currencies_apart(settings, admin_user, client_obj, project, use_rollups):
+    settings.REPORTS_USE_ROLLUPS = use_rollups
+    dollars = models.Project.objects.create(
+        name="Project USD", client=client_obj, created_by=admin_user, currency="USD"
+    )
+    start = date(2024, 1, 1)
+    models.HourlyRate.objects.create(project=project, amount_decimal=Decimal("60.00"), effective_from=start)
+    models.HourlyRate.objects.create(
+        project=dollars, amount_decimal=Decimal("100.00"), currency="USD", effective_from=start
+    )
+    for target in (project, dollars):
+        models.TimeEntry.objects.create(
+            project=target, user=admin_user, date=date(2024, 1, 2), duration_minutes=60, task="Work"
+        )
+    filters = reporting.ReportFilters(date_from="2024-01-01", date_to="2024-01-31")
+
+    [series] = timeseries.build(admin_user, filters, "month")["series"]
+    assert series["minutes"] == [120]
+    assert series["amounts"] == {"EUR": ["60.00"], "USD": ["100.00"]}
+
+    data = pivot.build(admin_user, filters, ["client"])
+    assert data["columns"] == ["client", "currency", *pivot.MEASURES]
+    assert data["rows"] == [[client_obj.pk, "EUR", 1, 60, 60, "60.00"], [client_obj.pk, "USD", 1, 60, 60, "100.00"]]
@@ -13,6 +13,8 @@ router.register(r"users", views.UserViewSet, basename="user")
 router.register(r"hourly-rates", views.HourlyRateViewSet, basename="hourlyrate")
 router.register(r"time-entries", views.TimeEntryViewSet, basename="timeentry")
 router.register(r"time-entry-timers", views.TimeEntryTimerViewSet, basename="timeentrytimer")
+router.register(r"reports/exports", views.ReportExportJobViewSet, basename="reportexport")
+router.register(r"reports/periods", views.ClosedPeriodViewSet, basename="closedperiod")
 
 urlpatterns = [
     path("auth/login", views.LoginView.as_view(), name="auth-login"),
@@ -21,8 +23,15 @@ urlpatterns = [
     path("auth/me", views.MeView.as_view(), name="auth-me"),
     path("settings/system/", views.SystemSettingsView.as_view(), name="system-settings"),
     path("reports/summary", views.ReportSummaryView.as_view(), name="reports-summary"),
+    path("reports/timeseries", views.ReportTimeseriesView.as_view(), name="reports-timeseries"),
+    path("reports/pivot", views.ReportPivotView.as_view(), name="reports-pivot"),
+    path("reports/utilization", views.ReportUtilizationView.as_view(), name="reports-utilization"),
+    path("reports/aging", views.ReportAgingView.as_view(), name="reports-aging"),
+    path("reports/cache-stats", views.ReportCacheStatsView.as_view(), name="reports-cache-stats"),
     path("reports/export.csv", views.ReportExportCsvView.as_view(), name="reports-export-csv"),
     path("reports/export.pdf", views.ReportExportPdfView.as_view(), name="reports-export-pdf"),
+    path("reports/entries.csv", views.ReportEntriesCsvView.as_view(), name="reports-entries-csv"),
+    path("reports/entries.ndjson", views.ReportEntriesNdjsonView.as_view(), name="reports-entries-ndjson"),
     path("health/", views.HealthView.as_view(), name="health"),
     path("", include(router.urls)),
 ]
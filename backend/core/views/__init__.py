@@ -3,7 +3,20 @@ from .clients import ClientViewSet
 from .health import HealthView
 from .hourly_rates import HourlyRateViewSet
 from .projects import ProjectAssignmentViewSet, ProjectViewSet
-from .reports import ReportExportCsvView, ReportExportPdfView, ReportSummaryView
+from .reports import (
+    ClosedPeriodViewSet,
+    ReportAgingView,
+    ReportCacheStatsView,
+    ReportEntriesCsvView,
+    ReportEntriesNdjsonView,
+    ReportExportCsvView,
+    ReportExportJobViewSet,
+    ReportExportPdfView,
+    ReportPivotView,
+    ReportSummaryView,
+    ReportTimeseriesView,
+    ReportUtilizationView,
+)
 from .settings import SystemSettingsView
 from .time_entries import TimeEntryTimerViewSet, TimeEntryViewSet
 from .users import UserViewSet
@@ -21,8 +34,17 @@ __all__ = [
     "TimeEntryViewSet",
     "TimeEntryTimerViewSet",
     "ReportSummaryView",
+    "ReportCacheStatsView",
+    "ReportTimeseriesView",
+    "ReportPivotView",
+    "ReportUtilizationView",
+    "ReportAgingView",
     "ReportExportCsvView",
     "ReportExportPdfView",
+    "ReportEntriesCsvView",
+    "ReportEntriesNdjsonView",
+    "ReportExportJobViewSet",
+    "ClosedPeriodViewSet",
     "SystemSettingsView",
     "HealthView",
 ]
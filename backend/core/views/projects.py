@@ -1,17 +1,14 @@
 from __future__ import annotations
 
-from django.db.models import Q
-from rest_framework import status as drf_status, viewsets
+from rest_framework import status as drf_status
+from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from .. import models, permissions
-from ..serializers import (
-    ProjectAssignmentSerializer,
-    ProjectSerializer,
-  ProjectStatusUpdateSerializer,
-)
+from ..serializers import ProjectAssignmentSerializer, ProjectSerializer, ProjectStatusUpdateSerializer
+from ..services import packs
 
 
 class ProjectViewSet(viewsets.ModelViewSet):
@@ -33,12 +30,11 @@ class ProjectViewSet(viewsets.ModelViewSet):
         client_id = getattr(user, "client_id", None)
         if not client_id:
             return queryset.none()
-        filtered_queryset = queryset.filter(client_id=client_id).distinct()
-
-        return filtered_queryset
+        # Filtering on the project's own column joins nothing, so no distinct() is needed.
+        return queryset.filter(client_id=client_id)
 
     def get_permissions(self):
-        if self.action in ["list", "retrieve"]:
+        if self.action in ["list", "retrieve", "burndown"]:
             return [IsAuthenticated()]
         return [IsAuthenticated(), permissions.IsAdmin()]
 
@@ -54,6 +50,16 @@ class ProjectViewSet(viewsets.ModelViewSet):
         response_serializer = self.get_serializer(project)
         return Response(response_serializer.data, status=drf_status.HTTP_200_OK)
 
+    @action(detail=True, methods=["get"], url_path="burndown")
+    def burndown(self, request, pk=None):
+        project = self.get_object()
+        if project.billing_type != models.Project.BillingType.PACK:
+            return Response(
+                {"detail": "Only hours-pack projects have a burn-down."},
+                status=drf_status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(packs.burndown(project), status=drf_status.HTTP_200_OK)
+
 
 class ProjectAssignmentViewSet(viewsets.ModelViewSet):
     serializer_class = ProjectAssignmentSerializer
@@ -1,61 +1,266 @@
 from __future__ import annotations
 
-from rest_framework import status
+from datetime import date
+
+from django.db.models import Count
+from django.http import FileResponse
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ..serializers import ReportSummarySerializer
-from ..services import reporting
+from .. import models, permissions
+from ..serializers import (
+    ClosedPeriodSerializer,
+    ReportExportJobSerializer,
+    ReportExportRequestSerializer,
+    ReportSummarySerializer,
+)
+from ..services import aging, exports, periods, pivot, report_cache, reporting, timeseries, utilization
+
+
+def _to_int(value):
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_filters(params, paged: bool = True) -> reporting.ReportFilters:
+    """Report filters from query parameters; ``limit`` and ``offset`` only count when ``paged``.
+
+    Exports always cover every row, so an export URL copied from a paged
+    summary call does not silently drop the rows outside that page.
+    """
+    billable_param = params.get("billable")
+    billable = None
+    if billable_param is not None:
+        billable = str(billable_param).lower() in {"1", "true", "yes"}
+    ordering = params.get("ordering")
+    if not ordering or ordering.lstrip("-") not in reporting.SUMMARY_ORDERINGS:
+        ordering = None
+    limit = _to_int(params.get("limit")) if paged else None
+    offset = _to_int(params.get("offset")) if paged else None
+    return reporting.ReportFilters(
+        client_id=_to_int(params.get("client")),
+        project_id=_to_int(params.get("project")),
+        user_id=_to_int(params.get("user")),
+        date_from=params.get("from"),
+        date_to=params.get("to"),
+        billable=billable,
+        ordering=ordering,
+        limit=limit if limit and limit > 0 else None,
+        offset=max(offset or 0, 0),
+    )
 
 
 class ReportBaseView(APIView):
     permission_classes = [IsAuthenticated]
+    paged = True
 
     def build_filters(self, request) -> reporting.ReportFilters:
-        params = request.query_params
-        billable_param = params.get("billable")
-        billable = None
-        if billable_param is not None:
-            billable = billable_param.lower() in {"1", "true", "yes"}
-        return reporting.ReportFilters(
-            client_id=self._to_int(params.get("client")),
-            project_id=self._to_int(params.get("project")),
-            user_id=self._to_int(params.get("user")),
-            date_from=params.get("from"),
-            date_to=params.get("to"),
-            billable=billable,
-        )
+        return parse_filters(request.query_params, self.paged)
 
-    @staticmethod
-    def _to_int(value):
-        if value is None:
-            return None
-        try:
-            return int(value)
-        except ValueError:
-            return None
+
+class ReportExportView(ReportBaseView):
+    paged = False
 
 
 class ReportSummaryView(ReportBaseView):
     def get(self, request):
         filters = self.build_filters(request)
-        rows = reporting.summarize(request.user, filters)
+        rows = report_cache.cached(
+            "summary",
+            request.user,
+            filters,
+            lambda: reporting.summarize(request.user, filters),
+        )
         serializer = ReportSummarySerializer(rows, many=True)
         return Response(serializer.data)
 
 
-class ReportExportCsvView(ReportBaseView):
+class ReportTimeseriesView(ReportBaseView):
     def get(self, request):
         filters = self.build_filters(request)
-        rows = reporting.summarize(request.user, filters)
+        interval = request.query_params.get("interval", "day")
+        split = request.query_params.get("split") or None
+        if interval not in timeseries.INTERVALS:
+            return Response(
+                {"detail": f"interval must be one of {', '.join(timeseries.INTERVALS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if split is not None and split not in timeseries.SPLITS:
+            return Response(
+                {"detail": f"split must be one of {', '.join(timeseries.SPLITS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            data = report_cache.cached(
+                f"timeseries:{interval}:{split}",
+                request.user,
+                filters,
+                lambda: timeseries.build(request.user, filters, interval, split),
+            )
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data)
+
+
+class ReportPivotView(ReportBaseView):
+    def get(self, request):
+        filters = self.build_filters(request)
+        group_by = [name for name in request.query_params.get("group_by", "").split(",") if name]
+        unknown = [name for name in group_by if name not in pivot.DIMENSIONS]
+        if not group_by or unknown or len(set(group_by)) != len(group_by):
+            return Response(
+                {"detail": f"group_by must list distinct dimensions from {', '.join(pivot.DIMENSIONS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            data = report_cache.cached(
+                f"pivot:{','.join(group_by)}",
+                request.user,
+                filters,
+                lambda: pivot.build(request.user, filters, group_by),
+            )
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data)
+
+
+class ReportUtilizationView(ReportBaseView):
+    def get(self, request):
+        filters = self.build_filters(request)
+        data = report_cache.cached(
+            "utilization",
+            request.user,
+            filters,
+            lambda: utilization.build(request.user, filters),
+        )
+        return Response(data)
+
+
+class ReportAgingView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        as_of = request.query_params.get("as_of")
+        try:
+            as_of = date.fromisoformat(as_of) if as_of else date.today()
+        except ValueError:
+            return Response({"detail": "as_of must be a date (YYYY-MM-DD)."}, status=status.HTTP_400_BAD_REQUEST)
+        data = report_cache.cached(
+            f"aging:{as_of.isoformat()}",
+            request.user,
+            reporting.ReportFilters(),
+            lambda: aging.build(request.user, as_of),
+        )
+        return Response(data)
+
+
+class ReportCacheStatsView(APIView):
+    permission_classes = [IsAuthenticated, permissions.IsAdmin]
+
+    def get(self, request):
+        return Response(report_cache.stats())
+
+
+class ReportExportCsvView(ReportExportView):
+    def get(self, request):
+        filters = self.build_filters(request)
+        rows = reporting.iter_summary(request.user, filters)
         return reporting.export_csv(rows)
 
 
-class ReportExportPdfView(ReportBaseView):
+class ReportExportPdfView(ReportExportView):
     def get(self, request):
         filters = self.build_filters(request)
         rows = reporting.summarize(request.user, filters)
         return reporting.export_pdf(rows)
 
 
+class ReportEntriesCsvView(ReportExportView):
+    def get(self, request):
+        filters = self.build_filters(request)
+        rows = reporting.iter_entries(request.user, filters)
+        return reporting.export_entries_csv(rows)
+
+
+class ReportEntriesNdjsonView(ReportExportView):
+    def get(self, request):
+        filters = self.build_filters(request)
+        rows = reporting.iter_entries(request.user, filters)
+        return reporting.export_entries_ndjson(rows)
+
+
+class ReportExportJobViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Queue report exports for the worker and download the finished artifacts.
+
+    Filters are posted with the same names as the report query parameters.
+    """
+
+    serializer_class = ReportExportJobSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ("status", "format")
+
+    def get_queryset(self):
+        return exports.visible_jobs(self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        serializer = ReportExportRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job, created = exports.request_export(
+            request.user,
+            serializer.validated_data["format"],
+            parse_filters(request.data, paged=False),
+        )
+        output = self.get_serializer(job)
+        return Response(output.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != job.Status.DONE or not job.artifact:
+            return Response(
+                {"detail": "Export is not ready.", "status": job.status},
+                status=status.HTTP_409_CONFLICT,
+            )
+        export = exports.FORMATS[job.format]
+        return FileResponse(
+            job.artifact.open("rb"),
+            as_attachment=True,
+            filename=export.filename,
+            content_type=export.content_type,
+        )
+
+
+class ClosedPeriodViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Close past months into report snapshots; deleting a period reopens it."""
+
+    serializer_class = ClosedPeriodSerializer
+    permission_classes = [IsAuthenticated, permissions.IsAdmin]
+    queryset = models.ClosedPeriod.objects.select_related("closed_by").annotate(snapshot_count=Count("snapshots"))
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            period = periods.close(serializer.validated_data["month"], request.user)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(period).data, status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        periods.reopen(instance)
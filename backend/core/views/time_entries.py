@@ -1,7 +1,7 @@
 from __future__ import annotations
 
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
-from django.db.models import Prefetch
 from django.utils import timezone
 from rest_framework import serializers, status, viewsets
 from rest_framework.decorators import action
@@ -26,17 +26,7 @@ class TimeEntryViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         queryset = (
             models.TimeEntry.objects.select_related("project", "project__client", "user")
-            .prefetch_related(
-                "project__assignments",
-                Prefetch(
-                    "project__hourly_rates",
-                    queryset=models.HourlyRate.objects.order_by("-effective_from"),
-                ),
-                Prefetch(
-                    "project__client__hourly_rates",
-                    queryset=models.HourlyRate.objects.order_by("-effective_from"),
-                ),
-            )
+            .prefetch_related("project__assignments")
             .all()
         )
         user = self.request.user
@@ -53,6 +43,13 @@ class TimeEntryViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated()]
         return [IsAuthenticated(), permissions.IsAdmin()]
 
+    def perform_destroy(self, instance):
+        # The model refuses to delete entries in a closed period; answer 400 rather than 500.
+        try:
+            instance.delete()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({"date": exc.messages})
+
 
 class TimeEntryTimerViewSet(viewsets.ModelViewSet):
     serializer_class = TimeEntryTimerSerializer
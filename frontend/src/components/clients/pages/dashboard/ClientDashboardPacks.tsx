@@ -10,12 +10,18 @@ export interface ClientPackProgress {
   usedHours: number;
   currency: string;
   totalValue?: number | null;
+  exhaustedOn?: string | null;
+  projectedExhaustion?: string | null;
 }
 
 function formatHours(hours: number, locale: string) {
   return new Intl.NumberFormat(locale, { minimumFractionDigits: 1, maximumFractionDigits: 1 }).format(hours);
 }
 
+function formatDate(value: string, locale: string) {
+  return new Intl.DateTimeFormat(locale, { dateStyle: "medium" }).format(new Date(`${value}T00:00:00`));
+}
+
 function formatCurrency(amount: number | null | undefined, locale: string, currency: string) {
   if (amount === null || amount === undefined) {
     return "—";
@@ -91,6 +97,18 @@ export function ClientDashboardPacks({ packs, isLoading }: { packs: ClientPackPr
                   {t("client.dashboard.packs.noHoursDefined", "Pack hours not defined for this project.")}
                 </p>
               )}
+
+              {pack.exhaustedOn ? (
+                <p className="text-xs text-primary/60">
+                  {t("client.dashboard.packs.exhaustedOn", { date: formatDate(pack.exhaustedOn, locale) })}
+                </p>
+              ) : pack.projectedExhaustion ? (
+                <p className="text-xs text-primary/60">
+                  {t("client.dashboard.packs.projectedExhaustion", {
+                    date: formatDate(pack.projectedExhaustion, locale)
+                  })}
+                </p>
+              ) : null}
             </div>
           );
         })}
@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useState } from "react";
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery, useQuery } from "@tanstack/react-query";
 import { isAxiosError } from "axios";
 import { useTranslation } from "react-i18next";
 
@@ -16,7 +16,8 @@ import {
 } from "@/components/ui/table";
 import { ClientPaymentModal } from "@/components/pages/clients/ClientPaymentModal";
 import {
-  fetchClientAccount
+  fetchClientAccount,
+  fetchClientAccountEntries
 } from "@/lib/queries";
 import type { ClientAccountSummary } from "@/lib/types";
 
@@ -47,9 +48,21 @@ export function ClientDetailDialog({ clientId, isOpen, onClose }: ClientDetailDi
     enabled: Boolean(isOpen && clientId !== null)
   });
 
+  const accountEntriesQuery = useInfiniteQuery({
+    queryKey: ["client-account", clientId, "entries"],
+    queryFn: ({ pageParam }) => fetchClientAccountEntries(clientId as number, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) =>
+      lastPage.next ? new URL(lastPage.next).searchParams.get("cursor") : undefined,
+    enabled: Boolean(isOpen && clientId !== null)
+  });
+
   const accountData = clientAccountQuery.data;
   const isAccountLoading = clientAccountQuery.isLoading || clientAccountQuery.isFetching;
-  const accountEntries = accountData?.entries ?? [];
+  const accountEntries = useMemo(
+    () => accountEntriesQuery.data?.pages.flatMap((page) => page.results) ?? [],
+    [accountEntriesQuery.data]
+  );
   const accountCurrency = accountData?.currency ?? "EUR";
   const clientDetails = accountData?.client ?? null;
   const packProjects = accountData?.pack_projects ?? [];
@@ -327,6 +340,18 @@ export function ClientDetailDialog({ clientId, isOpen, onClose }: ClientDetailDi
                     </div>
                   </div>
                 )}
+                {accountEntriesQuery.hasNextPage && (
+                  <div className="mt-4 flex justify-center">
+                    <Button
+                      variant="outline"
+                      size="sm"
+                      onClick={() => void accountEntriesQuery.fetchNextPage()}
+                      disabled={accountEntriesQuery.isFetchingNextPage}
+                    >
+                      {t("admin.clients.details.account.loadMore")}
+                    </Button>
+                  </div>
+                )}
               </div>
 
               {packProjects.length > 0 && (
@@ -3,9 +3,11 @@ import type {
   Client,
   ClientAccountEntry,
   ClientAccountSummary,
+  CursorPage,
   PaginatedResponse,
   Project,
   ProjectAssignment,
+  ProjectBurndown,
   ProjectStatus,
   ProjectVisibility,
   ReportSummary,
@@ -55,6 +57,13 @@ export const fetchClientAccount = async (id: number) => {
   return response.data;
 };
 
+export const fetchClientAccountEntries = async (id: number, cursor?: string | null) => {
+  const response = await api.get<CursorPage<ClientAccountEntry>>(`/clients/${id}/account/entries/`, {
+    params: cursor ? { cursor } : undefined
+  });
+  return response.data;
+};
+
 export const fetchUsers = async (params?: Record<string, string | number | undefined>) => {
   const response = await api.get<PaginatedResponse<User>>("/users/", { params });
   return response.data;
@@ -84,6 +93,11 @@ export const fetchProjects = async (params?: Record<string, string | number | un
   return response.data;
 };
 
+export const fetchProjectBurndown = async (id: number) => {
+  const response = await api.get<ProjectBurndown>(`/projects/${id}/burndown/`);
+  return response.data;
+};
+
 export const fetchSystemSettings = async () => {
   const response = await api.get<SystemSettings>("/settings/system/");
   return response.data;
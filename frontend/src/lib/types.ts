@@ -5,6 +5,11 @@ export interface PaginatedResponse<T> {
   results: T[];
 }
 
+export interface CursorPage<T> {
+  next: string | null;
+  results: T[];
+}
+
 export interface Client {
   id: number;
   name: string;
@@ -45,6 +50,22 @@ export interface ClientPackProjectSummary {
   status: ProjectStatus;
 }
 
+export interface ProjectBurndown {
+  project_id: number;
+  computed_on: string;
+  pack_hours: string | null;
+  consumed_hours: string;
+  remaining_hours: string | null;
+  burn_rate_hours_per_day: number;
+  exhausted_on: string | null;
+  projected_exhaustion: string | null;
+  history: {
+    dates: string[];
+    minutes: number[];
+    remaining_minutes: number[] | null;
+  };
+}
+
 export interface ClientHourlyProjectSummary {
   id: number;
   name: string;
@@ -54,13 +75,21 @@ export interface ClientHourlyProjectSummary {
   currency: string;
 }
 
+export interface ClientLedgerCurrencyTotals {
+  charged: string;
+  paid: string;
+  pack_due: string;
+  hourly_due: string;
+  balance: string;
+}
+
 export interface ClientAccountSummary {
   client: Client;
   balance: string;
   total_charged: string;
   total_paid: string;
   currency: string;
-  entries: ClientAccountEntry[];
+  by_currency: Record<string, ClientLedgerCurrencyTotals>;
   pack_total_due: string;
   pack_projects: ClientPackProjectSummary[];
   hourly_total_due: string;
@@ -411,6 +411,7 @@ export const resources = {
               packLabel: "Hour packs",
               historyHeading: "Account history",
               empty: "No account entries recorded yet.",
+              loadMore: "Load older entries",
               table: {
                 date: "Date",
                 type: "Type",
@@ -596,7 +597,9 @@ export const resources = {
             empty: "Aucun pack d'heures disponible pour ce client.",
             noLimit: "Illimité",
             totalValue: "Valeur du pack: {{value}}",
-            noHoursDefined: "Heures non définies pour ce projet."
+            noHoursDefined: "Heures non définies pour ce projet.",
+            projectedExhaustion: "At the current pace, the pack runs out around {{date}}.",
+            exhaustedOn: "Pack hours ran out on {{date}}."
           }
         },
         projects: {
@@ -1061,6 +1064,7 @@ export const resources = {
               packLabel: "Packs de horas",
               historyHeading: "Historial de cuenta",
               empty: "Todavía no hay movimientos registrados.",
+              loadMore: "Cargar movimientos anteriores",
               table: {
                 date: "Fecha",
                 type: "Tipo",
@@ -1246,7 +1250,9 @@ export const resources = {
             empty: "No hay packs de horas disponibles para este cliente.",
             noLimit: "Ilimitado",
             totalValue: "Valor del pack: {{value}}",
-            noHoursDefined: "Horas del pack no definidas para este proyecto."
+            noHoursDefined: "Horas del pack no definidas para este proyecto.",
+            projectedExhaustion: "Al ritmo actual, el pack se agotará hacia el {{date}}.",
+            exhaustedOn: "Las horas del pack se agotaron el {{date}}."
           }
         },
         projects: {
@@ -1711,6 +1717,7 @@ export const resources = {
               packLabel: "Packs d'heures",
               historyHeading: "Historique du compte",
               empty: "Aucun mouvement enregistré pour le moment.",
+              loadMore: "Charger les mouvements précédents",
               table: {
                 date: "Date",
                 type: "Type",
@@ -1896,7 +1903,9 @@ export const resources = {
             empty: "Aucun forfait d'heures disponible pour ce client.",
             noLimit: "Illimité",
             totalValue: "Valeur du forfait : {{value}}",
-            noHoursDefined: "Heures du forfait non définies pour ce projet."
+            noHoursDefined: "Heures du forfait non définies pour ce projet.",
+            projectedExhaustion: "Au rythme actuel, le forfait sera épuisé vers le {{date}}.",
+            exhaustedOn: "Les heures du forfait ont été épuisées le {{date}}."
           }
         },
         projects: {
@@ -2361,6 +2370,7 @@ export const resources = {
               packLabel: "Packs de horas",
               historyHeading: "Histórico da conta",
               empty: "Ainda não existem movimentos registados.",
+              loadMore: "Carregar movimentos anteriores",
               table: {
                 date: "Data",
                 type: "Tipo",
@@ -2546,7 +2556,9 @@ export const resources = {
             empty: "Este cliente não tem packs de horas disponíveis.",
             noLimit: "Sem limite",
             totalValue: "Valor do pack: {{value}}",
-            noHoursDefined: "Horas do pack não definidas para este projeto."
+            noHoursDefined: "Horas do pack não definidas para este projeto.",
+            projectedExhaustion: "Ao ritmo atual, o pack esgota-se por volta de {{date}}.",
+            exhaustedOn: "As horas do pack esgotaram-se a {{date}}."
           }
         },
         projects: {
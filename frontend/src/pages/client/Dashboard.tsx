@@ -1,12 +1,12 @@
 import { useMemo } from "react";
-import { useQuery } from "@tanstack/react-query";
+import { useQueries, useQuery } from "@tanstack/react-query";
 import { useTranslation } from "react-i18next";
 
 import { ClientDashboardDistribution } from "@/components/clients/pages/dashboard/ClientDashboardDistribution";
 import { ClientDashboardHeader } from "@/components/clients/pages/dashboard/ClientDashboardHeader";
 import { ClientDashboardPacks } from "@/components/clients/pages/dashboard/ClientDashboardPacks";
 import { ClientDashboardSummary } from "@/components/clients/pages/dashboard/ClientDashboardSummary";
-import { fetchClientAccount, fetchProjects, fetchReportSummary } from "@/lib/queries";
+import { fetchClientAccount, fetchProjectBurndown, fetchProjects, fetchReportSummary } from "@/lib/queries";
 import { useAuthStore } from "@/store/auth";
 
 export function ClientDashboardPage() {
@@ -41,6 +41,14 @@ export function ClientDashboardPage() {
     enabled: typeof clientId === "number"
   });
 
+  const burndownQueries = useQueries({
+    queries: (accountData?.pack_projects ?? []).map((pack) => ({
+      queryKey: ["projects", pack.id, "burndown"],
+      queryFn: () => fetchProjectBurndown(pack.id)
+    }))
+  });
+  const loadingBurndowns = burndownQueries.some((query) => query.isLoading);
+
   const { t } = useTranslation();
 
   const assignedProjects = projectsData?.results.length ?? 0;
@@ -67,34 +75,32 @@ export function ClientDashboardPage() {
     }));
   }, [reportData, t]);
 
-  const packProgress = useMemo(() => {
-    const packs = accountData?.pack_projects ?? [];
-    const projectMap = new Map((projectsData?.results ?? []).map((project) => [project.id, project]));
-
-    return packs.map((pack) => {
-      const project = projectMap.get(pack.id);
-      const totalHoursForPack = pack.pack_hours ? Number(pack.pack_hours) : 0;
-      const usedHours = project?.total_logged_hours ?? 0;
-      const totalValue = pack.pack_total_value ? Number(pack.pack_total_value) : null;
-      const currency = project?.currency ?? accountData?.currency ?? "EUR";
-
-      return {
-        id: pack.id,
-        name: pack.name,
-        totalHours: Number.isFinite(totalHoursForPack) ? totalHoursForPack : 0,
-        usedHours: Number.isFinite(usedHours) ? usedHours : 0,
-        currency,
-        totalValue
-      };
-    });
-  }, [accountData?.pack_projects, accountData?.currency, projectsData?.results]);
+  // Consumed hours and the exhaustion forecast come from each pack's server-side burn-down.
+  const packProgress = (accountData?.pack_projects ?? []).map((pack, index) => {
+    const burndown = burndownQueries[index]?.data;
+    const totalHoursForPack = Number(burndown?.pack_hours ?? pack.pack_hours ?? 0);
+    const usedHours = Number(burndown?.consumed_hours ?? 0);
+    const totalValue = pack.pack_total_value ? Number(pack.pack_total_value) : null;
+    const currency = pack.currency || accountData?.currency || "EUR";
+
+    return {
+      id: pack.id,
+      name: pack.name,
+      totalHours: Number.isFinite(totalHoursForPack) ? totalHoursForPack : 0,
+      usedHours: Number.isFinite(usedHours) ? usedHours : 0,
+      currency,
+      totalValue,
+      exhaustedOn: burndown?.exhausted_on ?? null,
+      projectedExhaustion: burndown?.projected_exhaustion ?? null
+    };
+  });
 
   return (
     <div className="space-y-6">
       <ClientDashboardHeader />
       <ClientDashboardSummary metrics={summaryMetrics} />
       <ClientDashboardDistribution data={chartData} isLoading={loadingReport} />
-      <ClientDashboardPacks packs={packProgress} isLoading={loadingAccount} />
+      <ClientDashboardPacks packs={packProgress} isLoading={loadingAccount || loadingBurndowns} />
     </div>
   );
 }